@@ -0,0 +1,135 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add parent dir to path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+sys.path.append(os.path.dirname(current_dir))
+
+from synthetic_robot import KitStandIns, build_robot
+
+# The stand-ins must be in place before utils/ imports the Kit modules
+KIT = KitStandIns()
+KIT.install()
+
+from pxr import Usd, Sdf
+
+from utils.instrumentation import PROFILER
+from utils.stage_index import StageIndex, build_population_mask
+from utils.isaac_wrappers import apply_drive_settings, apply_sensor_settings
+from utils.layered_output import layer_paths, create_root_layer, open_layers, move_visuals_to_payload
+
+ROBOT_PATH = "/robot"
+
+# ---------------------------------------------------------
+# TEST ASSET
+# ---------------------------------------------------------
+def write_asset(directory, args):
+    # Same robot as single-file output and as layered output with visual payloads
+    stage, robot_path, config_data = build_robot(args.joints, args.link_depth, args.meshes, args.sensors, args.mesh_points)
+    # RTX lidars need Kit in the converter as well
+    config_data["sensors"] = {name: settings for name, settings in config_data["sensors"].items() if settings.get("implementation") != "rtx"}
+
+    single_path = os.path.join(directory, "robot_single.usd")
+    stage.GetRootLayer().Export(single_path)
+
+    layered_path = os.path.join(directory, "robot_layered.usd")
+    paths = layer_paths(layered_path)
+    os.makedirs(os.path.dirname(paths["base"]), exist_ok=True)
+    stage.GetRootLayer().Export(paths["base"])
+    create_root_layer(layered_path, paths)
+    layers = open_layers(paths)
+    layered_stage = Usd.Stage.Open(layered_path)
+    with Usd.EditContext(layered_stage, layers["base"]), contextlib.redirect_stdout(io.StringIO()):
+        move_visuals_to_payload(layered_stage, layers, robot_path)
+    layers["base"].Save()
+    layers["visuals"].Save()
+
+    with open(os.path.join(directory, "config.json"), 'w') as f:
+        json.dump(config_data, f)
+    return {"single": single_path, "layered": layered_path}
+
+def _rss_mib():
+    # Current resident set, so the interpreter and imports are not counted
+    with open("/proc/self/statm", 'r') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024.0 * 1024.0)
+
+# ---------------------------------------------------------
+# ONE MEASUREMENT (runs in a fresh process)
+# ---------------------------------------------------------
+def measure(usd_path, config_path, variant):
+    with open(config_path, 'r') as f:
+        config_data = json.load(f)
+    PROFILER.quiet = True
+    baseline_mib = _rss_mib()
+
+    start = time.perf_counter()
+    if variant == "full":
+        stage = Usd.Stage.Open(usd_path)
+    else:
+        parents = [settings.get("parent_link") for settings in config_data.get("sensors", {}).values()]
+        mask = build_population_mask(Sdf.Layer.FindOrOpen(usd_path), ROBOT_PATH, parents)
+        stage = Usd.Stage.OpenMasked(usd_path, mask, Usd.Stage.LoadNone)
+    open_seconds = time.perf_counter() - start
+
+    KIT.stage = stage
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = StageIndex(stage, ROBOT_PATH)
+        apply_drive_settings(stage, ROBOT_PATH, config_data, index=index)
+        apply_sensor_settings(stage, ROBOT_PATH, config_data, index=index)
+    pass_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "open_ms": open_seconds * 1000.0,
+        "pass_ms": pass_seconds * 1000.0,
+        "prims": index.prims_visited,
+        "rss_mib": _rss_mib() - baseline_mib,
+    }))
+
+def run_variant(usd_path, config_path, variant, repeats):
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, __file__, "--measure", usd_path, config_path, variant],
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full stage open against a masked open with unloaded payloads for the drive and sensor passes.")
+    parser.add_argument("--joints", type=int, default=60, help="Number of joints (one link each)")
+    parser.add_argument("--link-depth", type=int, default=6, help="Links per kinematic chain below the base")
+    parser.add_argument("--meshes", type=int, default=4, help="Visual mesh prims per link")
+    parser.add_argument("--mesh-points", type=int, default=10000, help="Points per visual mesh")
+    parser.add_argument("--sensors", type=int, default=4, help="Sensors (camera, PhysX lidar, IMU)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per variant (median is reported)")
+    parser.add_argument("--measure", nargs=3, metavar=("USD", "CONFIG", "VARIANT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"--- Masked Open Benchmark: {args.joints} joints, {args.meshes} x {args.mesh_points}-point meshes per link ---")
+        assets = write_asset(directory, args)
+        config_path = os.path.join(directory, "config.json")
+        print(f"  Asset: {os.path.getsize(assets['single']) / (1024.0 * 1024.0):.1f} MiB")
+
+        print(f"  {'output':<8} {'open':<7} {'open ms':>9} {'pass ms':>9} {'prims':>7} {'RSS +':>10}")
+        for layout, usd_path in assets.items():
+            for variant in ("full", "masked"):
+                result = run_variant(usd_path, config_path, variant, args.repeats)
+                print(f"  {layout:<8} {variant:<7} {result['open_ms']:9.1f} {result['pass_ms']:9.1f} {result['prims']:7.0f} {result['rss_mib']:7.1f} MiB")
+
+if __name__ == "__main__":
+    main()
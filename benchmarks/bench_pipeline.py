@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add parent dir to path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+sys.path.append(os.path.dirname(current_dir))
+
+from synthetic_robot import KitStandIns, build_robot
+
+# The stand-ins must be in place before utils/ imports the Kit modules
+KIT = KitStandIns()
+KIT.install()
+
+from utils.instrumentation import PROFILER
+from utils.stage_index import StageIndex
+from utils.isaac_wrappers import apply_drive_settings, apply_sensor_settings
+from utils.isaac_ros2 import create_ros2_bridge
+
+STAGES = ["stage_index", "drives", "sensors", "ros2_bridge"]
+
+# ---------------------------------------------------------
+# PIPELINE RUN
+# ---------------------------------------------------------
+def run_pipeline(num_joints, link_depth, meshes_per_link, num_sensors, track_memory):
+    stage, robot_path, config_data = build_robot(num_joints, link_depth, meshes_per_link, num_sensors)
+    KIT.stage = stage
+
+    steps = [
+        ("stage_index", lambda: StageIndex(stage, robot_path)),
+        ("drives", lambda: apply_drive_settings(stage, robot_path, config_data, index=state["index"])),
+        ("sensors", lambda: apply_sensor_settings(stage, robot_path, config_data, index=state["index"])),
+        ("ros2_bridge", lambda: create_ros2_bridge(stage, robot_path, config_data, index=state["index"])),
+    ]
+
+    state = {}
+    seconds, peak = {}, {}
+    # The pipeline prints one line per joint/sensor/graph
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, step in steps:
+            if track_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = step()
+            seconds[name] = time.perf_counter() - start
+            if track_memory:
+                peak[name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if name == "stage_index":
+                state["index"] = result
+
+    return seconds, peak
+
+def measure(num_joints, args):
+    # Timing runs without tracemalloc, whose hooks distort timings
+    runs = [run_pipeline(num_joints, args.link_depth, args.meshes, args.sensors, False)[0] for _ in range(args.repeats)]
+    _, peak = run_pipeline(num_joints, args.link_depth, args.meshes, args.sensors, True)
+
+    result = {"joints": num_joints, "stages": {}}
+    for name in STAGES:
+        result["stages"][name] = {
+            "ms": statistics.median(run[name] for run in runs) * 1000.0,
+            "peak_kib": peak[name] / 1024.0,
+        }
+    result["total_ms"] = sum(stage["ms"] for stage in result["stages"].values())
+    return result
+
+# ---------------------------------------------------------
+# REPORT
+# ---------------------------------------------------------
+def scaling_exponent(results, name):
+    # Slope of log(time) over log(joints) between the smallest and largest run
+    first, last = results[0], results[-1]
+    t0 = first["stages"][name]["ms"] if name else first["total_ms"]
+    t1 = last["stages"][name]["ms"] if name else last["total_ms"]
+    if first["joints"] == last["joints"] or t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(last["joints"] / first["joints"])
+
+def print_report(results):
+    header = "".join(f"{name:>23}" for name in STAGES)
+    print(f"  {'joints':>7}{header}{'total':>12}")
+    for result in results:
+        cells = "".join(f"{s['ms']:9.2f} ms {s['peak_kib']:7.0f} KiB" for s in (result["stages"][name] for name in STAGES))
+        print(f"  {result['joints']:7d}{cells}{result['total_ms']:9.2f} ms")
+
+    if len(results) > 1:
+        print("  Scaling exponent (1.0 = linear in joint count):")
+        for name in STAGES + [None]:
+            exponent = scaling_exponent(results, name)
+            if exponent is not None:
+                print(f"    {name or 'total':<12} {exponent:5.2f}")
+
+def check_regressions(results, baseline_path, tolerance):
+    with open(baseline_path, 'r') as f:
+        baseline = {entry["joints"]: entry for entry in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result["joints"])
+        if base is None:
+            continue
+        for name in STAGES:
+            old, new = base["stages"][name]["ms"], result["stages"][name]["ms"]
+            if old > 0 and new > old * (1.0 + tolerance):
+                regressions.append(f"{name} @ {result['joints']} joints: {old:.2f} ms -> {new:.2f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the post-import pipeline (drives, sensors, ROS 2 graphs) on synthetic robots without Isaac Sim.")
+    parser.add_argument("--joints", type=int, nargs="+", default=[10, 30, 100, 300, 1000], help="Joint counts of the scaling curve")
+    parser.add_argument("--link-depth", type=int, default=6, help="Links per kinematic chain below the base")
+    parser.add_argument("--meshes", type=int, default=2, help="Mesh prims per link")
+    parser.add_argument("--sensors", type=int, default=4, help="Sensors (cycling camera, PhysX lidar, IMU, RTX lidar)")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetitions per joint count (median is reported)")
+    parser.add_argument("--json", metavar="PATH", help="Write the results to a JSON file (usable as --baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail when a stage is slower than this earlier --json result")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    PROFILER.quiet = True
+
+    print(f"--- Pipeline Benchmark: depth {args.link_depth}, {args.meshes} mesh(es)/link, {args.sensors} sensor(s) ---")
+    results = [measure(num_joints, args) for num_joints in sorted(args.joints)]
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"link_depth": args.link_depth, "meshes": args.meshes, "sensors": args.sensors, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than the baseline by more than {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import sys
+import types
+
+import numpy as np
+
+# Plain pxr (usd-core) only, no Isaac Sim required
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Vt, Gf
+
+SENSOR_CYCLE = ["camera", "lidar", "imu", "rtx_lidar"]
+
+# ---------------------------------------------------------
+# KIT STAND-INS
+# ---------------------------------------------------------
+# Minimal local replacements for the Kit modules imported by utils/, so the
+# post-import pipeline can be timed with usd-core on a CPU-only machine.
+# og.Controller.edit and the RTX lidar command author the same prims the
+# real implementations create; nothing else is emulated.
+class KitStandIns:
+    def __init__(self):
+        self.stage = None
+        self.commands = 0
+        self.graph_edits = 0
+
+    def execute(self, name, **kwargs):
+        self.commands += 1
+        if name == "IsaacSensorCreateRtxLidar":
+            self.stage.DefinePrim(f"{kwargs['parent']}/{kwargs['path']}", "OmniLidar")
+        return True, None
+
+    def edit(self, graph, edits):
+        self.graph_edits += 1
+        graph_path = graph["graph_path"]
+        self.stage.DefinePrim(graph_path, "OmniGraph")
+        for node, node_type in edits.get("CREATE_NODES", []):
+            node_prim = self.stage.DefinePrim(f"{graph_path}/{node}", "OmniGraphNode")
+            node_prim.CreateAttribute("node:type", Sdf.ValueTypeNames.Token, custom=False).Set(node_type)
+        return None
+
+    def install(self):
+        def module(name, **attributes):
+            mod = types.ModuleType(name)
+            mod.__dict__.update(attributes)
+            sys.modules[name] = mod
+            if "." in name:
+                parent, child = name.rsplit(".", 1)
+                setattr(sys.modules[parent], child, mod)
+            return mod
+
+        keys = types.SimpleNamespace(CREATE_NODES="CREATE_NODES", SET_VALUES="SET_VALUES", CONNECT="CONNECT")
+        controller = types.SimpleNamespace(Keys=keys, edit=self.edit)
+        urdf = types.SimpleNamespace(UrdfJointTargetType=types.SimpleNamespace(JOINT_DRIVE_POSITION=1))
+
+        for name in ["omni", "omni.kit", "omni.graph", "isaacsim", "isaacsim.core", "isaacsim.core.utils",
+                     "isaacsim.asset", "isaacsim.asset.importer"]:
+            module(name)
+        module("omni.kit.commands", execute=self.execute)
+        module("omni.graph.core", Controller=controller)
+        module("isaacsim.core.utils.extensions", enable_extension=lambda name: None)
+        module("isaacsim.asset.importer.urdf", _urdf=urdf)
+
+# ---------------------------------------------------------
+# SYNTHETIC ROBOT
+# ---------------------------------------------------------
+def _box_mesh(stage, path):
+    mesh = UsdGeom.Mesh.Define(stage, path)
+    points = [Gf.Vec3f(x, y, z) for x in (-0.05, 0.05) for y in (-0.05, 0.05) for z in (-0.05, 0.05)]
+    mesh.CreatePointsAttr(Vt.Vec3fArray(points))
+    mesh.CreateFaceVertexCountsAttr(Vt.IntArray([4] * 6))
+    mesh.CreateFaceVertexIndicesAttr(Vt.IntArray([0, 1, 3, 2, 4, 6, 7, 5, 0, 4, 5, 1, 2, 3, 7, 6, 0, 2, 6, 4, 1, 5, 7, 3]))
+
+def _dense_mesh(stage, path, num_points, rng):
+    # Random triangle soup standing in for a detailed CAD visual
+    mesh = UsdGeom.Mesh.Define(stage, path)
+    mesh.CreatePointsAttr(Vt.Vec3fArray.FromNumpy(rng.random((num_points, 3), dtype=np.float32) * 0.1))
+    mesh.CreateFaceVertexCountsAttr(Vt.IntArray.FromNumpy(np.full(num_points * 2, 3, dtype=np.int32)))
+    mesh.CreateFaceVertexIndicesAttr(Vt.IntArray.FromNumpy(rng.integers(0, num_points, num_points * 6, dtype=np.int32)))
+
+def build_robot(num_joints, link_depth=6, meshes_per_link=2, num_sensors=3, mesh_points=8):
+    # Joints are spread over chains of link_depth links hanging off the base,
+    # laid out like the URDF importer output (links as siblings below the
+    # robot prim, joints under /<robot>/joints).
+    stage = Usd.Stage.CreateInMemory()
+    robot_path = "/robot"
+    root = stage.DefinePrim(robot_path, "Xform")
+    stage.SetDefaultPrim(root)
+
+    links = {"base_link": f"{robot_path}/base_link"}
+    stage.DefinePrim(links["base_link"], "Xform")
+    UsdPhysics.ArticulationRootAPI.Apply(stage.GetPrimAtPath(links["base_link"]))
+
+    rng = np.random.default_rng(0)
+    joint_names = []
+    parent = "base_link"
+    for i in range(num_joints):
+        if i % max(link_depth, 1) == 0:
+            parent = "base_link"
+        link = f"link_{i}"
+        links[link] = f"{robot_path}/{link}"
+        stage.DefinePrim(links[link], "Xform")
+        for k in range(meshes_per_link):
+            if mesh_points > 8:
+                _dense_mesh(stage, f"{links[link]}/visuals/mesh_{k}", mesh_points, rng)
+            else:
+                _box_mesh(stage, f"{links[link]}/visuals/mesh_{k}")
+
+        joint_name = f"joint_{i}"
+        joint = UsdPhysics.RevoluteJoint.Define(stage, f"{robot_path}/joints/{joint_name}")
+        joint.CreateBody0Rel().SetTargets([links[parent]])
+        joint.CreateBody1Rel().SetTargets([links[link]])
+        UsdPhysics.DriveAPI.Apply(joint.GetPrim(), "angular")
+        joint_names.append(joint_name)
+        parent = link
+
+    config_data = build_config(joint_names, list(links), num_sensors)
+    return stage, robot_path, config_data
+
+def build_config(joint_names, link_names, num_sensors):
+    # Mirrors config/robot_template.yaml, scaled to the synthetic robot
+    sensors = {}
+    for i in range(num_sensors):
+        kind = SENSOR_CYCLE[i % len(SENSOR_CYCLE)]
+        parent = link_names[(i * 7) % len(link_names)]
+        name = f"{kind}_{i}"
+        if kind == "camera":
+            sensors[name] = {
+                "type": "camera", "parent_link": parent, "image_width": 640, "image_height": 480,
+                "rgb": {"enabled": True, "topic": f"{name}/color"},
+                "depth": {"enabled": True, "topic": f"{name}/depth"},
+                "pcl": {"enabled": True, "topic": f"{name}/points"},
+            }
+        elif kind == "imu":
+            sensors[name] = {"type": "imu", "parent_link": parent, "update_rate": 100.0, "topic": name}
+        else:
+            impl = "rtx" if kind == "rtx_lidar" else "physx"
+            sensors[name] = {"type": "lidar", "implementation": impl, "parent_link": parent, "rate_hz": 20.0, "topic": name}
+
+    # One position controller per 8 joints, the first two joints drive the base
+    controllers = {}
+    for start in range(2, len(joint_names), 8):
+        controllers[f"controller_{start}"] = {"topic": f"controller_{start}", "type": "position", "joints": joint_names[start:start + 8]}
+
+    return {
+        "default_drive": {"stiffness": 10000.0, "damping": 100.0},
+        "joints": {name: {"stiffness": 8000.0, "damping": 500.0} for name in joint_names[::2]},
+        "sensors": sensors,
+        "ros2": {
+            "enabled": True,
+            "tick_rate_hz": 60.0,
+            "publish_tf": True,
+            "tf_rate_hz": 30.0,
+            "publish_joint_states": True,
+            "joint_states_rate_hz": 30.0,
+            "mobile_base": {
+                "enabled": len(joint_names) >= 2,
+                "frame_base": "base_link",
+                "wheel_joints": joint_names[:2],
+                "wheel_radius": 0.045,
+                "wheel_base": 0.2,
+            },
+            "controllers": controllers,
+        },
+    }
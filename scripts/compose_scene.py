@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import yaml
+
+# Add parent dir to path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+config_dir = os.path.join(current_dir, "..", "config")
+
+from utils.instrumentation import PROFILER
+from utils.scene_composer import compose_scene, grid_instances, measure_stage
+
+# No Isaac Sim needed: the scene is composed with pxr only
+
+# ---------------------------------------------------------
+# INPUTS
+# ---------------------------------------------------------
+def robot_usd_path(robot_name):
+    # The USD written by urdf2usd_ros.py for this config
+    config_path = os.path.join(config_dir, f"{robot_name}.yaml")
+    if not os.path.exists(config_path):
+        print(f"Error: Config not found: {config_path}")
+        sys.exit(1)
+    with open(config_path, 'r') as f:
+        config_data = yaml.safe_load(f)
+    return config_data.get("files_path", {}).get("usd", "")
+
+def load_instances(path):
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f) or {}
+    instances = data.get("instances") or []
+    for i, instance in enumerate(instances):
+        if "name" not in instance:
+            print(f"Error: instances[{i}] has no name")
+            sys.exit(1)
+    return instances
+
+# ---------------------------------------------------------
+# LOAD MEASUREMENT (each stage opens in a fresh process)
+# ---------------------------------------------------------
+def run_measurement(usd_path):
+    output = subprocess.run([sys.executable, __file__, "--measure", usd_path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def print_measurements(robot_usd, scene_path, count):
+    single = run_measurement(robot_usd)
+    scene = run_measurement(scene_path)
+    print(f"  {'stage':<10} {'open ms':>9} {'prims':>8} {'prototypes':>11} {'RSS +':>10}")
+    for label, result in (("1 robot", single), (f"{count} robots", scene)):
+        print(f"  {label:<10} {result['open_ms']:9.1f} {result['prims']:8d} {result['prototypes']:11d} {result['rss_mib']:7.1f} MiB")
+    if count > 1:
+        # Cost of each instance beyond the first, against a full robot copy
+        extra_ms = (scene["open_ms"] - single["open_ms"]) / (count - 1)
+        extra_mib = (scene["rss_mib"] - single["rss_mib"]) / (count - 1)
+        print(f"  Per extra instance: {extra_ms:.1f} ms, {extra_mib:.2f} MiB "
+              f"(one robot: {single['open_ms']:.1f} ms, {single['rss_mib']:.2f} MiB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compose a scene with several instances of a converted robot USD, each with its own ROS 2 namespace.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--robot", help="Name of the YAML config in the config folder whose USD is instanced")
+    source.add_argument("--usd", help="Path of the converted robot USD")
+    source.add_argument("--measure", metavar="USD", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Scene USD to write. Per-instance layers go to <output>_instances/")
+    parser.add_argument("--instances", metavar="YAML", help="Instance list (name, position, yaw, namespace, domain_id, frame_prefix)")
+    parser.add_argument("--count", type=int, default=1, help="Number of instances on a grid when no --instances file is given")
+    parser.add_argument("--spacing", type=float, default=2.0, help="Grid spacing in meters for --count")
+    parser.add_argument("--domain-id", type=int, help="ROS_DOMAIN_ID for every grid instance (default: keep the robot's)")
+    parser.add_argument("--report-load", action="store_true", help="Open the robot and the scene in fresh processes and report load time and memory")
+    parser.add_argument("--quiet", action="store_true", help="Suppress per-instance output")
+    args = parser.parse_args()
+    PROFILER.quiet = args.quiet
+
+    if args.measure:
+        print(json.dumps(measure_stage(args.measure)))
+        return
+    if not args.output:
+        parser.error("--output is required")
+
+    robot_usd = args.usd or robot_usd_path(args.robot)
+    if not os.path.exists(robot_usd):
+        print(f"Error: Robot USD not found: {robot_usd}")
+        sys.exit(1)
+
+    if args.instances:
+        instances = load_instances(args.instances)
+    else:
+        instances = grid_instances(args.count, args.spacing, prefix=args.robot or "robot", domain_id=args.domain_id)
+    if not instances:
+        print("Error: No instance to compose")
+        sys.exit(1)
+
+    try:
+        compose_scene(robot_usd, instances, args.output)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Scene written to {args.output}")
+
+    if args.report_load:
+        print("--- Load Measurement ---")
+        print_measurements(robot_usd, args.output, len(instances))
+
+if __name__ == "__main__":
+    main()
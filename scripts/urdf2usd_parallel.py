@@ -0,0 +1,86 @@
+import argparse
+import os
+import shlex
+import sys
+import time
+
+# Add parent dir to path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+
+from utils.job_queue import run_job_queue
+from urdf2usd_ros import resolve_robot_names, validate_robots
+
+CONVERTER_SCRIPT = os.path.join(current_dir, "urdf2usd_ros.py")
+
+# ---------------------------------------------------------
+# WORKER COMMANDS
+# ---------------------------------------------------------
+def build_command(robot_name, args):
+    if args.worker:
+        # Stand-in worker (e.g. a stub without Isaac Sim); {robot} is substituted
+        return [part.replace("{robot}", robot_name) for part in shlex.split(args.worker)]
+
+    # One headless Isaac Sim app per worker, running the regular pipeline
+    command = [sys.executable, CONVERTER_SCRIPT, "--robot", robot_name]
+    if args.force:
+        command.append("--force")
+    if args.reapply:
+        command.append("--reapply")
+    return command
+
+def print_result(result):
+    label = {"success": "OK", "timeout": "TIMEOUT"}.get(result["status"], "FAIL")
+    print(f"  [{label}] {result['name']} ({result['seconds']:.1f} s, {result['attempts']} attempt(s))")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert many robot configs in parallel Isaac Sim worker processes.")
+    parser.add_argument("--robot", nargs="+", help="Name(s) of the drive/sensor YAML config(s) in the config folder")
+    parser.add_argument("--batch", metavar="PATTERN", help="Convert every config matching a glob pattern (e.g. 'sobit_*')")
+    parser.add_argument("-j", "--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 4), help="Maximum number of concurrent workers")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-attempt timeout in seconds")
+    parser.add_argument("--retries", type=int, default=0, help="Retries for a failed or timed out job")
+    parser.add_argument("--log-dir", default=os.path.join(current_dir, "..", "logs"), help="Directory for per-job and aggregated logs")
+    parser.add_argument("--worker", help="Worker command template replacing the converter, URDF validation is skipped, e.g. \"python3 tests/stub_worker.py {robot}\"")
+    parser.add_argument("--force", action="store_true", help="Reconvert even if the existing USD matches the cache key")
+    parser.add_argument("--reapply", action="store_true", help="Patch the existing USD when only drive/sensor/ROS 2 settings changed")
+
+    args = parser.parse_args()
+
+    robot_names = resolve_robot_names(args.robot, args.batch)
+    if not robot_names:
+        print("Error: No robot config selected. Use --robot and/or --batch.")
+        sys.exit(1)
+
+    # No worker is started for a batch with config typos. A stand-in worker
+    # never reads the URDF, so the scheduler also runs without one (CI).
+    invalid = [] if args.worker else validate_robots(robot_names)
+    if invalid:
+        print(f"Error: Invalid config(s): {', '.join(invalid)}")
+        sys.exit(1)
+
+    print(f"--- Converting {len(robot_names)} robot(s) with {args.jobs} worker(s) ---")
+    jobs = [(name, build_command(name, args)) for name in robot_names]
+
+    start = time.perf_counter()
+    results = run_job_queue(
+        jobs,
+        log_dir=os.path.abspath(args.log_dir),
+        max_workers=args.jobs,
+        timeout=args.timeout,
+        retries=args.retries,
+        on_done=print_result,
+    )
+
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    print("--- Parallel Summary ---")
+    for result in results:
+        print_result(result)
+    print(f"Converted {succeeded}/{len(results)} robots in {time.perf_counter() - start:.1f} s")
+    print(f"Logs: {os.path.join(os.path.abspath(args.log_dir), 'all_jobs.log')}")
+
+    if succeeded != len(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
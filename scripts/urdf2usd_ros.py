@@ -1,39 +1,259 @@
 import argparse
+import glob
 import os
 import sys
+import time
+import traceback
 import yaml
 
-# Check if running in Isaac Sim context
-try:
+# Add parent dir to path to import utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(current_dir))
+config_dir = os.path.join(current_dir, "..", "config")
+
+from utils.conversion_cache import CONVERTER_VERSION, compute_source_key, compute_cache_key, is_cache_hit, load_manifest, write_manifest, clear_manifest
+from utils.config_diff import plan_reapply, is_empty_plan
+from utils.instrumentation import PROFILER
+from utils.validation import validate_robot
+from utils.package_resolver import resolve_mesh_paths, write_resolved_urdf
+from utils.mesh_preconvert import preconvert_meshes
+
+# Started on demand so fully cached runs never pay for Isaac Sim startup
+simulation_app = None
+
+def start_simulation_app():
+    global simulation_app
+    if simulation_app is not None:
+        return simulation_app
+
+    # Check if running in Isaac Sim context
+    try:
+        from isaacsim import SimulationApp
+    except ImportError:
+        print("Error: This script must be run within the Isaac Sim Python environment.")
+        sys.exit(1)
+
     # Initialize Isaac Sim application
-    from isaacsim import SimulationApp
-    simulation_app = SimulationApp({"renderer": "RayTracedLighting", "headless": True})
+    print("Initializing Isaac Sim Context...")
+    with PROFILER.stage("app_startup"):
+        simulation_app = SimulationApp({"renderer": "RayTracedLighting", "headless": True})
+    return simulation_app
+
+# ---------------------------------------------------------
+# ROBOT SELECTION
+# ---------------------------------------------------------
+def resolve_robot_names(robots, pattern):
+    names = list(robots or [])
+
+    if pattern:
+        if not pattern.endswith(".yaml"):
+            pattern += ".yaml"
+        for path in sorted(glob.glob(os.path.join(config_dir, pattern))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            # The template only holds placeholder paths
+            if name != "robot_template":
+                names.append(name)
+
+    # Keep the first occurrence of each robot
+    return list(dict.fromkeys(names))
+
+# ---------------------------------------------------------
+# PRE-FLIGHT VALIDATION
+# ---------------------------------------------------------
+def validate_robots(robot_names):
+    # Config/URDF cross-check before any Isaac import, returns the invalid robots
+    start = time.perf_counter()
+    invalid = []
+    for robot_name in robot_names:
+        robot_config_path = os.path.join(config_dir, robot_name+".yaml")
+        if not os.path.exists(robot_config_path):
+            errors, warnings = [f"config file not found: {robot_config_path}"], []
+        else:
+            try:
+                with open(robot_config_path, 'r') as f:
+                    config_data = yaml.safe_load(f) or {}
+                errors, warnings = validate_robot(config_data)
+            except yaml.YAMLError as e:
+                errors, warnings = [f"YAML could not be parsed: {e}"], []
+
+        for warning in warnings:
+            print(f"Warning: {robot_name}: {warning}")
+        for error in errors:
+            print(f"Error: {robot_name}: {error}")
+        if errors:
+            invalid.append(robot_name)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    print(f"Validation: {len(robot_names) - len(invalid)}/{len(robot_names)} config(s) valid ({elapsed_ms:.0f} ms)")
+    return invalid
+
+def record_cache_key(stage, cache_key):
+    # Record the cache key with the USD itself
+    layer_data = dict(stage.GetRootLayer().customLayerData)
+    layer_data["urdf2usd:cacheKey"] = cache_key
+    layer_data["urdf2usd:converterVersion"] = CONVERTER_VERSION
+    stage.GetRootLayer().customLayerData = layer_data
+
+# ---------------------------------------------------------
+# POST-PROCESSING
+# ---------------------------------------------------------
+def rtx_sensor_names(config_data):
+    # RTX lidars are created by a Kit command, everything else through pxr
+    return {name for name, settings in config_data.get("sensors", {}).items()
+            if settings.get("type") == "lidar" and settings.get("implementation", "physx").lower() == "rtx"}
+
+def process_geometry(usd_path, prim_path, config_data, layers):
+    # Collision, instancing and visual payloads need the meshes, but not Kit
+    from pxr import Usd
+    from utils.mesh_dedup import deduplicate_meshes
+    from utils.collision import apply_collision_settings
+    from utils.mesh_lod import generate_visual_lods
+    from utils.articulation_merge import merge_fixed_joints
+    from utils.physics_profile import apply_physics_profile
+    from utils.layered_output import edit_layer, save_layers, move_visuals_to_payload
 
-    # Import necessary Isaac Sim modules
+    lod = config_data.get("visual_lod", {}).get("enabled", False)
+    merge = config_data.get("merge_fixed_joints", {}).get("enabled", False)
+    if not ("collision" in config_data or "physics" in config_data or config_data.get("mesh_instancing", False) or lod or merge or layers):
+        return
+
+    with PROFILER.stage("geometry_open"):
+        stage = Usd.Stage.Open(usd_path)
+
+    with edit_layer(stage, layers, "base"):
+        # Fold fixed-joint links into their parent bodies first, so the
+        # passes below see the final bodies
+        if merge:
+            with PROFILER.stage("merge_fixed_joints"):
+                merge_fixed_joints(stage, prim_path, config_data)
+
+        # Per-link collision approximations and PhysX cooking parameters
+        if "collision" in config_data:
+            with PROFILER.stage("collision"):
+                apply_collision_settings(stage, prim_path, config_data)
+
+        # Solver, sleep and contact settings, then self-collision filtering
+        # against the final colliders
+        if "physics" in config_data:
+            with PROFILER.stage("physics_profile"):
+                apply_physics_profile(stage, prim_path, config_data)
+
+        # Collapse repeated meshes (wheels, fingers, ...) into instanced prototypes
+        if config_data.get("mesh_instancing", False):
+            with PROFILER.stage("mesh_dedup"):
+                deduplicate_meshes(stage, prim_path)
+
+        # Decimated visual meshes behind the robot's "lod" variant set
+        if lod:
+            with PROFILER.stage("visual_lod"):
+                generate_visual_lods(stage, prim_path, config_data)
+
+        # Heavy visual meshes go behind payloads
+        if layers:
+            with PROFILER.stage("visual_payloads"):
+                move_visuals_to_payload(stage, layers, prim_path)
+
+    with PROFILER.stage("save"):
+        stage.GetRootLayer().Save()
+        save_layers(layers)
+
+def post_process(usd_path, prim_path, config_data, layers, plan, cache_key):
+    # plan selects the work, as produced by plan_reapply ("sensors" is None
+    # for every sensor)
     import omni.usd
-    import omni.kit.commands
-except ImportError:
-    print("Error: This script must be run within the Isaac Sim Python environment.")
-    sys.exit(1)
+    from pxr import Usd, Sdf
+    from utils.isaac_wrappers import apply_drive_settings, apply_sensor_settings
+    from utils.isaac_ros2 import create_ros2_bridge
+    from utils.stage_index import StageIndex, build_population_mask
+    from utils.layered_output import edit_layer, save_layers
 
-# Add parent dir to path to import utils
-current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(os.path.dirname(current_dir))
+    sensors_config = config_data.get("sensors", {})
+    sensor_names = set(sensors_config) if plan["sensors"] is None else set(plan["sensors"])
+    kit_sensors = sensor_names & rtx_sensor_names(config_data)
 
-from utils.isaac_wrappers import import_urdf, apply_drive_settings, apply_sensor_settings
-from utils.isaac_ros2 import create_ros2_bridge
+    # Drives and sensors: pxr stage masked to joints and sensor parents, payloads unloaded
+    with PROFILER.stage("stage_open"):
+        # Existing sensor prims are included too, so re-apply can remove them
+        parents = [sensors_config[name].get("parent_link") for name in sensor_names if name in sensors_config]
+        mask = build_population_mask(Sdf.Layer.FindOrOpen(usd_path), prim_path, parents + list(sensor_names))
+        stage = Usd.Stage.OpenMasked(usd_path, mask, Usd.Stage.LoadNone)
 
-def main():
-    parser = argparse.ArgumentParser(description="Convert ROS URDF to Isaac Sim USD with Physics/Sensor configuration.")
-    parser.add_argument("--robot", required=True, help="Path to the drive/sensor YAML config")
-    
-    args = parser.parse_args()
+    with PROFILER.stage("stage_index"):
+        index = StageIndex(stage, prim_path)
+    print(f"Stage Index: {index.summary()}")
+
+    if plan["all_joints"] or plan["joints"]:
+        with PROFILER.stage("drives"), edit_layer(stage, layers, "drives"):
+            apply_drive_settings(stage, prim_path, config_data, joint_names=None if plan["all_joints"] else plan["joints"], index=index)
+    if sensor_names - kit_sensors:
+        with PROFILER.stage("sensors"), edit_layer(stage, layers, "sensors"):
+            apply_sensor_settings(stage, prim_path, config_data, sensor_names=sensor_names - kit_sensors, index=index)
+
+    record_cache_key(stage, cache_key)
+    with PROFILER.stage("save"):
+        stage.GetRootLayer().Save()
+        save_layers(layers)
+    del stage, index
+
+    # Action graphs and RTX lidars need the Kit context
+    if not (kit_sensors or plan["all_ros2"] or plan["ros2_features"]):
+        print("No ROS 2 graph or RTX sensor to build, Kit stage open skipped")
+        return
 
+    context = omni.usd.get_context()
+    with PROFILER.stage("kit_stage_open"):
+        context.open_stage(usd_path, load_set=omni.usd.UsdContextInitialLoadSet.LOAD_NONE)
+
+    try:
+        stage = context.get_stage()
+        with PROFILER.stage("stage_index"):
+            index = StageIndex(stage, prim_path)
+
+        if kit_sensors:
+            with PROFILER.stage("sensors"), edit_layer(stage, layers, "sensors"):
+                apply_sensor_settings(stage, prim_path, config_data, sensor_names=kit_sensors, index=index)
+        if plan["all_ros2"] or plan["ros2_features"]:
+            with PROFILER.stage("ros2_bridge"), edit_layer(stage, layers, "ros2"):
+                create_ros2_bridge(stage, prim_path, config_data, features=None if plan["all_ros2"] else plan["ros2_features"], index=index)
+
+        with PROFILER.stage("save"):
+            context.save_stage()
+            save_layers(layers)
+    finally:
+        with PROFILER.stage("close"):
+            context.close_stage()
+
+# ---------------------------------------------------------
+# INCREMENTAL RE-APPLY
+# ---------------------------------------------------------
+def reapply_robot(usd_path, prim_path, config_data, plan, cache_key, source_key):
+    # Isaac Sim modules can only be imported once the app is running
+    start_simulation_app()
+    from utils.layered_output import layer_paths, open_layers
+
+    print(f"Patching existing USD: {usd_path}")
+    clear_manifest(usd_path)
+
+    # Layered output only rewrites the sublayers that change
+    paths = layer_paths(usd_path) if config_data.get("output_layout", "single") == "layered" else None
+    layers = open_layers(paths) if paths else None
+
+    post_process(usd_path, prim_path, config_data, layers, plan, cache_key)
+
+    write_manifest(usd_path, cache_key, source_key, prim_path, config_data, layers=list(paths.values()) if paths else None)
+
+    print(f"SUCCESS: Robot patched in {usd_path}")
+    return "patched"
+
+# ---------------------------------------------------------
+# SINGLE ROBOT CONVERSION
+# ---------------------------------------------------------
+def convert_robot(robot_name, force=False, reapply=False):
     # Validate Paths
-    robot_config_path = os.path.join(current_dir, "..", "config", args.robot+".yaml")
+    robot_config_path = os.path.join(config_dir, robot_name+".yaml")
     if not os.path.exists(robot_config_path):
-        print(f"Error: Robot file not found in config folder: {args.robot}")
-        sys.exit(1)
+        print(f"Error: Robot file not found in config folder: {robot_name}")
+        return "failed"
 
     # Load Config
     with open(robot_config_path, 'r') as f:
@@ -43,41 +263,176 @@ def main():
     usd_path = config_data.get("files_path", {}).get("usd", urdf_path.replace(".urdf", ".usd"))
     if not os.path.exists(urdf_path):
         print(f"Error: URDF file not found: {urdf_path}")
-        sys.exit(1)
+        return "failed"
 
-    # Initialize Stage
-    print("Initializing Isaac Sim Context...")
+    # Skip robots whose inputs match the existing USD
+    usd_path = os.path.abspath(usd_path)
+    # package:// and relative mesh URIs to absolute paths (index cached on disk)
+    with PROFILER.stage("resolve_meshes"):
+        mesh_paths = resolve_mesh_paths(urdf_path, config_data.get("package_paths", []))
+    with PROFILER.stage("cache_key"):
+        source_key = compute_source_key(urdf_path, mesh_paths)
+        cache_key = compute_cache_key(source_key, config_data)
+    if not force and is_cache_hit(usd_path, cache_key):
+        print(f"CACHED: {usd_path} is up to date (key {cache_key[:12]})")
+        return "cached"
 
-    # Import URDF
-    print(f"Importing URDF: {urdf_path}")
-    prim_path = import_urdf(
-        urdf_path=os.path.abspath(urdf_path),
-        usd_path=os.path.abspath(usd_path),
-    )
+    # Patch the existing USD when only the YAML changed
+    manifest = load_manifest(usd_path) if reapply and not force else None
+    if manifest and os.path.exists(usd_path) and manifest.get("source_key") == source_key:
+        plan = plan_reapply(manifest.get("config", {}), config_data)
+        if plan["full"] is None and not is_empty_plan(plan):
+            return reapply_robot(usd_path, manifest["prim_path"], config_data, plan, cache_key, source_key)
+        print(f"Re-apply not possible ({plan['full'] or 'no patchable change'}), running full conversion")
+    elif reapply:
+        print("Re-apply not possible (URDF, meshes or converter changed), running full conversion")
 
-    if prim_path:
-        # Open the stage via Omni Context
-        omni.usd.get_context().open_stage(os.path.abspath(usd_path))
+    # An interrupted conversion must never look up to date
+    clear_manifest(usd_path)
 
-        # Get the stage object from the context
-        stage = omni.usd.get_context().get_stage()
+    # Meshes are converted to USD across all cores (and cached by content)
+    # instead of one by one inside the importer
+    preconversion = config_data.get("mesh_preconversion", {})
+    if preconversion.get("enabled", False):
+        with PROFILER.stage("mesh_preconvert"):
+            mesh_paths = preconvert_meshes(mesh_paths, preconversion)
 
-        # Apply Settings
-        apply_drive_settings(stage, prim_path, config_data)
-        apply_sensor_settings(stage, prim_path, config_data)
-        create_ros2_bridge(stage, prim_path, config_data)
+    # Isaac Sim modules can only be imported once the app is running
+    start_simulation_app()
+    from utils.isaac_wrappers import import_urdf
+    from utils.layered_output import OUTPUT_LAYOUTS, layer_paths, create_root_layer, open_layers
 
-        # Save 
-        omni.usd.get_context().save_stage()
-        omni.usd.get_context().close_stage()
+    # Layered output: the importer writes the base layer and a root layer
+    # composes it with the drive, sensor and ROS 2 sublayers
+    layout = config_data.get("output_layout", "single")
+    if layout not in OUTPUT_LAYOUTS:
+        print(f"Warning: Unknown output_layout '{layout}', using 'single'")
+        layout = "single"
+    paths = layer_paths(usd_path) if layout == "layered" else None
+    if paths:
+        os.makedirs(os.path.dirname(paths["base"]), exist_ok=True)
 
-        print(f"SUCCESS: Robot exported to {usd_path}")
-    else:
+    # Import URDF (a temporary copy with absolute mesh paths when needed)
+    print(f"Importing URDF: {urdf_path}")
+    resolved_urdf = write_resolved_urdf(urdf_path, mesh_paths)
+    try:
+        with PROFILER.stage("urdf_import"):
+            prim_path = import_urdf(
+                urdf_path=resolved_urdf or os.path.abspath(urdf_path),
+                usd_path=paths["base"] if paths else usd_path,
+            )
+    finally:
+        if resolved_urdf:
+            os.remove(resolved_urdf)
+
+    if not prim_path:
         print("FAILURE: URDF Import command returned failure.")
+        return "failed"
+
+    if paths:
+        create_root_layer(usd_path, paths)
+    layers = open_layers(paths) if paths else None
+
+    # Post-process outside the Kit context where possible
+    process_geometry(usd_path, prim_path, config_data, layers)
+    plan = {
+        "all_joints": True,
+        "joints": set(),
+        "sensors": None,
+        "all_ros2": config_data.get("ros2", {}).get("enabled", False),
+        "ros2_features": set(),
+    }
+    post_process(usd_path, prim_path, config_data, layers, plan, cache_key)
+
+    # With collision.warm_cache, convex decompositions are cooked by PhysX now instead of on the first
+    # simulation load, and kept in its local mesh cache
+    from utils.collision import warms_cooking_cache, warm_cooking_cache
+    if warms_cooking_cache(config_data.get("collision", {}) or {}):
+        with PROFILER.stage("collision_cooking"):
+            warm_cooking_cache(usd_path, config_data)
+
+    write_manifest(usd_path, cache_key, source_key, prim_path, config_data, layers=list(paths.values()) if paths else None)
+
+    print(f"SUCCESS: Robot exported to {usd_path}")
+    return "converted"
+
+# ---------------------------------------------------------
+# BATCH REPORT
+# ---------------------------------------------------------
+def print_batch_summary(results, total_time):
+    print("--- Batch Summary ---")
+    for result in results:
+        label = {"converted": "OK", "patched": "PATCHED", "cached": "CACHED"}.get(result["status"], "FAIL")
+        print(f"  [{label}] {result['robot']} ({result['seconds']:.1f} s)")
+
+    failed = sum(1 for result in results if result["status"] == "failed")
+    hits = sum(1 for result in results if result["status"] == "cached")
+    print(f"Cache: {hits} hit(s), {len(results) - hits} miss(es)")
+    print(f"Processed {len(results) - failed}/{len(results)} robots in {total_time:.1f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ROS URDF to Isaac Sim USD with Physics/Sensor configuration.")
+    parser.add_argument("--robot", nargs="+", help="Name(s) of the drive/sensor YAML config(s) in the config folder")
+    parser.add_argument("--batch", metavar="PATTERN", help="Convert every config matching a glob pattern (e.g. 'sobit_*')")
+    parser.add_argument("--force", action="store_true", help="Reconvert even if the existing USD matches the cache key")
+    parser.add_argument("--reapply", action="store_true", help="Patch the existing USD when only drive/sensor/ROS 2 settings changed")
+    parser.add_argument("--check", action="store_true", help="Only validate the configs against their URDFs (no Isaac Sim needed), e.g. in CI")
+    parser.add_argument("--quiet", action="store_true", help="Suppress per-joint, per-sensor and per-graph output")
+    parser.add_argument("--profile", metavar="JSON", help="Write per-stage timings and counters to a JSON summary")
+    parser.add_argument("--trace", metavar="JSON", help="Write a Chrome trace (chrome://tracing, Perfetto) of the pipeline stages")
+
+    args = parser.parse_args()
+    PROFILER.quiet = args.quiet
+
+    robot_names = resolve_robot_names(args.robot, args.batch)
+    if not robot_names:
+        print("Error: No robot config selected. Use --robot and/or --batch.")
         sys.exit(1)
 
+    # Fail on config typos before paying for SimulationApp startup
+    invalid = validate_robots(robot_names)
+    if args.check or invalid:
+        if invalid:
+            print(f"Error: Invalid config(s): {', '.join(invalid)}")
+        sys.exit(1 if invalid else 0)
+
+    # Convert every robot inside the same SimulationApp session
+    results = []
+    batch_start = time.perf_counter()
+    for robot_name in robot_names:
+        print(f"=== Converting Robot: {robot_name} ===")
+        PROFILER.set_robot(robot_name)
+        start = time.perf_counter()
+        try:
+            with PROFILER.stage("total"):
+                status = convert_robot(robot_name, force=args.force, reapply=args.reapply)
+        except Exception:
+            traceback.print_exc()
+            print(f"FAILURE: Conversion raised an exception for {robot_name}")
+            status = "failed"
+
+        results.append({"robot": robot_name, "status": status, "seconds": time.perf_counter() - start})
+        if args.profile or args.trace:
+            PROFILER.print_robot_summary(robot_name)
+    PROFILER.set_robot(None)
+
+    if len(results) > 1:
+        print_batch_summary(results, time.perf_counter() - batch_start)
+
+    # Instrumentation output
+    if args.profile:
+        PROFILER.write_json(args.profile, converter_version=CONVERTER_VERSION, results=results)
+        print(f"Profile written to {args.profile}")
+    if args.trace:
+        PROFILER.write_chrome_trace(args.trace)
+        print(f"Chrome trace written to {args.trace}")
+
     # Cleanup
-    simulation_app.close()
+    if simulation_app is not None:
+        simulation_app.close()
+
+    if any(result["status"] == "failed" for result in results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import utils/ and scripts/ like the scripts themselves do
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "scripts"))
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+import time
+
+# Stand-in for urdf2usd_ros.py in urdf2usd_parallel.py --worker, so the job
+# queue runs without Isaac Sim:
+#   python3 scripts/urdf2usd_parallel.py --batch "*" --worker "python3 tests/stub_worker.py {robot}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub conversion worker for scheduler tests.")
+    parser.add_argument("robot", help="Robot name passed by the job queue")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to run before exiting")
+    parser.add_argument("--exit-code", type=int, default=0, help="Exit code of every attempt")
+    parser.add_argument("--fail-attempts", type=int, default=0, help="Attempts that fail with exit code 1 before --exit-code is used")
+    parser.add_argument("--state-dir", help="Directory counting attempts per robot (needed for --fail-attempts)")
+    args = parser.parse_args()
+
+    attempt = 1
+    if args.state_dir:
+        os.makedirs(args.state_dir, exist_ok=True)
+        counter = os.path.join(args.state_dir, f"{args.robot}.attempts")
+        if os.path.exists(counter):
+            with open(counter, 'r') as f:
+                attempt = int(f.read() or 0) + 1
+        with open(counter, 'w') as f:
+            f.write(str(attempt))
+
+    print(f"Stub worker: {args.robot}, attempt {attempt}")
+    sys.stdout.flush()
+    time.sleep(args.sleep)
+    sys.exit(1 if attempt <= args.fail_attempts else args.exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+from pxr import Usd, UsdGeom, UsdPhysics, Gf
+
+from utils.articulation_merge import KEPT_FRAME_KEY, merge_fixed_joints
+
+def add_body(stage, path, translate, mass, inertia):
+    xform = UsdGeom.Xform.Define(stage, path)
+    xform.AddTranslateOp().Set(Gf.Vec3d(*translate))
+    UsdPhysics.RigidBodyAPI.Apply(xform.GetPrim())
+    mass_api = UsdPhysics.MassAPI.Apply(xform.GetPrim())
+    mass_api.CreateMassAttr(mass)
+    mass_api.CreateCenterOfMassAttr(Gf.Vec3f(0.0))
+    mass_api.CreateDiagonalInertiaAttr(Gf.Vec3f(inertia, inertia, inertia))
+    return xform
+
+def build_stage():
+    # base_link at the origin, a bracket one meter along x on a fixed joint,
+    # with a visual offset by 5 m along z inside the bracket
+    stage = Usd.Stage.CreateInMemory()
+    stage.DefinePrim("/robot", "Xform")
+    add_body(stage, "/robot/base_link", (0.0, 0.0, 0.0), 2.0, 1.0)
+    add_body(stage, "/robot/bracket", (1.0, 0.0, 0.0), 1.0, 0.1)
+    visual = UsdGeom.Xform.Define(stage, "/robot/bracket/visuals")
+    visual.AddTranslateOp().Set(Gf.Vec3d(0.0, 0.0, 5.0))
+    joint = UsdPhysics.FixedJoint.Define(stage, "/robot/joints/bracket_joint")
+    joint.CreateBody0Rel().SetTargets(["/robot/base_link"])
+    joint.CreateBody1Rel().SetTargets(["/robot/bracket"])
+    return stage
+
+def config(protected=()):
+    return {"merge_fixed_joints": {"enabled": True, "protected_links": list(protected)}}
+
+def world_translation(stage, path):
+    return UsdGeom.Xformable(stage.GetPrimAtPath(path)).ComputeLocalToWorldTransform(Usd.TimeCode.Default()).ExtractTranslation()
+
+def test_dissolved_link_children_keep_their_world_transform():
+    stage = build_stage()
+    result = merge_fixed_joints(stage, "/robot", config())
+    assert result == {"bodies_before": 2, "bodies_after": 1, "merged": 1}
+    assert not stage.GetPrimAtPath("/robot/bracket")
+    assert not stage.GetPrimAtPath("/robot/joints/bracket_joint")
+    assert Gf.IsClose(world_translation(stage, "/robot/base_link/bracket_visuals"), Gf.Vec3d(1.0, 0.0, 5.0), 1e-9)
+
+def test_masses_and_inertia_are_combined():
+    stage = build_stage()
+    merge_fixed_joints(stage, "/robot", config())
+    mass_api = UsdPhysics.MassAPI(stage.GetPrimAtPath("/robot/base_link"))
+    assert np.isclose(mass_api.GetMassAttr().Get(), 3.0)
+    assert np.allclose(mass_api.GetCenterOfMassAttr().Get(), (1.0 / 3.0, 0.0, 0.0))
+    # Parallel axis: 2 kg at 1/3 m and 1 kg at 2/3 m from the combined center
+    offset_term = 2.0 * (1.0 / 3.0) ** 2 + 1.0 * (2.0 / 3.0) ** 2
+    assert np.allclose(sorted(mass_api.GetDiagonalInertiaAttr().Get()), [1.1, 1.1 + offset_term, 1.1 + offset_term], atol=1e-5)
+
+def test_protected_link_is_kept_as_a_frame():
+    stage = build_stage()
+    merge_fixed_joints(stage, "/robot", config(protected=["bracket"]))
+    frame = stage.GetPrimAtPath("/robot/base_link/bracket")
+    assert frame.GetCustomDataByKey(KEPT_FRAME_KEY)
+    assert not frame.HasAPI(UsdPhysics.RigidBodyAPI)
+    assert Gf.IsClose(world_translation(stage, "/robot/base_link/bracket"), Gf.Vec3d(1.0, 0.0, 0.0), 1e-9)
+    assert Gf.IsClose(world_translation(stage, "/robot/base_link/bracket/visuals"), Gf.Vec3d(1.0, 0.0, 5.0), 1e-9)
@@ -0,0 +1,76 @@
+from pxr import Usd, UsdGeom, UsdPhysics
+
+from utils.collision import apply_collision_settings, warms_cooking_cache
+
+def add_collider(stage, link):
+    UsdPhysics.RigidBodyAPI.Apply(UsdGeom.Xform.Define(stage, f"/robot/{link}").GetPrim())
+    UsdGeom.Xform.Define(stage, f"/robot/{link}/collisions")
+    mesh = UsdGeom.Mesh.Define(stage, f"/robot/{link}/collisions/mesh")
+    UsdPhysics.CollisionAPI.Apply(mesh.GetPrim())
+    return mesh.GetPrim()
+
+def api_schemas(prim):
+    # Authored list, PhysX schemas are not registered without Isaac Sim
+    return prim.GetMetadata("apiSchemas").GetAddedOrExplicitItems()
+
+def build_stage():
+    stage = Usd.Stage.CreateInMemory()
+    stage.DefinePrim("/robot", "Xform")
+    add_collider(stage, "base_link")
+    add_collider(stage, "arm_link")
+    add_collider(stage, "wheel_link")
+    return stage
+
+COLLISION = {
+    "default": "convex_decomposition",
+    "max_convex_hulls": 16,
+    "voxel_resolution": 500000,
+    "shrink_wrap": True,
+    "links": {
+        "arm_link": {"approximation": "convex_decomposition", "max_convex_hulls": 8},
+        "wheel_link": {"approximation": "convex_hull", "hull_vertex_limit": 32},
+    },
+}
+
+def test_decomposition_parameters_are_authored_per_link():
+    stage = build_stage()
+    apply_collision_settings(stage, "/robot", {"collision": COLLISION})
+
+    base = stage.GetPrimAtPath("/robot/base_link/collisions/mesh")
+    assert base.GetAttribute("physics:approximation").Get() == "convexDecomposition"
+    assert "PhysicsMeshCollisionAPI" in api_schemas(base)
+    assert "PhysxConvexDecompositionCollisionAPI" in api_schemas(base)
+    assert base.GetAttribute("physxConvexDecompositionCollision:maxConvexHulls").Get() == 16
+    assert base.GetAttribute("physxConvexDecompositionCollision:voxelResolution").Get() == 500000
+    assert base.GetAttribute("physxConvexDecompositionCollision:shrinkWrap").Get() is True
+    # Parameters left out of the YAML are left to PhysX
+    assert not base.GetAttribute("physxConvexDecompositionCollision:errorPercentage")
+
+    # Link overrides replace single parameters and keep the rest
+    arm = stage.GetPrimAtPath("/robot/arm_link/collisions/mesh")
+    assert arm.GetAttribute("physxConvexDecompositionCollision:maxConvexHulls").Get() == 8
+    assert arm.GetAttribute("physxConvexDecompositionCollision:voxelResolution").Get() == 500000
+
+def test_convex_hull_gets_hull_parameters_only():
+    stage = build_stage()
+    apply_collision_settings(stage, "/robot", {"collision": COLLISION})
+
+    wheel = stage.GetPrimAtPath("/robot/wheel_link/collisions/mesh")
+    assert wheel.GetAttribute("physics:approximation").Get() == "convexHull"
+    assert "PhysxConvexHullCollisionAPI" in api_schemas(wheel)
+    assert "PhysxConvexDecompositionCollisionAPI" not in api_schemas(wheel)
+    assert wheel.GetAttribute("physxConvexHullCollision:hullVertexLimit").Get() == 32
+    assert not wheel.GetAttribute("physxConvexDecompositionCollision:maxConvexHulls")
+
+def test_unknown_approximation_is_skipped():
+    stage = build_stage()
+    apply_collision_settings(stage, "/robot", {"collision": {"default": "convex_hull", "links": {"arm_link": "voxels"}}})
+
+    arm = stage.GetPrimAtPath("/robot/arm_link/collisions/mesh")
+    assert not arm.GetAttribute("physics:approximation")
+    assert stage.GetPrimAtPath("/robot/base_link/collisions/mesh").GetAttribute("physics:approximation").Get() == "convexHull"
+
+def test_cache_warming_is_opt_in():
+    assert not warms_cooking_cache(COLLISION)
+    assert warms_cooking_cache(dict(COLLISION, warm_cache=True))
+    assert not warms_cooking_cache({"default": "convex_hull", "warm_cache": True})
@@ -0,0 +1,90 @@
+import copy
+import os
+
+import yaml
+
+from utils.config_diff import plan_reapply, is_empty_plan
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "robot_template.yaml")
+
+def template():
+    with open(TEMPLATE, 'r') as f:
+        return yaml.safe_load(f)
+
+def changed(edit):
+    old = template()
+    new = copy.deepcopy(old)
+    edit(new)
+    return plan_reapply(old, new)
+
+# ---------------------------------------------------------
+# FULL CONVERSION
+# ---------------------------------------------------------
+def test_identical_configs_give_an_empty_plan():
+    plan = plan_reapply(template(), template())
+    assert plan["full"] is None
+    assert is_empty_plan(plan)
+
+def test_urdf_path_needs_a_full_conversion():
+    plan = changed(lambda config: config["files_path"].update(urdf="/other.urdf"))
+    assert plan["full"] == "files_path changed"
+
+def test_unpatchable_section_needs_a_full_conversion():
+    plan = changed(lambda config: config.update(mesh_instancing=not config.get("mesh_instancing", False)))
+    assert plan["full"] == "section 'mesh_instancing' changed"
+
+def test_added_section_needs_a_full_conversion():
+    plan = changed(lambda config: config.update(physics={"solver": "PGS"}))
+    assert plan["full"] == "section 'physics' changed"
+
+# ---------------------------------------------------------
+# DRIVES AND SENSORS
+# ---------------------------------------------------------
+def test_single_joint_is_patched_alone():
+    plan = changed(lambda config: config["joints"]["arm_joint_1"].update(stiffness=1.0))
+    assert plan["full"] is None
+    assert plan["joints"] == {"arm_joint_1"}
+    assert not plan["all_joints"]
+    assert not plan["sensors"] and not plan["ros2_features"] and not plan["all_ros2"]
+
+def test_default_drive_patches_every_joint():
+    plan = changed(lambda config: config["default_drive"].update(damping=1.0))
+    assert plan["all_joints"]
+    assert plan["joints"] == set()
+
+def test_removed_joint_entry_is_patched():
+    plan = changed(lambda config: config["joints"].pop("hand_joint"))
+    assert plan["joints"] == {"hand_joint"}
+
+def test_sensor_change_rebuilds_its_prim_and_graph_only():
+    plan = changed(lambda config: config["sensors"]["lidar"].update(max_range=20.0))
+    assert plan["sensors"] == {"lidar"}
+    assert plan["ros2_features"] == {"sensor:lidar"}
+    assert not plan["all_ros2"]
+
+# ---------------------------------------------------------
+# ROS 2 GRAPHS
+# ---------------------------------------------------------
+def test_feature_keys_rebuild_one_graph():
+    plan = changed(lambda config: config["ros2"].update(tf_rate_hz=10.0, topic_joint_states="states"))
+    assert plan["ros2_features"] == {"tf", "joint_states"}
+    assert not plan["all_ros2"]
+
+def test_mobile_base_change_rebuilds_its_graph():
+    plan = changed(lambda config: config["ros2"]["mobile_base"].update(wheel_radius=0.05))
+    assert plan["ros2_features"] == {"mobile_base"}
+
+def test_controller_change_rebuilds_that_controller_only():
+    plan = changed(lambda config: config["ros2"]["controllers"]["hand_controller"].update(topic="hand"))
+    assert plan["ros2_features"] == {"controller:hand_controller"}
+    assert not plan["all_ros2"]
+
+def test_global_ros2_key_rebuilds_every_graph():
+    plan = changed(lambda config: config["ros2"].update(namespace="robot_1"))
+    assert plan["all_ros2"]
+    assert not is_empty_plan(plan)
+
+def test_qos_assignment_rebuilds_every_graph():
+    # ros2.qos is shared by several graphs, so it is not a feature key
+    plan = changed(lambda config: config["ros2"]["qos"].update(tf="sensor_data"))
+    assert plan["all_ros2"]
@@ -0,0 +1,57 @@
+import os
+
+from utils.disk_cache import DiskCache, default_cache_dir
+
+KEY_A = "aa" + "0" * 62
+KEY_B = "bb" + "0" * 62
+KEY_C = "cc" + "0" * 62
+
+def test_put_then_get(tmp_path):
+    cache = DiskCache("test", root=str(tmp_path), suffix=".bin")
+    assert cache.get(KEY_A) is None
+    cache.put(KEY_A, b"payload")
+    assert cache.get(KEY_A) == b"payload"
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Sharded by the first two characters of the key
+    assert cache.path(KEY_A) == os.path.join(str(tmp_path), "test", "aa", KEY_A + ".bin")
+
+def test_put_replaces_without_leaving_temporary_files(tmp_path):
+    cache = DiskCache("test", root=str(tmp_path))
+    cache.put(KEY_A, b"old")
+    cache.put(KEY_A, b"new")
+    assert cache.get(KEY_A) == b"new"
+    assert os.listdir(os.path.dirname(cache.path(KEY_A))) == [os.path.basename(cache.path(KEY_A))]
+
+def test_entries_are_shared_between_instances(tmp_path):
+    DiskCache("test", root=str(tmp_path)).put(KEY_A, b"payload")
+    assert DiskCache("test", root=str(tmp_path)).get(KEY_A) == b"payload"
+    assert DiskCache("other", root=str(tmp_path)).get(KEY_A) is None
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    cache = DiskCache("test", max_bytes=250, root=str(tmp_path))
+    for age, key in enumerate((KEY_A, KEY_B, KEY_C)):
+        cache.put(key, b"x" * 100)
+        os.utime(cache.path(key), (1000 + age, 1000 + age))
+    # Reading A refreshes it, so B is now the oldest
+    cache.get(KEY_A)
+    cache.evict()
+    assert cache.evictions == 1
+    assert not os.path.exists(cache.path(KEY_B))
+    assert os.path.exists(cache.path(KEY_A)) and os.path.exists(cache.path(KEY_C))
+
+def test_evict_ignores_other_files_and_empty_caches(tmp_path):
+    cache = DiskCache("test", max_bytes=0, root=str(tmp_path), suffix=".usda")
+    cache.evict()
+    cache.put(KEY_A, b"mesh")
+    other = os.path.join(os.path.dirname(cache.path(KEY_A)), "notes.txt")
+    with open(other, 'w') as f:
+        f.write("kept")
+    cache.evict()
+    assert not os.path.exists(cache.path(KEY_A))
+    assert os.path.exists(other)
+    assert cache.summary() == "0 hit(s), 0 miss(es), 1 eviction(s)"
+
+def test_cache_dir_follows_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("URDF2USD_CACHE_DIR", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path)
+    assert DiskCache("meshes").root == os.path.join(str(tmp_path), "meshes")
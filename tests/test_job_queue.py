@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from utils.job_queue import run_job, run_job_queue
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB = os.path.join(TESTS_DIR, "stub_worker.py")
+PARALLEL = os.path.join(os.path.dirname(TESTS_DIR), "scripts", "urdf2usd_parallel.py")
+
+def stub(robot, *options):
+    return [sys.executable, STUB, robot, *options]
+
+# ---------------------------------------------------------
+# SINGLE JOB
+# ---------------------------------------------------------
+def test_success_logs_the_worker_output(tmp_path):
+    result = run_job("a", stub("a"), str(tmp_path / "a.log"))
+    assert result["status"] == "success"
+    assert result["attempts"] == 1
+    assert result["returncode"] == 0
+    assert "Stub worker: a, attempt 1" in (tmp_path / "a.log").read_text()
+
+def test_failure_keeps_the_exit_code(tmp_path):
+    result = run_job("a", stub("a", "--exit-code", "3"), str(tmp_path / "a.log"))
+    assert result["status"] == "failed"
+    assert result["returncode"] == 3
+    assert "exited with code 3" in (tmp_path / "a.log").read_text()
+
+def test_timeout_kills_the_worker(tmp_path):
+    result = run_job("a", stub("a", "--sleep", "30"), str(tmp_path / "a.log"), timeout=0.5)
+    assert result["status"] == "timeout"
+    assert result["returncode"] is None
+    assert result["seconds"] < 10.0
+
+def test_retry_recovers_from_a_failed_attempt(tmp_path):
+    command = stub("a", "--fail-attempts", "2", "--state-dir", str(tmp_path / "state"))
+    result = run_job("a", command, str(tmp_path / "a.log"), retries=2)
+    assert result["status"] == "success"
+    assert result["attempts"] == 3
+
+def test_retries_are_bounded(tmp_path):
+    command = stub("a", "--fail-attempts", "5", "--state-dir", str(tmp_path / "state"))
+    result = run_job("a", command, str(tmp_path / "a.log"), retries=1)
+    assert result["status"] == "failed"
+    assert result["attempts"] == 2
+
+def test_timed_out_attempt_is_retried(tmp_path):
+    result = run_job("a", stub("a", "--sleep", "30"), str(tmp_path / "a.log"), timeout=0.3, retries=1)
+    assert result["status"] == "timeout"
+    assert result["attempts"] == 2
+
+# ---------------------------------------------------------
+# QUEUE
+# ---------------------------------------------------------
+def test_queue_returns_results_in_job_order(tmp_path):
+    jobs = [("slow", stub("slow", "--sleep", "0.5")), ("fast", stub("fast")), ("bad", stub("bad", "--exit-code", "1"))]
+    done = []
+    results = run_job_queue(jobs, str(tmp_path), max_workers=3, on_done=lambda result: done.append(result["name"]))
+    assert [result["name"] for result in results] == ["slow", "fast", "bad"]
+    assert [result["status"] for result in results] == ["success", "success", "failed"]
+    # Completion order, not job order
+    assert done.index("fast") < done.index("slow")
+
+    aggregate = (tmp_path / "all_jobs.log").read_text()
+    assert aggregate.index("##### slow [success]") < aggregate.index("##### fast [success]") < aggregate.index("##### bad [failed]")
+
+# ---------------------------------------------------------
+# DRIVER EXIT STATUS
+# ---------------------------------------------------------
+def run_parallel(tmp_path, worker):
+    # Shipped configs with placeholder URDF paths: --worker skips validation
+    return subprocess.run([sys.executable, PARALLEL, "--robot", "sobit_light", "--jobs", "2", "--log-dir", str(tmp_path),
+                           "--worker", worker], capture_output=True, text=True)
+
+def test_driver_succeeds_with_a_stub_worker(tmp_path):
+    process = run_parallel(tmp_path, f"{sys.executable} {STUB} {{robot}}")
+    assert process.returncode == 0, process.stdout
+    assert "Converted 1/1 robots" in process.stdout
+
+def test_driver_fails_when_a_job_fails(tmp_path):
+    process = run_parallel(tmp_path, f"{sys.executable} {STUB} {{robot}} --exit-code 2")
+    assert process.returncode == 1
+    assert "[FAIL] sobit_light" in process.stdout
@@ -0,0 +1,68 @@
+from pxr import Usd, UsdGeom, UsdShade, Gf
+
+from utils.mesh_dedup import PROTOTYPES_SCOPE, deduplicate_meshes
+
+TRIANGLE = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
+OTHER_TRIANGLE = [(0.0, 0.0, 0.0), (2.0, 0.0, 0.0), (0.0, 2.0, 0.0)]
+
+def add_mesh(stage, path, points, translate, material):
+    mesh = UsdGeom.Mesh.Define(stage, path)
+    mesh.CreatePointsAttr(points)
+    mesh.CreateFaceVertexCountsAttr([3])
+    mesh.CreateFaceVertexIndicesAttr([0, 1, 2])
+    mesh.AddTranslateOp().Set(Gf.Vec3d(*translate))
+    UsdShade.MaterialBindingAPI.Apply(mesh.GetPrim()).Bind(material)
+    return mesh
+
+def build_stage():
+    # Two wheels sharing one mesh and a bracket of the same size but other shape
+    stage = Usd.Stage.CreateInMemory()
+    stage.DefinePrim("/robot", "Xform")
+    material = UsdShade.Material.Define(stage, "/robot/Looks/rubber")
+    for link in ("left_wheel", "right_wheel", "bracket"):
+        stage.DefinePrim(f"/robot/{link}", "Xform")
+    add_mesh(stage, "/robot/left_wheel/mesh", TRIANGLE, (0.0, 1.0, 0.0), material)
+    add_mesh(stage, "/robot/right_wheel/mesh", TRIANGLE, (0.0, -1.0, 0.0), material)
+    add_mesh(stage, "/robot/bracket/mesh", OTHER_TRIANGLE, (1.0, 0.0, 0.0), material)
+    return stage
+
+def test_identical_meshes_share_one_prototype():
+    stage = build_stage()
+    report = deduplicate_meshes(stage, "/robot")
+    assert report["meshes"] == 3
+    assert report["prototypes"] == 1
+    assert report["instances"] == 2
+    assert report["bytes_saved"] == 3 * 12 + 3 * 4 + 4
+    assert len(stage.GetPrimAtPath(f"/robot/{PROTOTYPES_SCOPE}").GetAllChildren()) == 1
+
+def test_instances_keep_their_transform_and_material():
+    stage = build_stage()
+    deduplicate_meshes(stage, "/robot")
+    for link, y in (("left_wheel", 1.0), ("right_wheel", -1.0)):
+        prim = stage.GetPrimAtPath(f"/robot/{link}/mesh")
+        assert prim.GetTypeName() == "Xform"
+        assert prim.IsInstanceable() and prim.IsInstance()
+        assert UsdGeom.Xformable(prim).GetLocalTransformation().ExtractTranslation() == Gf.Vec3d(0.0, y, 0.0)
+        material, _ = UsdShade.MaterialBindingAPI(prim).ComputeBoundMaterial()
+        assert material.GetPath() == "/robot/Looks/rubber"
+
+        # The prototype mesh carries the shared geometry
+        mesh = prim.GetPrototype().GetChild("mesh")
+        assert mesh.IsA(UsdGeom.Mesh)
+        assert list(UsdGeom.Mesh(mesh).GetPointsAttr().Get()) == [Gf.Vec3f(*point) for point in TRIANGLE]
+
+def test_different_mesh_is_left_alone():
+    stage = build_stage()
+    deduplicate_meshes(stage, "/robot")
+    prim = stage.GetPrimAtPath("/robot/bracket/mesh")
+    assert prim.IsA(UsdGeom.Mesh) and not prim.IsInstance()
+    assert list(UsdGeom.Mesh(prim).GetPointsAttr().Get()) == [Gf.Vec3f(*point) for point in OTHER_TRIANGLE]
+    assert UsdGeom.Xformable(prim).GetLocalTransformation().ExtractTranslation() == Gf.Vec3d(1.0, 0.0, 0.0)
+
+def test_no_duplicates_changes_nothing():
+    stage = build_stage()
+    stage.RemovePrim("/robot/right_wheel/mesh")
+    report = deduplicate_meshes(stage, "/robot")
+    assert report["prototypes"] == 0 and report["instances"] == 0
+    assert not stage.GetPrimAtPath(f"/robot/{PROTOTYPES_SCOPE}")
+    assert stage.GetPrimAtPath("/robot/left_wheel/mesh").IsA(UsdGeom.Mesh)
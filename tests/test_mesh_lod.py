@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Vt
+
+from utils.mesh_lod import LOD_VARIANT_SET, generate_visual_lods, simplify_mesh, triangle_faces, triangulate
+
+GRID = 40  # Quads per side, 3200 triangles
+
+def build_stage():
+    # Bumpy quad grid on base_link with one primvar of every resampled interpolation
+    stage = Usd.Stage.CreateInMemory()
+    stage.DefinePrim("/robot", "Xform")
+    UsdPhysics.RigidBodyAPI.Apply(stage.DefinePrim("/robot/base_link", "Xform"))
+    stage.DefinePrim("/robot/base_link/visuals", "Xform")
+    mesh = UsdGeom.Mesh.Define(stage, "/robot/base_link/visuals/mesh")
+
+    u, v = np.meshgrid(np.arange(GRID + 1), np.arange(GRID + 1), indexing="ij")
+    points = np.stack([u.ravel(), v.ravel(), np.sin(u.ravel() * 0.3) * np.cos(v.ravel() * 0.3)], axis=1).astype(np.float32) / GRID
+    corner = (u[:-1, :-1] * (GRID + 1) + v[:-1, :-1]).ravel()
+    indices = np.stack([corner, corner + GRID + 1, corner + GRID + 2, corner + 1], axis=1).ravel()
+    faces = GRID * GRID
+
+    mesh.CreatePointsAttr(Vt.Vec3fArray.FromNumpy(points))
+    mesh.CreateFaceVertexCountsAttr(Vt.IntArray([4] * faces))
+    mesh.CreateFaceVertexIndicesAttr(Vt.IntArray.FromNumpy(indices.astype(np.int32)))
+    mesh.CreateNormalsAttr(Vt.Vec3fArray([(0.0, 0.0, 1.0)] * len(points)))
+    mesh.SetNormalsInterpolation(UsdGeom.Tokens.vertex)
+
+    primvars = UsdGeom.PrimvarsAPI(mesh)
+    st = primvars.CreatePrimvar("st", Sdf.ValueTypeNames.TexCoord2fArray, UsdGeom.Tokens.faceVarying)
+    st.Set(Vt.Vec2fArray.FromNumpy(points[:, :2]))
+    st.SetIndices(Vt.IntArray.FromNumpy(indices.astype(np.int32)))
+    temperature = primvars.CreatePrimvar("temperature", Sdf.ValueTypeNames.FloatArray, UsdGeom.Tokens.vertex)
+    temperature.Set(Vt.FloatArray.FromNumpy(points[:, 0]))
+    primvars.CreatePrimvar("wear", Sdf.ValueTypeNames.FloatArray, UsdGeom.Tokens.uniform).Set(Vt.FloatArray([0.5] * faces))
+    mesh.CreateDisplayColorPrimvar(UsdGeom.Tokens.constant).Set(Vt.Vec3fArray([(1.0, 0.0, 0.0)]))
+    return stage
+
+CONFIG = {"visual_lod": {"enabled": True, "medium": 0.25, "low": 0.05, "min_triangles": 0}}
+
+def test_every_level_has_its_triangles_and_primvars():
+    stage = build_stage()
+    report = generate_visual_lods(stage, "/robot", CONFIG)
+    assert report["base_link"]["full"] == 2 * GRID * GRID
+
+    robot = stage.GetPrimAtPath("/robot")
+    mesh = UsdGeom.Mesh(stage.GetPrimAtPath("/robot/base_link/visuals/mesh"))
+    for level, ratio in (("full", 1.0), ("medium", 0.25), ("low", 0.05)):
+        robot.GetVariantSet(LOD_VARIANT_SET).SetVariantSelection(level)
+        counts = np.asarray(mesh.GetFaceVertexCountsAttr().Get())
+        indices = np.asarray(mesh.GetFaceVertexIndicesAttr().Get())
+        points = mesh.GetPointsAttr().Get()
+        triangles = len(triangulate(counts, indices))
+        assert triangles == report["base_link"][level]
+        assert 0 < triangles <= ratio * 2 * GRID * GRID
+        assert UsdGeom.Mesh.ValidateTopology(Vt.IntArray.FromNumpy(indices.astype(np.int32)), Vt.IntArray.FromNumpy(counts.astype(np.int32)), len(points))[0]
+
+        primvars = UsdGeom.PrimvarsAPI(mesh)
+        st = primvars.GetPrimvar("st")
+        assert st.GetInterpolation() == UsdGeom.Tokens.faceVarying
+        assert len(st.ComputeFlattened()) == len(indices)
+        assert len(primvars.GetPrimvar("temperature").Get()) == len(points)
+        assert len(primvars.GetPrimvar("wear").Get()) == len(counts)
+        assert np.allclose(primvars.GetPrimvar("wear").Get(), 0.5)
+        assert list(primvars.GetPrimvar("displayColor").Get()) == [(1.0, 0.0, 0.0)]
+        normals = np.asarray(mesh.GetNormalsAttr().Get())
+        assert mesh.GetNormalsInterpolation() == UsdGeom.Tokens.vertex
+        assert len(normals) == len(points)
+        assert np.allclose(np.linalg.norm(normals, axis=1), 1.0)
+
+def test_vertex_primvars_are_averaged_per_cluster():
+    stage = build_stage()
+    generate_visual_lods(stage, "/robot", CONFIG)
+    stage.GetPrimAtPath("/robot").GetVariantSet(LOD_VARIANT_SET).SetVariantSelection("low")
+    mesh = UsdGeom.Mesh(stage.GetPrimAtPath("/robot/base_link/visuals/mesh"))
+    # temperature was the x coordinate, and clusters merge into their mean point
+    points = np.asarray(mesh.GetPointsAttr().Get())
+    temperature = np.asarray(UsdGeom.PrimvarsAPI(mesh).GetPrimvar("temperature").Get())
+    assert np.allclose(temperature, points[:, 0], atol=1e-5)
+
+def test_meshes_without_triangles_are_skipped():
+    stage = Usd.Stage.CreateInMemory()
+    stage.DefinePrim("/robot", "Xform")
+    stage.DefinePrim("/robot/base_link", "Xform")
+    mesh = UsdGeom.Mesh.Define(stage, "/robot/base_link/lines")
+    mesh.CreatePointsAttr([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)])
+    mesh.CreateFaceVertexCountsAttr([2])
+    mesh.CreateFaceVertexIndicesAttr([0, 1])
+    assert generate_visual_lods(stage, "/robot", CONFIG) == {}
+
+@pytest.mark.parametrize("counts", [[3, 4, 5], [4, 3, 3, 5, 4]])
+def test_triangle_faces_follow_triangulate(counts):
+    indices = np.arange(sum(counts))
+    triangles = triangulate(counts, indices)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    # Every triangle's first corner is the first corner of its source face
+    assert list(triangles[:, 0]) == list(starts[triangle_faces(counts)])
+
+def test_simplify_maps_points_and_triangles_to_their_source():
+    points = np.random.default_rng(0).random((500, 3))
+    triangles = np.random.default_rng(1).integers(0, 500, (1000, 3))
+    merged, tris, point_map, source = simplify_mesh(points, triangles, 200)
+    assert len(tris) <= 200 and len(source) == len(tris)
+    # A kept triangle joins the clusters of its source triangle's points
+    assert (point_map[triangles[source]] == tris).all()
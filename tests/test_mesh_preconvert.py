@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from utils.mesh_preconvert import UnsupportedMesh, _parse_dae, _parse_obj, _parse_stl, convert_mesh, preconvert_meshes
+
+# Unit cube, 12 outward-facing triangles
+CUBE_POINTS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=np.float32)
+CUBE_FACES = [(0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7), (0, 1, 5), (0, 5, 4), (2, 3, 7), (2, 7, 6), (1, 2, 6), (1, 6, 5), (0, 4, 7), (0, 7, 3)]
+
+def binary_stl(triangles):
+    record = np.zeros(len(triangles), dtype=[("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+    record["vertices"] = triangles
+    return b"\0" * 80 + np.uint32(len(triangles)).tobytes() + record.tobytes()
+
+def ascii_stl(triangles):
+    facets = ["facet normal 0 0 0\nouter loop\n" + "".join(f"vertex {x} {y} {z}\n" for x, y, z in triangle) + "endloop\nendfacet\n"
+              for triangle in triangles]
+    return ("solid cube\n" + "".join(facets) + "endsolid cube\n").encode()
+
+def dae(scene, up_axis="<up_axis>Z_UP</up_axis>", extra=""):
+    return f"""<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">
+<asset>{up_axis}<unit meter="0.001"/></asset>
+<library_geometries>
+  <geometry id="tri"><mesh>
+    <source id="tri-pos"><float_array count="9">0 0 0 1000 0 0 0 1000 0</float_array><technique_common><accessor stride="3"/></technique_common></source>
+    <source id="tri-nrm"><float_array count="3">0 0 1</float_array><technique_common><accessor stride="3"/></technique_common></source>
+    <source id="tri-uv"><float_array count="6">0 0 1 0 0 1</float_array><technique_common><accessor stride="2"/></technique_common></source>
+    <vertices id="tri-vtx"><input semantic="POSITION" source="#tri-pos"/></vertices>
+    <triangles count="1">
+      <input semantic="VERTEX" source="#tri-vtx" offset="0"/><input semantic="NORMAL" source="#tri-nrm" offset="1"/>
+      <input semantic="TEXCOORD" source="#tri-uv" offset="2" set="0"/>
+      <p>0 0 0 1 0 1 2 0 2</p>
+    </triangles>
+  </mesh></geometry>
+  <geometry id="unused"><mesh>
+    <source id="unused-pos"><float_array count="9">5 5 5 6 5 5 5 6 5</float_array><technique_common><accessor stride="3"/></technique_common></source>
+    <vertices id="unused-vtx"><input semantic="POSITION" source="#unused-pos"/></vertices>
+    <triangles count="1"><input semantic="VERTEX" source="#unused-vtx" offset="0"/><p>0 1 2</p></triangles>
+  </mesh></geometry>
+</library_geometries>
+{extra}
+<library_visual_scenes><visual_scene id="scene">{scene}</visual_scene></library_visual_scenes>
+<scene><instance_visual_scene url="#scene"/></scene>
+</COLLADA>""".encode()
+
+def flat_normals_match_faces(points, counts, indices, normals):
+    # Every face vertex carries its face's normal, so hard edges stay hard
+    starts = np.cumsum(counts) - counts
+    for start, count in zip(starts, counts):
+        a, b, c = points[indices[start:start + 3]]
+        expected = np.cross(b - a, c - a)
+        expected /= np.linalg.norm(expected)
+        assert np.allclose(normals[start:start + count], expected, atol=1e-6)
+
+# ---------------------------------------------------------
+# STL
+# ---------------------------------------------------------
+@pytest.mark.parametrize("encode", [binary_stl, ascii_stl])
+def test_stl_keeps_hard_edges(encode):
+    points, counts, indices, normals, uvs = _parse_stl(encode(CUBE_POINTS[np.array(CUBE_FACES)]))
+    assert list(counts) == [3] * 12
+    # Triangle soup: one point per corner, nothing welded
+    assert len(points) == 36 and list(indices) == list(range(36))
+    assert len(normals) == 36 and uvs is None
+    flat_normals_match_faces(points, counts, indices, normals)
+    assert len({tuple(normal) for normal in np.round(normals, 6)}) == 6
+
+def test_stl_without_header_is_unsupported():
+    with pytest.raises(UnsupportedMesh):
+        _parse_stl(b"not a mesh")
+
+# ---------------------------------------------------------
+# OBJ
+# ---------------------------------------------------------
+def test_obj_keeps_normals_and_uvs():
+    data = b"v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nvt 0 0\nvt 1 0\nvt 1 1\nvt 0 1\nvn 0 0 1\nf 1/1/1 2/2/1 3/3/1 4/4/1\nf -4/-4/-1 -2/-2/-1 -1/-1/-1\n"
+    points, counts, indices, normals, uvs = _parse_obj(data)
+    assert list(counts) == [4, 3]
+    assert list(indices) == [0, 1, 2, 3, 0, 2, 3]
+    assert np.allclose(normals, [0, 0, 1])
+    assert np.allclose(uvs[:4], [[0, 0], [1, 0], [1, 1], [0, 1]])
+
+def test_obj_without_normals_gets_flat_normals():
+    points, counts, indices, normals, uvs = _parse_obj(b"v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 2 3\nf 1 4 2\n")
+    assert uvs is None
+    flat_normals_match_faces(points, counts, indices, normals)
+
+def test_obj_with_mixed_normals_or_materials_is_unsupported():
+    with pytest.raises(UnsupportedMesh):
+        _parse_obj(b"v 0 0 0\nv 1 0 0\nv 0 1 0\nvn 0 0 1\nf 1//1 2//1 3//1\nf 1 2 3\n")
+    with pytest.raises(UnsupportedMesh):
+        _parse_obj(b"mtllib cube.mtl\nv 0 0 0\n")
+
+# ---------------------------------------------------------
+# DAE
+# ---------------------------------------------------------
+def test_dae_emits_each_geometry_instance():
+    scene = '<node id="a"><instance_geometry url="#tri"/></node><node id="b"><node id="c"><instance_geometry url="#tri"/></node></node>'
+    points, counts, indices, normals, uvs = _parse_dae(dae(scene))
+    # Instanced twice, the unused geometry is left out
+    assert list(counts) == [3, 3]
+    assert list(indices) == [0, 1, 2, 3, 4, 5]
+    assert np.allclose(points.max(axis=0), [1.0, 1.0, 0.0])
+    assert np.allclose(normals, [0, 0, 1])
+    assert np.allclose(uvs[:3], [[0, 0], [1, 0], [0, 1]])
+
+def test_dae_without_up_axis_is_y_up():
+    with pytest.raises(UnsupportedMesh, match="Y_UP"):
+        _parse_dae(dae('<node id="a"><instance_geometry url="#tri"/></node>', up_axis=""))
+
+def test_dae_left_to_the_importer():
+    cases = [
+        dae('<node id="a"><translate>0 0 1</translate><instance_geometry url="#tri"/></node>'),
+        dae('<node id="a"><instance_node url="#lib"/></node>'),
+        dae('<node id="a"/>'),
+        dae('<node id="a"><instance_geometry url="#tri"/></node>', extra='<library_materials><material id="m"/></library_materials>'),
+    ]
+    for data in cases:
+        with pytest.raises(UnsupportedMesh):
+            _parse_dae(data)
+
+# ---------------------------------------------------------
+# USD OUTPUT
+# ---------------------------------------------------------
+def test_written_usd_has_face_varying_normals(tmp_path):
+    from pxr import Sdf, Usd, UsdGeom
+
+    path = tmp_path / "cube.stl"
+    path.write_bytes(binary_stl(CUBE_POINTS[np.array(CUBE_FACES)]))
+    for weld, point_count in ((False, 36), (True, 8)):
+        layer = Sdf.Layer.CreateAnonymous(".usda")
+        layer.ImportFromString(convert_mesh(str(path), weld).decode())
+        stage = Usd.Stage.Open(layer)
+        mesh = UsdGeom.Mesh(stage.GetPrimAtPath("/mesh"))
+        assert len(mesh.GetPointsAttr().Get()) == point_count
+        assert mesh.GetNormalsInterpolation() == UsdGeom.Tokens.faceVarying
+        assert len(mesh.GetNormalsAttr().Get()) == 36
+
+def test_preconvert_reuses_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("URDF2USD_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "cube.stl"
+    path.write_bytes(binary_stl(CUBE_POINTS[np.array(CUBE_FACES)]))
+    mesh_paths = {"package://robot/cube.stl": str(path), "package://robot/other.png": str(tmp_path / "other.png")}
+
+    first = preconvert_meshes(mesh_paths, {"workers": 1})
+    assert first["package://robot/cube.stl"].endswith(".usda")
+    assert first["package://robot/other.png"] == str(tmp_path / "other.png")
+    assert preconvert_meshes(mesh_paths, {"workers": 1}) == first
+    # Welded output is a different cache entry
+    assert preconvert_meshes(mesh_paths, {"workers": 1, "weld": True})["package://robot/cube.stl"] != first["package://robot/cube.stl"]
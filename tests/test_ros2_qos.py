@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from utils.ros2_qos import QOS_PRESETS, qos_errors, qos_profile_json, qos_references, qos_settings
+
+# ---------------------------------------------------------
+# PROFILE RESOLUTION
+# ---------------------------------------------------------
+def test_presets_resolve_without_user_profiles():
+    assert qos_settings({}, "sensor_data") == QOS_PRESETS["sensor_data"]
+    assert qos_settings({}, None) is None
+    assert qos_settings({}, "") is None
+
+def test_user_profile_extends_default_unless_a_base_is_given():
+    ros_config = {"qos_profiles": {"fast": {"depth": 1}, "lossy": {"base": "sensor_data", "depth": 2}}}
+    assert qos_settings(ros_config, "fast") == dict(QOS_PRESETS["default"], depth=1)
+    assert qos_settings(ros_config, "lossy") == dict(QOS_PRESETS["sensor_data"], depth=2)
+
+def test_profiles_chain_through_base():
+    ros_config = {"qos_profiles": {"a": {"durability": "transient_local"}, "b": {"base": "a", "depth": 1}}}
+    assert qos_settings(ros_config, "b") == dict(QOS_PRESETS["default"], durability="transient_local", depth=1)
+
+def test_profile_named_like_a_preset_overrides_it():
+    ros_config = {"qos_profiles": {"sensor_data": {"base": "sensor_data", "depth": 1}}}
+    assert qos_settings(ros_config, "sensor_data") == dict(QOS_PRESETS["sensor_data"], depth=1)
+
+def test_inline_mapping_is_merged_onto_its_base():
+    assert qos_settings({}, {"base": "sensor_data", "reliability": "reliable"}) == dict(QOS_PRESETS["sensor_data"], reliability="reliable")
+    assert qos_settings({}, {"depth": 3}) == dict(QOS_PRESETS["default"], depth=3)
+
+def test_unknown_and_cyclic_profiles_raise():
+    with pytest.raises(ValueError, match="unknown QoS profile 'nope'"):
+        qos_settings({}, "nope")
+    with pytest.raises(ValueError, match="profile 'a' is its own base"):
+        qos_settings({"qos_profiles": {"a": {"base": "b"}, "b": {"base": "a"}}}, "a")
+
+# ---------------------------------------------------------
+# SETTING CHECKS
+# ---------------------------------------------------------
+def test_presets_are_valid():
+    for settings in QOS_PRESETS.values():
+        assert qos_errors(settings) == []
+
+def test_setting_errors():
+    errors = qos_errors({"history": "keep_last", "depth": 0, "reliability": "maybe", "deadline": -1, "latency": 1, "lifespan": True})
+    assert errors == [
+        "unknown reliability 'maybe', expected one of system_default, reliable, best_effort",
+        "deadline must be a number >= 0, got '-1'",
+        "unknown QoS setting 'latency'",
+        "lifespan must be a number >= 0, got 'True'",
+        "keep_last needs depth >= 1",
+    ]
+
+# ---------------------------------------------------------
+# BRIDGE JSON
+# ---------------------------------------------------------
+def test_json_uses_the_bridge_tokens():
+    profile = json.loads(qos_profile_json({"qos_profiles": {"latched": {"durability": "transient_local", "depth": 1, "deadline": 0.5}}}, "latched"))
+    assert profile == {
+        "history": "keepLast", "reliability": "reliable", "durability": "transientLocal", "liveliness": "systemDefault",
+        "depth": 1, "deadline": 0.5, "lifespan": 0.0, "leaseDuration": 0.0,
+    }
+
+def test_every_token_maps_to_a_camel_case_bridge_value():
+    profile = json.loads(qos_profile_json({}, {"history": "keep_all", "reliability": "best_effort", "liveliness": "manual_by_topic",
+                                              "durability": "volatile", "lease_duration": 2}))
+    assert (profile["history"], profile["reliability"], profile["liveliness"], profile["durability"]) == ("keepAll", "bestEffort", "manualByTopic", "volatile")
+    assert profile["leaseDuration"] == 2.0
+
+def test_system_default_preset():
+    profile = json.loads(qos_profile_json({}, "system_default"))
+    assert {profile[key] for key in ("history", "reliability", "durability", "liveliness")} == {"systemDefault"}
+    assert profile["depth"] == 0
+
+def test_no_reference_keeps_the_node_default():
+    assert qos_profile_json({}, None) == ""
+
+# ---------------------------------------------------------
+# CONFIG REFERENCES
+# ---------------------------------------------------------
+def test_references_cover_topics_sensors_streams_and_controllers():
+    config_data = {
+        "sensors": {
+            "camera": {"type": "camera", "rgb": {"qos": "sensor_data"}, "depth": {}, "pcl": None},
+            "lidar": {"type": "lidar", "qos": {"depth": 1}},
+            "imu": None,
+        },
+        "ros2": {
+            "qos": {"tf": "default"},
+            "controllers": {"arm": {"qos": "default"}, "hand": {}},
+        },
+    }
+    assert qos_references(config_data) == [
+        ("ros2.qos.tf", "default"),
+        ("sensors.camera.rgb.qos", "sensor_data"),
+        ("sensors.lidar.qos", {"depth": 1}),
+        ("ros2.controllers.arm.qos", "default"),
+    ]
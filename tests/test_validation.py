@@ -0,0 +1,176 @@
+import os
+
+import pytest
+import yaml
+
+from utils.validation import validate_config, validate_robot
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "robot_template.yaml")
+
+# Links and joints named like the template, plus a fixed joint
+URDF = """<robot name="test">
+  <link name="base_footprint"/>
+  <link name="base_link"/>
+  <link name="wheel_left_link"/>
+  <link name="wheel_right_link"/>
+  <link name="arm_link_1"/>
+  <link name="arm_link_2"/>
+  <link name="arm_link_3"/>
+  <link name="hand_link"/>
+  <link name="camera_link"/>
+  <link name="laser_frame"/>
+  <link name="imu_link"/>
+  <joint name="base_joint" type="fixed"><parent link="base_footprint"/><child link="base_link"/></joint>
+  <joint name="wheel_left_joint" type="continuous"><parent link="base_link"/><child link="wheel_left_link"/></joint>
+  <joint name="wheel_right_joint" type="continuous"><parent link="base_link"/><child link="wheel_right_link"/></joint>
+  <joint name="arm_joint_1" type="revolute"><parent link="base_link"/><child link="arm_link_1"/></joint>
+  <joint name="arm_joint_2" type="revolute"><parent link="arm_link_1"/><child link="arm_link_2"/></joint>
+  <joint name="arm_joint_3" type="revolute"><parent link="arm_link_2"/><child link="arm_link_3"/></joint>
+  <joint name="hand_joint" type="prismatic"><parent link="arm_link_3"/><child link="hand_link"/></joint>
+  <joint name="camera_joint" type="fixed"><parent link="base_link"/><child link="camera_link"/></joint>
+  <joint name="laser_joint" type="fixed"><parent link="base_link"/><child link="laser_frame"/></joint>
+  <joint name="imu_joint" type="fixed"><parent link="base_link"/><child link="imu_link"/></joint>
+  <transmission name="t"><joint name="not_a_joint"/></transmission>
+</robot>
+"""
+
+@pytest.fixture
+def config(tmp_path):
+    urdf_path = tmp_path / "robot.urdf"
+    urdf_path.write_text(URDF)
+    with open(TEMPLATE, 'r') as f:
+        config_data = yaml.safe_load(f)
+    config_data["files_path"]["urdf"] = str(urdf_path)
+    return config_data
+
+# ---------------------------------------------------------
+# PATHS
+# ---------------------------------------------------------
+def test_template_is_valid_against_a_matching_urdf(config):
+    assert validate_robot(config) == ([], [])
+
+def test_missing_urdf_is_reported(config, tmp_path):
+    config["files_path"]["urdf"] = str(tmp_path / "missing.urdf")
+    errors, _ = validate_robot(config)
+    assert errors == [f"files_path.urdf: URDF file not found: {tmp_path / 'missing.urdf'}"]
+
+def test_broken_urdf_is_reported(config, tmp_path):
+    (tmp_path / "robot.urdf").write_text("<robot><link name='a'></robot>")
+    errors, _ = validate_robot(config)
+    assert len(errors) == 1 and errors[0].startswith("files_path.urdf: URDF could not be parsed")
+
+# ---------------------------------------------------------
+# JOINTS, LINKS AND SENSORS
+# ---------------------------------------------------------
+def test_every_typo_is_listed_with_a_suggestion(config):
+    config["joints"]["arm_jiont_1"] = {"stiffness": 1.0}
+    config["sensors"]["camera"]["parent_link"] = "camera_lnk"
+    errors, _ = validate_robot(config)
+    assert "joints: joint 'arm_jiont_1' not in URDF (did you mean 'arm_joint_1'?)" in errors
+    assert "sensors.camera.parent_link: link 'camera_lnk' not in URDF (did you mean 'camera_link'?)" in errors
+    assert len(errors) == 2
+
+def test_nested_joint_tags_are_not_urdf_joints(config):
+    config["joints"]["not_a_joint"] = {"stiffness": 1.0}
+    errors, _ = validate_robot(config)
+    assert errors[0].startswith("joints: joint 'not_a_joint' not in URDF")
+
+def test_fixed_joint_drive_is_a_warning(config):
+    config["joints"]["camera_joint"] = {"stiffness": 1.0}
+    errors, warnings = validate_robot(config)
+    assert errors == []
+    assert warnings == ["joints: 'camera_joint' is a fixed joint, its drive settings are ignored"]
+
+def test_sensor_type_and_lidar_implementation(config):
+    config["sensors"]["imu_sensor"]["type"] = "gps"
+    config["sensors"]["lidar"]["implementation"] = "optix"
+    config["sensors"]["camera"].pop("parent_link")
+    errors, _ = validate_robot(config)
+    assert "sensors.imu_sensor: unknown type 'gps', expected one of camera, lidar, imu" in errors
+    assert "sensors.lidar: unknown implementation 'optix', expected physx or rtx" in errors
+    assert "sensors.camera: parent_link is missing" in errors
+
+def test_sensor_named_like_a_link_is_a_warning(config):
+    config["sensors"]["imu_link"] = config["sensors"].pop("imu_sensor")
+    _, warnings = validate_robot(config)
+    assert warnings == ["sensors.imu_link: sensor name is also a link name, the sensor prim may shadow it"]
+
+def test_per_link_sections_are_checked(config):
+    config["collision"] = {"links": {"base_lnk": "convex_hull"}}
+    config["visual_lod"]["links"] = {"arm_link_9": {"low": 10}}
+    config["merge_fixed_joints"]["protected_links"] = ["imu_lnk"]
+    errors, _ = validate_robot(config)
+    assert [error.split(":")[0] for error in errors] == ["collision.links", "visual_lod.links", "merge_fixed_joints.protected_links"]
+
+# ---------------------------------------------------------
+# PHYSICS PROFILE
+# ---------------------------------------------------------
+def test_physics_solver_and_offsets(config):
+    config["physics"] = {"solver": "tgs", "contact_offset": 0.02, "rest_offset": 0.0}
+    assert validate_robot(config) == ([], [])
+    config["physics"] = {"solver": "SOR", "contact_offset": 0.01, "rest_offset": 0.01, "self_collision_filter": {"adjacent": True}}
+    errors, warnings = validate_robot(config)
+    assert errors == ["physics.solver: unknown solver 'SOR', expected TGS or PGS",
+                      "physics.rest_offset: must be smaller than contact_offset"]
+    assert warnings == ["physics.self_collision_filter: self_collision is disabled, no pair is filtered"]
+
+# ---------------------------------------------------------
+# ROS 2
+# ---------------------------------------------------------
+def test_wheel_joints_must_be_two_rotating_joints(config):
+    config["ros2"]["mobile_base"]["wheel_joints"] = ["wheel_left_joint", "hand_joint", "arm_joint_1"]
+    errors, _ = validate_robot(config)
+    assert errors == ["ros2.mobile_base.wheel_joints: expected 2 joints, got 3",
+                      "ros2.mobile_base.wheel_joints: joint 'hand_joint' is 'prismatic', expected revolute or continuous"]
+
+def test_frame_base_must_be_a_link(config):
+    config["ros2"]["mobile_base"]["frame_base"] = "base_foot"
+    errors, _ = validate_robot(config)
+    assert errors == ["ros2.mobile_base.frame_base: link 'base_foot' not in URDF (did you mean 'base_footprint'?)"]
+
+def test_controllers(config):
+    controllers = config["ros2"]["controllers"]
+    controllers["arm_controller"]["type"] = "effort"
+    controllers["hand_controller"]["joints"] = ["camera_joint"]
+    controllers["empty_controller"] = {"topic": "empty"}
+    errors, _ = validate_robot(config)
+    assert errors == ["ros2.controllers.arm_controller: unknown type 'effort', expected position or velocity",
+                      "ros2.controllers.hand_controller.joints: joint 'camera_joint' is fixed and cannot be commanded",
+                      "ros2.controllers.empty_controller: no joints listed"]
+
+def test_ros2_references_are_skipped_when_disabled(config):
+    config["ros2"]["enabled"] = False
+    config["ros2"]["mobile_base"]["wheel_joints"] = ["nope"]
+    config["ros2"]["qos"]["tf"] = "missing_profile"
+    assert validate_robot(config) == ([], [])
+
+def test_qos_profile_references(config):
+    config["ros2"]["qos"]["tf"] = "reliable5"
+    config["ros2"]["qos"]["scan"] = "default"
+    config["sensors"]["lidar"]["qos"] = {"reliability": "sometimes"}
+    errors, _ = validate_robot(config)
+    assert errors == ["ros2.qos: unknown topic 'scan', expected one of tf, joint_states, odom, cmd_vel",
+                      "ros2.qos.tf: unknown QoS profile 'reliable5' (did you mean 'reliable_5'?)",
+                      "sensors.lidar.qos: unknown reliability 'sometimes', expected one of system_default, reliable, best_effort"]
+
+def test_bad_named_profile_is_reported_once(config):
+    config["ros2"]["qos_profiles"]["reliable_5"]["depth"] = 0
+    errors, _ = validate_robot(config)
+    # Assigned to tf, joint_states, odom and arm_controller, reported at the definition only
+    assert errors == ["ros2.qos_profiles.reliable_5: keep_last needs depth >= 1"]
+
+def test_profile_cycle_is_reported(config):
+    config["ros2"]["qos_profiles"] = {"a": {"base": "b"}, "b": {"base": "a"}}
+    config["ros2"]["qos"] = {}
+    for settings in config["sensors"].values():
+        for stream in ("rgb", "depth", "pcl"):
+            settings.get(stream, {}).pop("qos", None)
+        settings.pop("qos", None)
+    config["ros2"]["controllers"]["arm_controller"].pop("qos")
+    errors, _ = validate_robot(config)
+    assert errors == ["ros2.qos_profiles.a: profile 'a' is its own base", "ros2.qos_profiles.b: profile 'b' is its own base"]
+
+def test_validate_config_takes_a_parsed_urdf(config):
+    urdf = {"links": ["base_link"], "joints": {}}
+    errors, _ = validate_config({"sensors": {"imu": {"type": "imu", "parent_link": "base_link"}}}, urdf)
+    assert errors == []
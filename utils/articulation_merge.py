@@ -0,0 +1,277 @@
+import numpy as np
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Gf
+
+from utils.instrumentation import PROFILER, detail
+
+# Removed from a link that is kept as a plain frame
+BODY_SCHEMAS = ("PhysicsRigidBodyAPI", "PhysicsMassAPI", "PhysxRigidBodyAPI")
+BODY_ATTRIBUTE_PREFIXES = ("physics:", "physxRigidBody:")
+# customData flag on kept frames, published on tf_static by the ROS 2 bridge
+KEPT_FRAME_KEY = "urdf2usd:keptFrame"
+
+# ---------------------------------------------------------
+# MASS PROPERTIES
+# ---------------------------------------------------------
+def _rotation_np(rotation):
+    # Gf matrices act on row vectors, numpy code below uses column vectors
+    return np.array(Gf.Matrix3d(rotation).GetTranspose(), dtype=np.float64).reshape(3, 3)
+
+def _read_mass(prim):
+    # (mass, center of mass, full 3x3 inertia tensor) in the link frame, or
+    # None when the importer left the mass to PhysX
+    mass_api = UsdPhysics.MassAPI(prim)
+    mass = mass_api.GetMassAttr().Get() if prim.HasAPI(UsdPhysics.MassAPI) else None
+    if not mass:
+        return None
+    com = np.array(mass_api.GetCenterOfMassAttr().Get() or (0.0, 0.0, 0.0), dtype=np.float64)
+    diagonal = np.array(mass_api.GetDiagonalInertiaAttr().Get() or (0.0, 0.0, 0.0), dtype=np.float64)
+    axes = mass_api.GetPrincipalAxesAttr().Get() or Gf.Quatf(1.0)
+    rotation = _rotation_np(Gf.Rotation(Gf.Quatd(axes)))
+    return mass, com, rotation @ np.diag(diagonal) @ rotation.T
+
+def _combine_mass(target, child, child_in_target):
+    # Parallel-axis theorem about the combined center of mass, with the
+    # child's tensor rotated into the target frame first
+    mass_t, com_t, inertia_t = target
+    mass_c, com_c, inertia_c = child
+    rotation = _rotation_np(child_in_target.ExtractRotationMatrix())
+    com_c = np.array(child_in_target.Transform(Gf.Vec3d(*com_c)), dtype=np.float64)
+    inertia_c = rotation @ inertia_c @ rotation.T
+
+    mass = mass_t + mass_c
+    com = (mass_t * com_t + mass_c * com_c) / mass
+    inertia = np.zeros((3, 3))
+    for m, c, tensor in ((mass_t, com_t, inertia_t), (mass_c, com_c, inertia_c)):
+        d = c - com
+        inertia += tensor + m * (np.dot(d, d) * np.eye(3) - np.outer(d, d))
+    return mass, com, inertia
+
+def _write_mass(layer, path, properties):
+    mass, com, inertia = properties
+    diagonal, axes = np.linalg.eigh((inertia + inertia.T) / 2.0)
+    if np.linalg.det(axes) < 0:
+        axes[:, 0] = -axes[:, 0]
+    quat = Gf.Matrix3d(*axes.T.reshape(-1).tolist()).ExtractRotation().GetQuat()
+
+    spec = layer.GetPrimAtPath(path)
+    values = [
+        ("physics:mass", Sdf.ValueTypeNames.Float, float(mass)),
+        ("physics:centerOfMass", Sdf.ValueTypeNames.Point3f, Gf.Vec3f(*com.tolist())),
+        ("physics:diagonalInertia", Sdf.ValueTypeNames.Float3, Gf.Vec3f(*np.maximum(diagonal, 0.0).tolist())),
+        ("physics:principalAxes", Sdf.ValueTypeNames.Quatf, Gf.Quatf(quat)),
+    ]
+    for name, type_name, value in values:
+        attr_spec = spec.attributes.get(name) or Sdf.AttributeSpec(spec, name, type_name)
+        attr_spec.default = value
+
+# ---------------------------------------------------------
+# SPEC EDITS
+# ---------------------------------------------------------
+def _set_local_transform(spec, matrix):
+    # Replaces the xform ops with translate/orient/scale from a matrix
+    for attr_spec in [a for a in spec.attributes if a.name.startswith("xformOp")]:
+        spec.RemoveProperty(attr_spec)
+    transform = Gf.Transform(matrix)
+    Sdf.AttributeSpec(spec, "xformOp:translate", Sdf.ValueTypeNames.Double3).default = transform.GetTranslation()
+    Sdf.AttributeSpec(spec, "xformOp:orient", Sdf.ValueTypeNames.Quatd).default = transform.GetRotation().GetQuat()
+    Sdf.AttributeSpec(spec, "xformOp:scale", Sdf.ValueTypeNames.Double3).default = transform.GetScale()
+    Sdf.AttributeSpec(spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Sdf.VariabilityUniform).default = \
+        ["xformOp:translate", "xformOp:orient", "xformOp:scale"]
+
+def _strip_body(spec):
+    if spec.HasInfo("apiSchemas"):
+        schemas = spec.GetInfo("apiSchemas")
+        kept = [schema for schema in schemas.GetAddedOrExplicitItems() if not schema.startswith(BODY_SCHEMAS)]
+        if kept:
+            spec.SetInfo("apiSchemas", Sdf.TokenListOp.Create(prependedItems=kept))
+        else:
+            spec.ClearInfo("apiSchemas")
+    for attr_spec in [a for a in spec.attributes if a.name.startswith(BODY_ATTRIBUTE_PREFIXES)]:
+        spec.RemoveProperty(attr_spec)
+    for rel_spec in [r for r in spec.relationships if r.name.startswith(BODY_ATTRIBUTE_PREFIXES)]:
+        spec.RemoveProperty(rel_spec)
+
+def _move_spec(layer, source, destination):
+    Sdf.CopySpec(layer, source, layer, destination)
+    del layer.GetPrimAtPath(source.GetParentPath()).nameChildren[source.name]
+
+def _unique_child(layer, parent_path, name):
+    candidate, i = name, 1
+    while layer.GetPrimAtPath(parent_path.AppendChild(candidate)):
+        candidate, i = f"{name}_{i}", i + 1
+    return candidate
+
+def _moved(path, moves):
+    # Current location of a path after the earlier moves of this pass
+    for source, destination in moves:
+        if path.HasPrefix(source):
+            path = path.ReplacePrefix(source, destination)
+    return path
+
+def _remap_targets(layer, moves):
+    # Relationship targets (joint bodies, filtered pairs, ...) follow moved prims
+    def visit(path):
+        if not path.IsPropertyPath(): return
+        spec = layer.GetObjectAtPath(path)
+        if not isinstance(spec, Sdf.RelationshipSpec): return
+        for item in list(spec.targetPathList.GetAddedOrExplicitItems()):
+            new = _moved(item, moves)
+            if new != item:
+                spec.targetPathList.ReplaceItemEdits(item, new)
+    layer.Traverse(Sdf.Path.absoluteRootPath, visit)
+
+# ---------------------------------------------------------
+# FIXED JOINT MERGING
+# ---------------------------------------------------------
+def protected_links(config_data):
+    # Frames other passes look up by name: sensor parents, the odometry base
+    # frame and any link listed in merge_fixed_joints.protected_links
+    merge_config = config_data.get("merge_fixed_joints", {})
+    names = set(merge_config.get("protected_links", []))
+    names |= {settings.get("parent_link") for settings in config_data.get("sensors", {}).values()}
+    names.add(config_data.get("ros2", {}).get("mobile_base", {}).get("frame_base", "base_footprint"))
+    return names
+
+def _count_bodies(stage, robot_prim_path):
+    return sum(1 for prim in Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path)) if prim.HasAPI(UsdPhysics.RigidBodyAPI))
+
+def merge_fixed_joints(stage, robot_prim_path, config_data):
+    print("--- Merging Fixed Joints ---")
+    layer = stage.GetEditTarget().GetLayer()
+    protected = protected_links(config_data)
+    bodies_before = _count_bodies(stage, robot_prim_path)
+
+    # Joints between two rigid bodies of the robot
+    joints = []
+    for prim in Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path)):
+        if not prim.IsA(UsdPhysics.Joint): continue
+        joint = UsdPhysics.Joint(prim)
+        body0, body1 = joint.GetBody0Rel().GetTargets(), joint.GetBody1Rel().GetTargets()
+        if len(body0) == 1 and len(body1) == 1:
+            joints.append((prim, body0[0], body1[0]))
+
+    # Fixed joints whose child can be folded into its parent body
+    parent_of = {}
+    for prim, body0, body1 in joints:
+        if not prim.IsA(UsdPhysics.FixedJoint): continue
+        child = stage.GetPrimAtPath(body1)
+        if not child or not child.HasAPI(UsdPhysics.RigidBodyAPI) or child.HasAPI(UsdPhysics.ArticulationRootAPI):
+            continue
+        if any(len(p.GetPrimStack()) != 1 or p.GetPrimStack()[0].layer != layer for p in (prim, child)):
+            print(f"Warning: {prim.GetName()} is not defined in the edit layer, not merged")
+            continue
+        parent_of[body1] = (body0, prim)
+
+    if not parent_of:
+        print(f"  No fixed joint to merge ({bodies_before} bodies)")
+        return {"bodies_before": bodies_before, "bodies_after": bodies_before, "merged": 0}
+
+    def chain(path):
+        # Links between path and the body that survives it
+        links = []
+        while path in parent_of:
+            path = parent_of[path][0]
+            links.append(path)
+        return links
+
+    # Everything is read from the composed stage before any spec is edited
+    xform_cache = UsdGeom.XformCache()
+    world = lambda path: xform_cache.GetLocalToWorldTransform(stage.GetPrimAtPath(path))
+    merged = {}
+    children_local = {}
+    masses = {}
+    missing_mass = []
+    # Closest to the survivor first, so a chain folds from its root outwards
+    for child in sorted(parent_of, key=lambda path: len(chain(path))):
+        target = chain(child)[-1]
+        child_in_target = world(child) * world(target).GetInverse()
+        merged[child] = (target, child_in_target)
+        # Offsets of the link's visuals and colliders, None for non-xformables
+        children_local[child] = {
+            name: xform_cache.GetLocalTransformation(prim)[0] if prim.IsA(UsdGeom.Xformable) else None
+            for name in layer.GetPrimAtPath(child).nameChildren.keys()
+            for prim in [stage.GetPrimAtPath(child.AppendChild(name))]
+        }
+
+        if target not in masses:
+            masses[target] = _read_mass(stage.GetPrimAtPath(target))
+        child_mass = _read_mass(stage.GetPrimAtPath(child))
+        if masses[target] is not None and child_mass is not None:
+            masses[target] = _combine_mass(masses[target], child_mass, child_in_target)
+        elif child_mass is not None:
+            missing_mass.append(target.name)
+
+    # Joints that keep a merged link as a body are re-expressed in the survivor's frame
+    rebased = []
+    for prim, body0, body1 in joints:
+        if prim.GetPath() in {joint.GetPath() for _, joint in parent_of.values()}: continue
+        joint = UsdPhysics.Joint(prim)
+        for index, body in ((0, body0), (1, body1)):
+            if body not in merged: continue
+            target, child_in_target = merged[body]
+            pos = getattr(joint, f"GetLocalPos{index}Attr")().Get() or Gf.Vec3f(0.0)
+            rot = getattr(joint, f"GetLocalRot{index}Attr")().Get() or Gf.Quatf(1.0)
+            local = Gf.Matrix4d().SetRotate(Gf.Quatd(rot)) * Gf.Matrix4d().SetTranslate(Gf.Vec3d(pos))
+            rebased.append((prim.GetPath(), index, target, local * child_in_target))
+
+    moves = []
+    with Sdf.ChangeBlock():
+        for child, (target, child_in_target) in merged.items():
+            child_path = _moved(child, moves)
+            target_path = _moved(target, moves)
+            if child.name in protected:
+                # Kept as a plain frame below the body it was merged into
+                destination = target_path.AppendChild(_unique_child(layer, target_path, child.name))
+                _move_spec(layer, child_path, destination)
+                spec = layer.GetPrimAtPath(destination)
+                _strip_body(spec)
+                _set_local_transform(spec, child_in_target)
+                spec.customData = dict(spec.customData, urdf2usd={"keptFrame": True})
+                moves.append((child, destination))
+                detail(f"  + {child.name} -> {target.name} (kept as frame)")
+            else:
+                # Dissolved: its visuals and colliders move to the parent body
+                for name in list(layer.GetPrimAtPath(child_path).nameChildren.keys()):
+                    destination = target_path.AppendChild(_unique_child(layer, target_path, f"{child.name}_{name}"))
+                    _move_spec(layer, child_path.AppendChild(name), destination)
+                    local = children_local[child].get(name)
+                    if local is not None:
+                        _set_local_transform(layer.GetPrimAtPath(destination), local * child_in_target)
+                    moves.append((child.AppendChild(name), destination))
+                del layer.GetPrimAtPath(child_path.GetParentPath()).nameChildren[child_path.name]
+                moves.append((child, target_path))
+                detail(f"  + {child.name} -> {target.name}")
+
+        # Fixed joints between merged bodies go away
+        for _, joint in parent_of.values():
+            path = _moved(joint.GetPath(), moves)
+            parent_spec = layer.GetPrimAtPath(path.GetParentPath())
+            if parent_spec and path.name in parent_spec.nameChildren:
+                del parent_spec.nameChildren[path.name]
+
+        _remap_targets(layer, moves)
+
+        # Bodies point at the survivor (not at a kept frame) with the joint
+        # frame expressed relative to it
+        for joint_path, index, target, local in rebased:
+            spec = layer.GetPrimAtPath(_moved(joint_path, moves))
+            rel_spec = spec.relationships[f"physics:body{index}"]
+            rel_spec.targetPathList.ClearEdits()
+            rel_spec.targetPathList.explicitItems = [target]
+            for name, type_name, value in ((f"physics:localPos{index}", Sdf.ValueTypeNames.Point3f, Gf.Vec3f(local.ExtractTranslation())),
+                                           (f"physics:localRot{index}", Sdf.ValueTypeNames.Quatf, Gf.Quatf(local.ExtractRotationQuat()))):
+                attr_spec = spec.attributes.get(name) or Sdf.AttributeSpec(spec, name, type_name)
+                attr_spec.default = value
+
+        for target, properties in masses.items():
+            if properties is not None:
+                _write_mass(layer, _moved(target, moves), properties)
+
+    for name in sorted(set(missing_mass)):
+        print(f"Warning: {name} has no authored mass, merged link masses were not added to it")
+
+    bodies_after = _count_bodies(stage, robot_prim_path)
+    PROFILER.count("fixed_joints_merged", len(merged))
+    print(f"  Articulation: {bodies_before} -> {bodies_after} rigid bodies, {len(merged)} fixed joint(s) merged, "
+          f"{sum(1 for child in merged if child.name in protected)} frame(s) kept")
+    return {"bodies_before": bodies_before, "bodies_after": bodies_after, "merged": len(merged)}
@@ -0,0 +1,139 @@
+import time
+
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf
+
+from utils.instrumentation import PROFILER, detail
+from utils.sdf_authoring import AttributeBatch
+
+# YAML name -> physics:approximation token
+APPROXIMATIONS = {
+    "convex_hull": "convexHull",
+    "convex_decomposition": "convexDecomposition",
+    "bounding_box": "boundingCube",
+    "bounding_sphere": "boundingSphere",
+}
+
+# Link setting -> (applied schema, attribute, value type) for PhysX cooking
+HULL_SETTINGS = {
+    "hull_vertex_limit": ("PhysxConvexHullCollisionAPI", "physxConvexHullCollision:hullVertexLimit", Sdf.ValueTypeNames.Int),
+}
+DECOMPOSITION_SETTINGS = {
+    "max_convex_hulls": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:maxConvexHulls", Sdf.ValueTypeNames.Int),
+    "hull_vertex_limit": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:hullVertexLimit", Sdf.ValueTypeNames.Int),
+    "voxel_resolution": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:voxelResolution", Sdf.ValueTypeNames.Int),
+    "error_percentage": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:errorPercentage", Sdf.ValueTypeNames.Float),
+    "shrink_wrap": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:shrinkWrap", Sdf.ValueTypeNames.Bool),
+    "min_thickness": ("PhysxConvexDecompositionCollisionAPI", "physxConvexDecompositionCollision:minThickness", Sdf.ValueTypeNames.Float),
+}
+COOKING_SETTINGS = {"convex_hull": HULL_SETTINGS, "convex_decomposition": DECOMPOSITION_SETTINGS}
+
+# PhysX keeps cooked meshes in a local cache keyed by mesh content and
+# cooking parameters, shared by every stage opened on the machine
+LOCAL_MESH_CACHE_SETTING = "/persistent/physics/useLocalMeshCache"
+LOCAL_MESH_CACHE_SIZE_SETTING = "/persistent/physics/localMeshCacheSizeMB"
+DEFAULT_PHYSX_CACHE_SIZE_MB = 1024
+
+# ---------------------------------------------------------
+# COLLISION PASS
+# ---------------------------------------------------------
+def _link_settings(collision_config, link_name):
+    settings = {"approximation": collision_config.get("default", "convex_hull")}
+    settings.update({key: collision_config[key] for key in DECOMPOSITION_SETTINGS if key in collision_config})
+    override = (collision_config.get("links") or {}).get(link_name)
+    if isinstance(override, str):
+        settings["approximation"] = override
+    elif isinstance(override, dict):
+        settings.update(override)
+    return settings
+
+def _owning_link(prim):
+    # Collision meshes sit below the rigid body of their link
+    parent = prim.GetParent()
+    while parent and not parent.IsPseudoRoot():
+        if parent.HasAPI(UsdPhysics.RigidBodyAPI):
+            return parent.GetName()
+        parent = parent.GetParent()
+    return prim.GetParent().GetName()
+
+def uses_decomposition(collision_config):
+    links = (collision_config.get("links") or {}).values()
+    overrides = [link if isinstance(link, str) else (link or {}).get("approximation") for link in links]
+    return "convex_decomposition" in [collision_config.get("default")] + overrides
+
+def warms_cooking_cache(collision_config):
+    # Cooking ahead of time only pays off for decompositions, and only when asked for
+    return bool(collision_config.get("warm_cache", False)) and uses_decomposition(collision_config)
+
+def apply_collision_settings(stage, robot_prim_path, config_data):
+    # Only the approximation and its cooking parameters are authored. PhysX
+    # cooks them (see warm_cooking_cache) and keeps the result in its cache.
+    print("--- Configuring Collision Approximations ---")
+    collision_config = config_data.get("collision", {}) or {}
+    batch = AttributeBatch()
+
+    colliders = []
+    iterator = iter(Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path)))
+    for prim in iterator:
+        if prim.IsInstance():
+            iterator.PruneChildren()
+        elif prim.IsA(UsdGeom.Mesh) and prim.HasAPI(UsdPhysics.CollisionAPI):
+            colliders.append(prim)
+
+    counts = {}
+    for prim in colliders:
+        link = _owning_link(prim)
+        settings = _link_settings(collision_config, link)
+        approximation = settings["approximation"]
+        if approximation not in APPROXIMATIONS:
+            print(f"Warning: Unknown collision approximation '{approximation}' for link '{link}'")
+            continue
+        counts[approximation] = counts.get(approximation, 0) + 1
+
+        if "PhysicsMeshCollisionAPI" not in prim.GetAppliedSchemas():
+            prim.AddAppliedSchema("PhysicsMeshCollisionAPI")
+        batch.set(prim.GetPath(), "physics:approximation", Sdf.ValueTypeNames.Token, APPROXIMATIONS[approximation], Sdf.VariabilityUniform)
+        cooking = COOKING_SETTINGS.get(approximation, {})
+        for key, (schema, name, value_type) in cooking.items():
+            if key not in settings: continue
+            if schema not in prim.GetAppliedSchemas():
+                prim.AddAppliedSchema(schema)
+            batch.set(prim.GetPath(), name, value_type, settings[key])
+        parameters = ", ".join(f"{key}={settings[key]}" for key in cooking if key in settings)
+        detail(f"  + Link: {link} | {prim.GetName()} -> {APPROXIMATIONS[approximation]}" + (f" ({parameters})" if parameters else ""))
+
+    authored = batch.commit(stage.GetEditTarget().GetLayer())
+    PROFILER.count("collision_meshes", len(colliders))
+
+    breakdown = ", ".join(f"{name}: {count}" for name, count in sorted(counts.items())) or "none"
+    print(f"  Collision: {len(colliders)} mesh(es) ({breakdown}), {authored} attribute(s)")
+
+# ---------------------------------------------------------
+# PHYSX COOKING CACHE (Kit only)
+# ---------------------------------------------------------
+def warm_cooking_cache(usd_path, config_data):
+    # Loads the robot into PhysX once so every collider is cooked now and
+    # stored in the local mesh cache. Later conversions and simulation loads
+    # of the same mesh and parameters, on any robot, reuse the cooked data.
+    import carb.settings
+    import omni.usd
+    from omni.physx import get_physx_interface
+
+    collision_config = config_data.get("collision", {}) or {}
+    settings = carb.settings.get_settings()
+    settings.set_bool(LOCAL_MESH_CACHE_SETTING, True)
+    settings.set_int(LOCAL_MESH_CACHE_SIZE_SETTING, int(collision_config.get("cache_size_mb", DEFAULT_PHYSX_CACHE_SIZE_MB)))
+
+    # Visual meshes sit behind payloads and are not needed for cooking,
+    # colliders stay in the loaded part of the stage
+    context = omni.usd.get_context()
+    with PROFILER.stage("kit_stage_open"):
+        context.open_stage(usd_path, load_set=omni.usd.UsdContextInitialLoadSet.LOAD_NONE)
+    try:
+        start = time.perf_counter()
+        physx = get_physx_interface()
+        physx.force_load_physics_from_usd()
+        physx.release_physics_objects()
+        # A second run of the same robot only reads the cache
+        print(f"  Collision cooking: {time.perf_counter() - start:.2f} s (PhysX local mesh cache)")
+    finally:
+        context.close_stage()
@@ -0,0 +1,68 @@
+# ---------------------------------------------------------
+# CONFIG DIFF FOR INCREMENTAL RE-APPLY
+# ---------------------------------------------------------
+# Sections that can be patched on an existing USD. A change anywhere
+# else (URDF path, import options, ...) requires a full conversion.
+PATCHABLE_SECTIONS = {"files_path", "default_drive", "joints", "sensors", "ros2"}
+
+# ROS 2 keys owned by a single feature graph
+ROS2_FEATURE_KEYS = {
+    "publish_tf": "tf",
+    "tf_rate_hz": "tf",
+    "publish_tf_static": "tf",
+    "publish_joint_states": "joint_states",
+    "topic_joint_states": "joint_states",
+    "joint_states_rate_hz": "joint_states",
+    "mobile_base": "mobile_base",
+}
+
+def _changed_keys(old, new):
+    old = old or {}
+    new = new or {}
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+
+def plan_reapply(old_config, new_config):
+    plan = {
+        "full": None,
+        "joints": set(),
+        "all_joints": False,
+        "sensors": set(),
+        "ros2_features": set(),
+        "all_ros2": False,
+    }
+
+    for section in _changed_keys(old_config, new_config):
+        if section not in PATCHABLE_SECTIONS:
+            plan["full"] = f"section '{section}' changed"
+            return plan
+
+    if old_config.get("files_path") != new_config.get("files_path"):
+        plan["full"] = "files_path changed"
+        return plan
+
+    # Drives
+    if old_config.get("default_drive") != new_config.get("default_drive"):
+        plan["all_joints"] = True
+    plan["joints"] = _changed_keys(old_config.get("joints"), new_config.get("joints"))
+
+    # Sensors (prims and their graphs)
+    plan["sensors"] = _changed_keys(old_config.get("sensors"), new_config.get("sensors"))
+    plan["ros2_features"] |= {f"sensor:{name}" for name in plan["sensors"]}
+
+    # ROS 2 graphs
+    old_ros = old_config.get("ros2", {}) or {}
+    new_ros = new_config.get("ros2", {}) or {}
+    for key in _changed_keys(old_ros, new_ros):
+        if key == "controllers":
+            changed = _changed_keys(old_ros.get("controllers"), new_ros.get("controllers"))
+            plan["ros2_features"] |= {f"controller:{name}" for name in changed}
+        elif key in ROS2_FEATURE_KEYS:
+            plan["ros2_features"].add(ROS2_FEATURE_KEYS[key])
+        else:
+            # Global or unknown keys affect every graph
+            plan["all_ros2"] = True
+
+    return plan
+
+def is_empty_plan(plan):
+    return not (plan["all_joints"] or plan["joints"] or plan["sensors"] or plan["all_ros2"] or plan["ros2_features"])
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+
+from utils.urdf_parser import find_mesh_uris, resolve_mesh_uri
+
+# Bump whenever a change alters the generated USD for identical inputs
+CONVERTER_VERSION = "1.2.0"
+MANIFEST_SUFFIX = ".manifest.json"
+
+# ---------------------------------------------------------
+# CACHE KEY
+# ---------------------------------------------------------
+def _hash_file(hasher, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+
+def compute_source_key(urdf_path, mesh_paths=None):
+    # mesh_paths maps mesh URIs to files (package resolver), so meshes in
+    # ROS packages are hashed too
+    hasher = hashlib.sha256()
+    hasher.update(CONVERTER_VERSION.encode())
+
+    # URDF
+    _hash_file(hasher, urdf_path)
+
+    # Every mesh referenced by the URDF
+    urdf_dir = os.path.dirname(os.path.abspath(urdf_path))
+    for uri in sorted(find_mesh_uris(urdf_path)):
+        hasher.update(uri.encode())
+        mesh_path = mesh_paths.get(uri) if mesh_paths is not None else resolve_mesh_uri(uri, urdf_dir)
+        if mesh_path and os.path.isfile(mesh_path):
+            _hash_file(hasher, mesh_path)
+        else:
+            hasher.update(b"<unresolved>")
+
+    return hasher.hexdigest()
+
+def compute_cache_key(source_key, config_data):
+    # Resolved robot YAML on top of the imported sources
+    hasher = hashlib.sha256(source_key.encode())
+    hasher.update(json.dumps(config_data, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+# ---------------------------------------------------------
+# SIDECAR MANIFEST
+# ---------------------------------------------------------
+def manifest_path(usd_path):
+    return usd_path + MANIFEST_SUFFIX
+
+def load_manifest(usd_path):
+    path = manifest_path(usd_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_cache_hit(usd_path, cache_key):
+    if not os.path.exists(usd_path):
+        return False
+    manifest = load_manifest(usd_path)
+    if manifest is None or manifest.get("cache_key") != cache_key:
+        return False
+    # Layered output is only up to date if every sublayer is still there
+    return all(os.path.exists(path) for path in manifest.get("layers", []))
+
+def write_manifest(usd_path, cache_key, source_key, prim_path, config_data, layers=None):
+    # The applied config is kept so later runs can patch only what changed
+    manifest = {
+        "cache_key": cache_key,
+        "source_key": source_key,
+        "converter_version": CONVERTER_VERSION,
+        "prim_path": prim_path,
+        "config": config_data,
+        "layers": layers or [],
+    }
+    with open(manifest_path(usd_path), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+def clear_manifest(usd_path):
+    path = manifest_path(usd_path)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+DEFAULT_CACHE_SIZE_MB = 1024
+
+def default_cache_dir():
+    # Shared by every robot and every worker process on the machine
+    return os.environ.get("URDF2USD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "urdf2usd_ros"))
+
+# ---------------------------------------------------------
+# CONTENT-ADDRESSED DISK CACHE
+# ---------------------------------------------------------
+class DiskCache:
+    # Entries are files named after their key. Reads refresh the mtime, so
+    # evicting the oldest mtimes first gives LRU order across processes.
+    def __init__(self, name, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024, root=None, suffix=".bin"):
+        self.root = os.path.join(root or default_cache_dir(), name)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + self.suffix)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        # Called once after a pass rather than on every put
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(self.suffix): continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                # Already evicted by another process
+                pass
+            total -= size
+
+    def summary(self):
+        return f"{self.hits} hit(s), {self.misses} miss(es), {self.evictions} eviction(s)"
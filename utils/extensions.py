@@ -0,0 +1,47 @@
+import time
+
+from isaacsim.core.utils.extensions import enable_extension
+
+from utils.instrumentation import PROFILER, detail
+
+# ---------------------------------------------------------
+# ON-DEMAND EXTENSION LOADING
+# ---------------------------------------------------------
+# Extensions are enabled only when the robot config needs them
+_enabled_extensions = set()
+
+GRAPH_EXTENSIONS = ["isaacsim.core.nodes", "omni.graph.action", "omni.graph.nodes_core"]
+
+def require_extensions(names):
+    for name in names:
+        if name in _enabled_extensions:
+            continue
+        start = time.perf_counter()
+        with PROFILER.stage(f"extension:{name}"):
+            enable_extension(name)
+        _enabled_extensions.add(name)
+        detail(f"  + Enabled Extension: {name} ({(time.perf_counter() - start) * 1000.0:.0f} ms)")
+
+def sensor_extensions(config_data):
+    names = []
+    for settings in config_data.get("sensors", {}).values():
+        stype = settings.get("type")
+        if stype == "imu":
+            names.append("isaacsim.sensors.physics")
+        elif stype == "lidar" and settings.get("implementation", "physx").lower() == "rtx":
+            names.append("isaacsim.sensors.rtx")
+        elif stype == "lidar":
+            names.append("isaacsim.sensors.physx")
+    return list(dict.fromkeys(names))
+
+def ros2_extensions(config_data):
+    ros_config = config_data.get("ros2", {})
+    if not ros_config.get("enabled", False):
+        return []
+
+    names = GRAPH_EXTENSIONS + ["isaacsim.ros2.bridge"]
+    if ros_config.get("mobile_base", {}).get("enabled", False):
+        names.append("isaacsim.robot.wheeled_robots")
+
+    # Graph nodes reading sensors live in the sensor extensions
+    return names + sensor_extensions(config_data)
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# ---------------------------------------------------------
+# PIPELINE PROFILER
+# ---------------------------------------------------------
+class Profiler:
+    # Records timed stages and counters per robot. Stages may nest (e.g. one
+    # og.Controller.edit inside the ROS 2 stage) and are exported both as a
+    # JSON summary and as Chrome trace events (chrome://tracing, Perfetto).
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.robot = None
+        self.events = []
+        self.counters = {}
+        self.quiet = False
+
+    def set_robot(self, robot):
+        self.robot = robot
+
+    @contextmanager
+    def stage(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append({
+                "robot": self.robot,
+                "name": name,
+                "start": start - self.origin,
+                "seconds": time.perf_counter() - start,
+                "args": args,
+            })
+
+    def count(self, name, amount=1):
+        counters = self.counters.setdefault(self.robot, {})
+        counters[name] = counters.get(name, 0) + amount
+
+    def summary(self):
+        robots = {}
+        for event in self.events:
+            entry = robots.setdefault(event["robot"] or "", {"stages": [], "counters": {}})
+            entry["stages"].append({"name": event["name"], "seconds": round(event["seconds"], 6), **event["args"]})
+        for robot, counters in self.counters.items():
+            robots.setdefault(robot or "", {"stages": [], "counters": {}})["counters"] = dict(counters)
+        return {"total_seconds": round(time.perf_counter() - self.origin, 6), "robots": robots}
+
+    def write_json(self, path, **extra):
+        with open(path, 'w') as f:
+            json.dump({**extra, **self.summary()}, f, indent=2)
+
+    def write_chrome_trace(self, path):
+        pid = os.getpid()
+        trace = []
+        for event in self.events:
+            trace.append({
+                "name": event["name"],
+                "cat": event["robot"] or "global",
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["seconds"] * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": event["args"],
+            })
+        for robot, counters in self.counters.items():
+            trace.append({"name": "counters", "cat": robot or "global", "ph": "C", "ts": 0, "pid": pid, "args": counters})
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+    def print_robot_summary(self, robot):
+        stages = [event for event in self.events if event["robot"] == robot]
+        print(f"--- Timing: {robot} ---")
+        for event in stages:
+            print(f"  {event['name']:<32} {event['seconds'] * 1000.0:10.1f} ms")
+        for name, value in self.counters.get(robot, {}).items():
+            print(f"  {name:<32} {value:10d}")
+
+PROFILER = Profiler()
+
+def detail(message):
+    # Per-joint / per-sensor lines, suppressed in quiet mode
+    if not PROFILER.quiet:
+        print(message)
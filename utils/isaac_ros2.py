@@ -1,429 +1,633 @@
 import omni.graph.core as og
-from isaacsim.core.utils.extensions import enable_extension
-from pxr import Usd, UsdPhysics, Sdf
-
-# Enable Extensions
-enable_extension("isaacsim.core.nodes")
-enable_extension("omni.graph.action")
-enable_extension("omni.graph.nodes_core")
-enable_extension("isaacsim.ros2.bridge")
-enable_extension("isaacsim.sensors.physics")
-enable_extension("isaacsim.robot.wheeled_robots") 
-
-def create_ros2_bridge(stage, robot_prim_path, config_data):
-    ros_config = config_data.get("ros2", {})
-    if not ros_config.get("enabled", False):
-        print(f"--- ROS 2 Bridge Disabled for {robot_prim_path} ---")
-        return
-
-    print(f"--- Building ROS 2 Action Graphs for {robot_prim_path} ---")
+from pxr import Sdf, UsdPhysics
+
+from utils.articulation_merge import KEPT_FRAME_KEY
+from utils.extensions import require_extensions, ros2_extensions
+from utils.instrumentation import PROFILER, detail
+from utils.ros2_qos import qos_profile_json
+from utils.stage_index import StageIndex
+
+# Graph prim names owned by each feature, used for incremental re-apply
+FIXED_GRAPH_FEATURES = {"ROS2_TF": "tf", "ROS2_JointStates": "joint_states", "ROS2_MobileBase": "mobile_base"}
+PREFIXED_GRAPH_FEATURES = [
+    ("ROS2_Camera_", "sensor"),
+    ("ROS2_Lidar_", "sensor"),
+    ("ROS2_IMU_", "sensor"),
+    ("ROS2_Ctrl_", "controller"),
+]
+
+# Graphs holding several features ("grouped" and "shared" layouts)
+GROUP_GRAPHS = {"ROS2_Graph", "ROS2_Robot", "ROS2_Sensors"}
+GRAPH_LAYOUTS = ("per_feature", "grouped", "shared")
+
+# Default OnPlaybackTick rate used to turn rate_hz into a tick decimation
+DEFAULT_TICK_RATE_HZ = 60.0
+
+# Tick, context and sim-time nodes shared by every feature in a graph
+SHARED_NODES = {
+    "OnTick": "omni.graph.action.OnPlaybackTick",
+    "ReadContext": "isaacsim.ros2.bridge.ROS2Context",
+    "SimTime": "isaacsim.core.nodes.IsaacReadSimulationTime",
+}
+
+def _graph_feature(graph_name):
+    if graph_name in FIXED_GRAPH_FEATURES:
+        return FIXED_GRAPH_FEATURES[graph_name]
+    if graph_name in GROUP_GRAPHS:
+        return "group"
+    for prefix, kind in PREFIXED_GRAPH_FEATURES:
+        if graph_name.startswith(prefix):
+            return f"{kind}:{graph_name[len(prefix):]}"
+    return None
+
+def _wants(features, feature):
+    return features is None or feature in features
+
+def _remove_feature_graphs(stage, index, features):
+    for name, graph_path in list(index.graphs.items()):
+        feature = _graph_feature(name)
+        if feature is not None and _wants(features, feature):
+            stage.RemovePrim(graph_path)
+            index.remove(graph_path)
+            print(f"  - Removed Graph: {graph_path}")
+
+# ---------------------------------------------------------
+# GRAPH FRAGMENTS
+# ---------------------------------------------------------
+class GraphFragment:
+    # Nodes, values and connections of one feature. The shared OnTick,
+    # ReadContext and SimTime nodes are referenced by those names and are
+    # created once per graph when the fragment is emitted.
+    def __init__(self, feature, graph_name, group):
+        self.feature = feature
+        self.graph_name = graph_name    # graph used by the per_feature layout
+        self.group = group              # "robot" or "sensors" for the grouped layout
+        self.nodes = []
+        self.values = []
+        self.connections = []
+        self.messages = []
+        self.rate_hz = None             # effective publish rate, None if not rate controlled
+        self.summary = None             # printed even in quiet mode
+
+    @property
+    def prefix(self):
+        return self.graph_name[len("ROS2_"):]
+
+    def set_qos(self, node, ros_config, reference):
+        # Named or inline QoS profile on a publisher or subscriber, the bridge
+        # default is kept when none is assigned
+        qos = qos_profile_json(ros_config, reference)
+        if qos:
+            self.values.append((f"{node}.inputs:qosProfile", qos))
+            self.messages.append(f"QoS {node}: {reference if isinstance(reference, str) else 'inline'}")
+
+    def add_rate_gate(self, gated_nodes, rate_hz, tick_rate):
+        # Run gated_nodes on every Nth tick through an IsaacSimulationGate
+        step = 1
+        if rate_hz and rate_hz < tick_rate:
+            step = max(1, int(round(tick_rate / rate_hz)))
+        self.rate_hz = tick_rate / step
+        self.messages.append(f"Rate: {self.rate_hz:g} Hz (every {step} tick(s))")
+        if step == 1:
+            return
+
+        self.nodes.append(("Gate", "isaacsim.core.nodes.IsaacSimulationGate"))
+        self.values.append(("Gate.inputs:step", step))
+        self.connections = [
+            ("Gate.outputs:execOut", dst) if src == "OnTick.outputs:tick" and dst.split(".", 1)[0] in gated_nodes else (src, dst)
+            for src, dst in self.connections
+        ]
+        self.connections.append(("OnTick.outputs:tick", "Gate.inputs:execIn"))
+
+def _tf_frames(index):
+    # Parent -> child frame paths, split by whether the transform can change.
+    # Fixed joints and frames kept by merge_fixed_joints are static, every
+    # other joint is dynamic. Joints anchored to the world are left out.
+    # Also returns how many static frames are kept frames.
+    static, dynamic = {}, {}
+    kept = 0
+    for name, prim in index.joints.items():
+        joint = UsdPhysics.Joint(prim)
+        body0 = joint.GetBody0Rel().GetTargets()
+        body1 = joint.GetBody1Rel().GetTargets()
+        if not body0 or not body1: continue
+        frames = static if index.joint_types[name] == "PhysicsFixedJoint" else dynamic
+        frames.setdefault(body0[0].pathString, []).append(body1[0].pathString)
+
+    for path in index.links.values():
+        prim = index.stage.GetPrimAtPath(path)
+        if prim.GetCustomDataByKey(KEPT_FRAME_KEY):
+            static.setdefault(prim.GetParent().GetPath().pathString, []).append(path)
+            kept += 1
+    return static, dynamic, kept
+
+def _topic_qos(ros_config, topic):
+    return (ros_config.get("qos") or {}).get(topic)
+
+def _add_tf_publisher(fragment, ros_config, node, parent, targets, topic, static=False):
+    fragment.nodes.append((node, "isaacsim.ros2.bridge.ROS2PublishTransformTree"))
+    fragment.values += [
+        (f"{node}.inputs:parentPrim", [Sdf.Path(parent)]),
+        (f"{node}.inputs:targetPrims", [Sdf.Path(target) for target in targets]),
+        (f"{node}.inputs:topicName", topic),
+    ]
+    if static:
+        # Transient local durability, so late subscribers still get the frames
+        fragment.values.append((f"{node}.inputs:staticPublisher", True))
+    fragment.connections += [
+        ("RunOnce.outputs:step" if static else "OnTick.outputs:tick", f"{node}.inputs:execIn"),
+        ("ReadContext.outputs:context", f"{node}.inputs:context"),
+        ("SimTime.outputs:simulationTime", f"{node}.inputs:timeStamp"),
+    ]
+    if not static:
+        # tf_static keeps the node's transient local profile
+        fragment.set_qos(node, ros_config, _topic_qos(ros_config, "tf"))
+
+def _tf_fragment(ros_config, target_path, tick_rate, index=None):
+    fragment = GraphFragment("tf", "ROS2_TF", "robot")
+    fragment.messages = ["TF Publisher Graph Built Successfully. Topic: tf"]
+
+    static, dynamic, kept = {}, {}, 0
+    if index is not None and ros_config.get("publish_tf_static", True):
+        static, dynamic, kept = _tf_frames(index)
+    if not static:
+        # Whole tree from the articulation root on every tick
+        _add_tf_publisher(fragment, ros_config, "PubTF", target_path, [target_path], "tf")
+        fragment.add_rate_gate({"PubTF"}, ros_config.get("tf_rate_hz"), tick_rate)
+        return fragment
+
+    # Static frames are sent once per playback on tf_static
+    fragment.messages = ["TF Publisher Graph Built Successfully. Topics: tf, tf_static"]
+    fragment.nodes.append(("RunOnce", "isaacsim.core.nodes.OgnIsaacRunOneSimulationFrame"))
+    fragment.connections.append(("OnTick.outputs:tick", "RunOnce.inputs:execIn"))
+    for i, (parent, children) in enumerate(sorted(static.items())):
+        _add_tf_publisher(fragment, ros_config, f"PubTFStatic_{i}", parent, children, "tf_static", static=True)
+
+    # Links that are still rigid bodies behind a fixed joint would be published
+    # by the articulation publisher too, so then each moving joint's parent
+    # gets its own publisher instead. Kept frames are not bodies, and a
+    # world-anchored fixed joint has no child frame in static at all.
+    static_frames = sum(len(children) for children in static.values())
+    dynamic_frames = sum(len(children) for children in dynamic.values())
+    if static_frames > kept:
+        gated = set()
+        for i, (parent, children) in enumerate(sorted(dynamic.items())):
+            _add_tf_publisher(fragment, ros_config, f"PubTF_{i}", parent, children, "tf")
+            gated.add(f"PubTF_{i}")
+    else:
+        _add_tf_publisher(fragment, ros_config, "PubTF", target_path, [target_path], "tf")
+        gated = {"PubTF"}
+    fragment.add_rate_gate(gated, ros_config.get("tf_rate_hz"), tick_rate)
+
+    # One TFMessage per publisher and tick, one transform per frame. Kept
+    # frames are not articulation links, the whole-tree publisher skipped them.
+    before = (static_frames - kept + dynamic_frames) * fragment.rate_hz
+    after = dynamic_frames * fragment.rate_hz
+    fragment.messages.append(f"Static: {static_frames} frame(s) on tf_static, published once ({len(static)} publisher(s))")
+    fragment.messages.append(f"Dynamic: {dynamic_frames} frame(s) on tf ({len(gated)} publisher(s))")
+    fragment.summary = (f"TF: {before:g} -> {after:g} transforms/s, {fragment.rate_hz:g} -> {len(gated) * fragment.rate_hz:g} messages/s, "
+                        f"{static_frames} static frame(s) on tf_static")
+    return fragment
+
+def _joint_state_fragment(ros_config, target_path, tick_rate):
+    fragment = GraphFragment("joint_states", "ROS2_JointStates", "robot")
+    fragment.nodes = [
+        ("PubJoints", "isaacsim.ros2.bridge.ROS2PublishJointState"),
+    ]
+    fragment.values = [
+        ("PubJoints.inputs:targetPrim", [Sdf.Path(target_path)]),
+        ("PubJoints.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("PubJoints.inputs:topicName", ros_config.get("topic_joint_states", "joint_states")),
+    ]
+    fragment.connections = [
+        ("OnTick.outputs:tick", "PubJoints.inputs:execIn"),
+        ("ReadContext.outputs:context", "PubJoints.inputs:context"),
+        ("SimTime.outputs:simulationTime", "PubJoints.inputs:timeStamp"),
+    ]
+    fragment.messages = [f"Joint State Publisher Graph Built Successfully. Topic: {ros_config.get('topic_joint_states', 'joint_states')}"]
+    fragment.set_qos("PubJoints", ros_config, _topic_qos(ros_config, "joint_states"))
+    fragment.add_rate_gate({"PubJoints"}, ros_config.get("joint_states_rate_hz"), tick_rate)
+    return fragment
+
+def _mobile_base_fragment(ros_config, target_path, tick_rate):
+    mb_config = ros_config.get("mobile_base", {})
+    fragment = GraphFragment("mobile_base", "ROS2_MobileBase", "robot")
+    fragment.nodes = [
+        ("SubTwist", "isaacsim.ros2.bridge.ROS2SubscribeTwist"),
+        ("ScaleLin", "isaacsim.core.nodes.OgnIsaacScaleToFromStageUnit"),
+        ("BreakLin", "omni.graph.nodes.BreakVector3"),
+        ("BreakAng", "omni.graph.nodes.BreakVector3"),
+        ("DiffController", "isaacsim.robot.wheeled_robots.DifferentialController"),
+        ("ArtControllerBase", "isaacsim.core.nodes.IsaacArticulationController"),
+        ("ComputeOdom", "isaacsim.core.nodes.IsaacComputeOdometry"),
+        ("PubOdom", "isaacsim.ros2.bridge.ROS2PublishOdometry"),
+        ("PubOdomTf", "isaacsim.ros2.bridge.ROS2PublishRawTransformTree"),
+    ]
+    fragment.values = [
+        # Twist Subscriber
+        ("SubTwist.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("SubTwist.inputs:topicName", mb_config.get("topic_cmd_vel", "cmd_vel")),
+
+        # Controller Properties
+        ("DiffController.inputs:maxAcceleration", mb_config.get("max_acceleration", 1.0)),
+        ("DiffController.inputs:maxAngularAcceleration", mb_config.get("max_angular_acceleration", 1.0)),
+        ("DiffController.inputs:maxAngularSpeed", mb_config.get("max_angular_speed", 1.0)),
+        ("DiffController.inputs:maxDeceleration", mb_config.get("max_deceleration", 1.0)),
+        ("DiffController.inputs:maxLinearSpeed", mb_config.get("max_linear_speed", 0.0)),
+        ("DiffController.inputs:maxWheelSpeed", mb_config.get("max_wheel_speed", 0.0)),
+        ("DiffController.inputs:wheelRadius", mb_config.get("wheel_radius", 0.05)),
+        ("DiffController.inputs:wheelDistance", mb_config.get("wheel_base", 0.3)),
+        ("ArtControllerBase.inputs:targetPrim", [Sdf.Path(target_path)]),
+        ("ArtControllerBase.inputs:jointNames", mb_config.get("wheel_joints")),
+
+        # Odometry Properties
+        ("ComputeOdom.inputs:chassisPrim", [Sdf.Path(target_path)]),
+
+        # Odometry Publisher
+        ("PubOdom.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("PubOdom.inputs:topicName", mb_config.get("topic_odom", "odom")),
+        ("PubOdom.inputs:chassisFrameId", mb_config.get("frame_base", "base_footprint")),
+        ("PubOdom.inputs:odomFrameId", mb_config.get("frame_odom", "odom")),
+
+        # Odometry TF Publisher
+        ("PubOdomTf.inputs:childFrameId", mb_config.get("frame_base", "base_footprint")),
+        ("PubOdomTf.inputs:parentFrameId", mb_config.get("frame_odom", "odom")),
+        ("PubOdomTf.inputs:topicName", "tf"),
+    ]
+    fragment.connections = [
+        # Execution
+        ("OnTick.outputs:tick", "SubTwist.inputs:execIn"),
+        ("OnTick.outputs:tick", "ArtControllerBase.inputs:execIn"),
+        ("OnTick.outputs:tick", "ComputeOdom.inputs:execIn"),
+        ("OnTick.outputs:tick", "PubOdom.inputs:execIn"),
+        ("OnTick.outputs:tick", "PubOdomTf.inputs:execIn"),
+        ("OnTick.outputs:tick", "DiffController.inputs:execIn"),
+        ("OnTick.outputs:deltaSeconds", "DiffController.inputs:dt"),
+
+        # Cmd_vel Logic
+        ("ReadContext.outputs:context", "SubTwist.inputs:context"),
+        ("SubTwist.outputs:linearVelocity", "ScaleLin.inputs:value"),
+        ("ScaleLin.outputs:result", "BreakLin.inputs:tuple"),
+        ("SubTwist.outputs:angularVelocity", "BreakAng.inputs:tuple"),
+        ("BreakLin.outputs:x", "DiffController.inputs:linearVelocity"),
+        ("BreakAng.outputs:z", "DiffController.inputs:angularVelocity"),
+        ("DiffController.outputs:velocityCommand", "ArtControllerBase.inputs:velocityCommand"),
+
+        # Odom Logic
+        ("ReadContext.outputs:context", "PubOdom.inputs:context"),
+        ("SimTime.outputs:simulationTime", "PubOdom.inputs:timeStamp"),
+        ("ComputeOdom.outputs:position", "PubOdom.inputs:position"),
+        ("ComputeOdom.outputs:orientation", "PubOdom.inputs:orientation"),
+        ("ComputeOdom.outputs:linearVelocity", "PubOdom.inputs:linearVelocity"),
+        ("ComputeOdom.outputs:angularVelocity", "PubOdom.inputs:angularVelocity"),
+
+        # Odometry TF Logic
+        ("ReadContext.outputs:context", "PubOdomTf.inputs:context"),
+        ("SimTime.outputs:simulationTime", "PubOdomTf.inputs:timeStamp"),
+        ("ComputeOdom.outputs:position", "PubOdomTf.inputs:translation"),
+        ("ComputeOdom.outputs:orientation", "PubOdomTf.inputs:rotation"),
+    ]
+    fragment.messages = [f"Mobile Base Graph Built Successfully. Cmd Vel Topic: {mb_config.get('topic_cmd_vel', 'cmd_vel')}, Odom Topic: {mb_config.get('topic_odom', 'odom')}"]
+    fragment.set_qos("SubTwist", ros_config, _topic_qos(ros_config, "cmd_vel"))
+    fragment.set_qos("PubOdom", ros_config, _topic_qos(ros_config, "odom"))
+    fragment.set_qos("PubOdomTf", ros_config, _topic_qos(ros_config, "tf"))
+    # Only odometry is rate limited, cmd_vel keeps driving the wheels every tick
+    fragment.add_rate_gate({"ComputeOdom", "PubOdom", "PubOdomTf"}, mb_config.get("rate_hz"), tick_rate)
+    return fragment
+
+# Camera streams: (config key, ROS2CameraHelper type, node name, default topic suffix)
+CAMERA_STREAMS = [
+    ("rgb", "rgb", "HelperRGB", "rgb"),
+    ("depth", "depth", "HelperDepth", "depth"),
+    ("pcl", "depth_pcl", "HelperPCL", "points"),
+]
+
+def _stream_resolution(settings, stream_cfg):
+    # Per-stream image_width/image_height override the camera, downscale divides it
+    width = stream_cfg.get("image_width", settings.get("image_width", 1280))
+    height = stream_cfg.get("image_height", settings.get("image_height", 720))
+    downscale = stream_cfg.get("downscale", 1)
+    return max(1, int(width // downscale)), max(1, int(height // downscale))
+
+def _camera_fragment(ros_config, name, settings, full_path):
+    if not settings.get("enabled", True):
+        return None
+
+    # Only enabled streams get a helper, streams with equal resolution share a render product
+    streams = []
+    for key, helper_type, node, suffix in CAMERA_STREAMS:
+        stream_cfg = settings.get(key) or {}
+        if stream_cfg.get("enabled", True):
+            streams.append((key, helper_type, node, suffix, stream_cfg, _stream_resolution(settings, stream_cfg)))
+    if not streams:
+        return None
+
+    fragment = GraphFragment(f"sensor:{name}", f"ROS2_Camera_{name}", "sensors")
+    fragment.nodes = [
+        ("RunOnce", "isaacsim.core.nodes.OgnIsaacRunOneSimulationFrame"),
+    ]
+    fragment.connections = [
+        # Initialization (Render Product)
+        ("OnTick.outputs:tick", "RunOnce.inputs:execIn"),
+    ]
+    fragment.messages = [f"Camera {name} Graph Built Successfully"]
+
+    render_products = {}
+    for key, helper_type, node, suffix, stream_cfg, resolution in streams:
+        if resolution not in render_products:
+            rp_node = "CreateRP" if not render_products else f"CreateRP_{resolution[0]}x{resolution[1]}"
+            render_products[resolution] = rp_node
+            fragment.nodes.append((rp_node, "isaacsim.core.nodes.IsaacCreateRenderProduct"))
+            fragment.values += [
+                (f"{rp_node}.inputs:cameraPrim", [Sdf.Path(full_path)]),
+                (f"{rp_node}.inputs:enabled", True),
+                (f"{rp_node}.inputs:width", resolution[0]),
+                (f"{rp_node}.inputs:height", resolution[1]),
+            ]
+            fragment.connections.append(("RunOnce.outputs:step", f"{rp_node}.inputs:execIn"))
+        rp_node = render_products[resolution]
+
+        topic = stream_cfg.get("topic", f"{name}/{suffix}")
+        fragment.nodes.append((node, "isaacsim.ros2.bridge.ROS2CameraHelper"))
+        fragment.values += [
+            (f"{node}.inputs:enableSemanticLabels", stream_cfg.get("enable_semantic_labels", False)),
+            (f"{node}.inputs:enabled", True),
+            (f"{node}.inputs:frameSkipCount", stream_cfg.get("frame_skip", 0)),
+            (f"{node}.inputs:resetSimulationTimeOnStop", stream_cfg.get("reset_sim_time_on_stop", False)),
+            (f"{node}.inputs:type", helper_type),
+            (f"{node}.inputs:nodeNamespace", ros_config.get("namespace", "")),
+            (f"{node}.inputs:topicName", topic),
+            (f"{node}.inputs:frameId", name),
+        ]
+        fragment.connections += [
+            ("OnTick.outputs:tick", f"{node}.inputs:execIn"),
+            ("ReadContext.outputs:context", f"{node}.inputs:context"),
+            (f"{rp_node}.outputs:renderProductPath", f"{node}.inputs:renderProductPath"),
+        ]
+        fragment.messages.append(f"{key.upper()} Topic: {topic} ({resolution[0]}x{resolution[1]})")
+        fragment.set_qos(node, ros_config, stream_cfg.get("qos", settings.get("qos")))
+
+    fragment.messages.append(f"Render Products: {len(render_products)}")
+    return fragment
+
+def _lidar_fragment(ros_config, name, settings, full_path, tick_rate):
+    fragment = GraphFragment(f"sensor:{name}", f"ROS2_Lidar_{name}", "sensors")
+    fragment.nodes = [
+        ("ReadLidar", "isaacsim.sensors.physx.IsaacReadLidarBeams"),
+        ("PubLidar", "isaacsim.ros2.bridge.ROS2PublishLaserScan"),
+    ]
+    fragment.values = [
+        ("ReadLidar.inputs:lidarPrim", [Sdf.Path(full_path)]),
+        ("PubLidar.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("PubLidar.inputs:topicName", settings.get("topic_lidar", f"{name}/scan")),
+        ("PubLidar.inputs:frameId", name),
+    ]
+    fragment.connections = [
+        ("OnTick.outputs:tick", "ReadLidar.inputs:execIn"),
+        ("OnTick.outputs:tick", "PubLidar.inputs:execIn"),
+        ("ReadContext.outputs:context", "PubLidar.inputs:context"),
+        ("SimTime.outputs:simulationTime", "PubLidar.inputs:timeStamp"),
+
+        ("ReadLidar.outputs:azimuthRange", "PubLidar.inputs:azimuthRange"),
+        ("ReadLidar.outputs:depthRange", "PubLidar.inputs:depthRange"),
+        ("ReadLidar.outputs:horizontalFov", "PubLidar.inputs:horizontalFov"),
+        ("ReadLidar.outputs:horizontalResolution", "PubLidar.inputs:horizontalResolution"),
+        ("ReadLidar.outputs:intensitiesData", "PubLidar.inputs:intensitiesData"),
+        ("ReadLidar.outputs:linearDepthData", "PubLidar.inputs:linearDepthData"),
+        ("ReadLidar.outputs:numCols", "PubLidar.inputs:numCols"),
+        # ("ReadLidar.outputs:numRows", "PubLidar.inputs:numRows"),
+        ("ReadLidar.outputs:rotationRate", "PubLidar.inputs:rotationRate"),
+    ]
+    fragment.messages = [f"Lidar {name} Graph Built Successfully. Topic: {settings.get('topic_lidar', f'{name}/scan')}"]
+    fragment.set_qos("PubLidar", ros_config, settings.get("qos"))
+    fragment.add_rate_gate({"ReadLidar", "PubLidar"}, settings.get("rate_hz"), tick_rate)
+    return fragment
+
+def _imu_fragment(ros_config, name, settings, full_path, tick_rate):
+    fragment = GraphFragment(f"sensor:{name}", f"ROS2_IMU_{name}", "sensors")
+    fragment.nodes = [
+        ("ReadImu", "isaacsim.sensors.physics.IsaacReadIMU"),
+        ("PubImu", "isaacsim.ros2.bridge.ROS2PublishImu"),
+    ]
+    fragment.values = [
+        ("ReadImu.inputs:imuPrim", [Sdf.Path(full_path)]),
+        ("ReadImu.inputs:readGravity", settings.get("read_gravity", True)),
+        ("ReadImu.inputs:useLatestData", settings.get("use_latest_data", False)),
+        ("PubImu.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("PubImu.inputs:topicName", settings.get("topic_imu", f"{name}/imu")),
+        ("PubImu.inputs:frameId", name),
+        ("PubImu.inputs:publishAngularVelocity", settings.get("publish_angular_velocity", True)),
+        ("PubImu.inputs:publishLinearAcceleration", settings.get("publish_linear_acceleration", True)),
+        ("PubImu.inputs:publishOrientation", settings.get("publish_orientation", True)),
+    ]
+    fragment.connections = [
+        ("OnTick.outputs:tick", "ReadImu.inputs:execIn"),
+        ("OnTick.outputs:tick", "PubImu.inputs:execIn"),
+        ("ReadContext.outputs:context", "PubImu.inputs:context"),
+        ("SimTime.outputs:simulationTime", "PubImu.inputs:timeStamp"),
+
+        ("ReadImu.outputs:linAcc", "PubImu.inputs:linearAcceleration"),
+        ("ReadImu.outputs:angVel", "PubImu.inputs:angularVelocity"),
+        ("ReadImu.outputs:orientation", "PubImu.inputs:orientation"),
+    ]
+    fragment.messages = [f"IMU {name} Graph Built Successfully. Topic: {settings.get('topic_imu', f'{name}/imu')}"]
+    fragment.set_qos("PubImu", ros_config, settings.get("qos"))
+    # Publishing faster than the sensor updates only repeats samples
+    fragment.add_rate_gate({"ReadImu", "PubImu"}, settings.get("rate_hz", settings.get("update_rate")), tick_rate)
+    return fragment
+
+def _controller_fragment(ros_config, ctrl_name, ctrl_cfg, target_path):
+    fragment = GraphFragment(f"controller:{ctrl_name}", f"ROS2_Ctrl_{ctrl_name}", "robot")
+
+    cmd_out = "SubJoint.outputs:positionCommand"
+    cmd_in = "ArtController.inputs:positionCommand"
+    if ctrl_cfg.get("type") == "velocity":
+        cmd_out = "SubJoint.outputs:velocityCommand"
+        cmd_in = "ArtController.inputs:velocityCommand"
+
+    fragment.nodes = [
+        ("SubJoint", "isaacsim.ros2.bridge.ROS2SubscribeJointState"),
+        ("ArtController", "isaacsim.core.nodes.IsaacArticulationController"),
+    ]
+    fragment.values = [
+        ("SubJoint.inputs:nodeNamespace", ros_config.get("namespace", "")),
+        ("SubJoint.inputs:topicName", ctrl_cfg.get("topic", f"{ctrl_name}/command")),
+        ("ArtController.inputs:targetPrim", [Sdf.Path(target_path)]),
+        ("ArtController.inputs:jointNames", ctrl_cfg.get("joints")),
+    ]
+    fragment.connections = [
+        ("OnTick.outputs:tick", "SubJoint.inputs:execIn"),
+        ("OnTick.outputs:tick", "ArtController.inputs:execIn"),
+        ("ReadContext.outputs:context", "SubJoint.inputs:context"),
+        (cmd_out, cmd_in),
+    ]
+    fragment.messages = [f"Controller {ctrl_name} Graph Built Successfully. Topic: {ctrl_cfg.get('topic', f'{ctrl_name}/command')}"]
+    fragment.set_qos("SubJoint", ros_config, ctrl_cfg.get("qos"))
+    return fragment
+
+# ---------------------------------------------------------
+# GRAPH EMISSION
+# ---------------------------------------------------------
+def _group_fragments(fragments, layout):
+    graphs = {}
+    for fragment in fragments:
+        if layout == "shared":
+            graph_name = "ROS2_Graph"
+        elif layout == "grouped":
+            graph_name = "ROS2_Robot" if fragment.group == "robot" else "ROS2_Sensors"
+        else:
+            graph_name = fragment.graph_name
+        graphs.setdefault(graph_name, []).append(fragment)
+    return graphs
+
+def _node_name(node, fragment, prefixed):
+    if node in SHARED_NODES or not prefixed:
+        return node
+    return f"{fragment.prefix}_{node}"
+
+def _rename(attribute, fragment, prefixed):
+    node, port = attribute.split(".", 1)
+    return f"{_node_name(node, fragment, prefixed)}.{port}"
+
+def _emit_graph(graph_path, fragments, ros_config, prefixed):
+    # prefixed keeps node names unique when several features share a graph
     keys = og.Controller.Keys
 
-    # ========================================================================
-    # FIND ARTICULATION ROOT
-    # ========================================================================
-    target_path = robot_prim_path 
-    root_prim = stage.GetPrimAtPath(robot_prim_path)
-    if not root_prim.HasAPI(UsdPhysics.ArticulationRootAPI):
-        for prim in Usd.PrimRange(root_prim):
-            if prim.HasAPI(UsdPhysics.ArticulationRootAPI):
-                target_path = prim.GetPath().pathString
-                print(f"  Found Articulation Root: {target_path}")
-                break
-
-    # ========================================================================
-    # TF PUBLISHER GRAPH
-    # ========================================================================
-    if ros_config.get("publish_tf", True):
-        graph_path = f"{robot_prim_path}/ROS2_TF"
-        if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
-
+    nodes, values, connections = [], [], []
+    for fragment in fragments:
+        nodes += [(_node_name(node, fragment, prefixed), node_type) for node, node_type in fragment.nodes]
+        values += [(_rename(attribute, fragment, prefixed), value) for attribute, value in fragment.values]
+        connections += [(_rename(src, fragment, prefixed), _rename(dst, fragment, prefixed)) for src, dst in fragment.connections]
+
+    # One tick, one context and one sim-time node fan out to every feature
+    used = {attribute.split(".", 1)[0] for connection in connections for attribute in connection}
+    shared_nodes = [(node, node_type) for node, node_type in SHARED_NODES.items() if node in used]
+    shared_values = []
+    if "ReadContext" in used:
+        shared_values += [
+            ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
+            ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
+        ]
+    if "SimTime" in used:
+        shared_values += [
+            ("SimTime.inputs:resetOnStop", ros_config.get("reset_sim_time_on_stop", False)),
+        ]
+
+    with PROFILER.stage(f"graph:{graph_path.rsplit('/', 1)[-1]}", nodes=len(shared_nodes) + len(nodes)):
         og.Controller.edit(
             {"graph_path": graph_path, "evaluator_name": "execution"},
             {
-                keys.CREATE_NODES: [
-                    ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                    ("SimTime", "isaacsim.core.nodes.IsaacReadSimulationTime"),
-                    ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                    ("PubTF", "isaacsim.ros2.bridge.ROS2PublishTransformTree"),
-                ],
-                keys.SET_VALUES: [
-                    ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                    ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-                    ("SimTime.inputs:resetOnStop", ros_config.get("reset_sim_time_on_stop", False)),
-                    ("PubTF.inputs:parentPrim", [Sdf.Path(target_path)]),
-                    ("PubTF.inputs:targetPrims", [Sdf.Path(target_path)]),
-                    ("PubTF.inputs:topicName", "tf"),
-                ],
-                keys.CONNECT: [
-                    ("OnTick.outputs:tick", "PubTF.inputs:execIn"),
-                    ("ReadContext.outputs:context", "PubTF.inputs:context"),
-                    ("SimTime.outputs:simulationTime", "PubTF.inputs:timeStamp"),
-                ]
+                keys.CREATE_NODES: shared_nodes + nodes,
+                keys.SET_VALUES: shared_values + values,
+                keys.CONNECT: connections,
             }
         )
+    PROFILER.count("attributes_authored", len(shared_values) + len(values))
 
-        print(f"  + TF Publisher Graph Built Successfully. Topic: tf")
+    return len(shared_nodes) + len(nodes)
 
-    # ========================================================================
-    # JOINT STATE PUBLISHER GRAPH
-    # ========================================================================
-    if ros_config.get("publish_joint_states", True):
-        graph_path = f"{robot_prim_path}/ROS2_JointStates"
-        if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
+def create_ros2_bridge(stage, robot_prim_path, config_data, features=None, index=None):
+    # features limits the rebuild to those graphs (incremental re-apply):
+    # "tf", "joint_states", "mobile_base", "sensor:<name>", "controller:<name>"
+    ros_config = config_data.get("ros2", {})
+    if index is None:
+        index = StageIndex(stage, robot_prim_path)
 
-        og.Controller.edit(
-            {"graph_path": graph_path, "evaluator_name": "execution"},
-            {
-                keys.CREATE_NODES: [
-                    ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                    ("SimTime", "isaacsim.core.nodes.IsaacReadSimulationTime"),
-                    ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                    ("PubJoints", "isaacsim.ros2.bridge.ROS2PublishJointState"),
-                ],
-                keys.SET_VALUES: [
-                    ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                    ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-                    ("PubJoints.inputs:targetPrim", [Sdf.Path(target_path)]),
-                    ("PubJoints.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                    ("PubJoints.inputs:topicName", ros_config.get("topic_joint_states", "joint_states")),
-                ],
-                keys.CONNECT: [
-                    ("OnTick.outputs:tick", "PubJoints.inputs:execIn"),
-                    ("ReadContext.outputs:context", "PubJoints.inputs:context"),
-                    ("SimTime.outputs:simulationTime", "PubJoints.inputs:timeStamp"),
-                ]
-            }
-        )
+    layout = ros_config.get("graph_layout", "per_feature")
+    if layout not in GRAPH_LAYOUTS:
+        print(f"Warning: Unknown graph_layout '{layout}', using 'per_feature'")
+        layout = "per_feature"
+    if layout != "per_feature":
+        # Graphs holding several features are always rebuilt as a whole
+        features = None
 
-        print(f"  + Joint State Publisher Graph Built Successfully. Topic: {ros_config.get('topic_joint_states', 'joint_states')}")
+    # Drop graphs being rebuilt, or all of them when the bridge is disabled
+    _remove_feature_graphs(stage, index, features if ros_config.get("enabled", False) else None)
 
+    if not ros_config.get("enabled", False):
+        print(f"--- ROS 2 Bridge Disabled for {robot_prim_path} ---")
+        return
+
+    print(f"--- Building ROS 2 Action Graphs for {robot_prim_path} (Layout: {layout}) ---")
+    require_extensions(ros2_extensions(config_data))
 
     # ========================================================================
-    # 3. MOBILE BASE GRAPH
+    # FIND ARTICULATION ROOT
     # ========================================================================
-    mb_config = ros_config.get("mobile_base", {})
-    if mb_config.get("enabled", False):
-        graph_path = f"{robot_prim_path}/ROS2_MobileBase"
-        if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
+    target_path = robot_prim_path
+    if index.articulation_root and index.articulation_root != robot_prim_path:
+        target_path = index.articulation_root
+        print(f"  Found Articulation Root: {target_path}")
 
-        og.Controller.edit(
-            {"graph_path": graph_path, "evaluator_name": "execution"},
-            {
-                keys.CREATE_NODES: [
-                    ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                    ("SimTime", "isaacsim.core.nodes.IsaacReadSimulationTime"),
-                    ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                    ("SubTwist", "isaacsim.ros2.bridge.ROS2SubscribeTwist"),
-                    ("ScaleLin", "isaacsim.core.nodes.OgnIsaacScaleToFromStageUnit"),
-                    ("BreakLin", "omni.graph.nodes.BreakVector3"),
-                    ("BreakAng", "omni.graph.nodes.BreakVector3"),
-                    ("DiffController", "isaacsim.robot.wheeled_robots.DifferentialController"),
-                    ("ArtControllerBase", "isaacsim.core.nodes.IsaacArticulationController"),
-                    ("ComputeOdom", "isaacsim.core.nodes.IsaacComputeOdometry"),
-                    ("PubOdom", "isaacsim.ros2.bridge.ROS2PublishOdometry"),
-                    ("PubOdomTf", "isaacsim.ros2.bridge.ROS2PublishRawTransformTree"),
-                ],
-                keys.SET_VALUES: [
-                    ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                    ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-
-                    # Twist Subscriber
-                    ("SubTwist.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                    ("SubTwist.inputs:topicName", mb_config.get("topic_cmd_vel", "cmd_vel")),
-                    
-                    # Controller Properties
-                    ("DiffController.inputs:maxAcceleration", mb_config.get("max_acceleration", 1.0)),
-                    ("DiffController.inputs:maxAngularAcceleration", mb_config.get("max_angular_acceleration", 1.0)),
-                    ("DiffController.inputs:maxAngularSpeed", mb_config.get("max_angular_speed", 1.0)),
-                    ("DiffController.inputs:maxDeceleration", mb_config.get("max_deceleration", 1.0)),
-                    ("DiffController.inputs:maxLinearSpeed", mb_config.get("max_linear_speed", 0.0)),
-                    ("DiffController.inputs:maxWheelSpeed", mb_config.get("max_wheel_speed", 0.0)),
-                    ("DiffController.inputs:wheelRadius", mb_config.get("wheel_radius", 0.05)),
-                    ("DiffController.inputs:wheelDistance", mb_config.get("wheel_base", 0.3)),
-                    ("ArtControllerBase.inputs:targetPrim", [Sdf.Path(target_path)]),
-                    ("ArtControllerBase.inputs:jointNames", mb_config.get("wheel_joints")),
-
-                    # Odometry Properties
-                    ("ComputeOdom.inputs:chassisPrim", [Sdf.Path(target_path)]),
-
-                    # Odometry Publisher
-                    ("PubOdom.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                    ("PubOdom.inputs:topicName", mb_config.get("topic_odom", "odom")),
-                    ("PubOdom.inputs:chassisFrameId", mb_config.get("frame_base", "base_footprint")),
-                    ("PubOdom.inputs:odomFrameId", mb_config.get("frame_odom", "odom")),
-
-                    # Odometry TF Publisher
-                    ("PubOdomTf.inputs:childFrameId", mb_config.get("frame_base", "base_footprint")),
-                    ("PubOdomTf.inputs:parentFrameId", mb_config.get("frame_odom", "odom")),
-                    ("PubOdomTf.inputs:topicName", "tf"),
-                ],
-                keys.CONNECT: [
-                    # Execution
-                    ("OnTick.outputs:tick", "SubTwist.inputs:execIn"),
-                    ("OnTick.outputs:tick", "ArtControllerBase.inputs:execIn"),
-                    ("OnTick.outputs:tick", "ComputeOdom.inputs:execIn"),
-                    ("OnTick.outputs:tick", "PubOdom.inputs:execIn"),
-                    ("OnTick.outputs:tick", "PubOdomTf.inputs:execIn"),
-                    ("OnTick.outputs:tick", "DiffController.inputs:execIn"),
-                    ("OnTick.outputs:deltaSeconds", "DiffController.inputs:dt"),
-
-                    # Cmd_vel Logic
-                    ("ReadContext.outputs:context", "SubTwist.inputs:context"),
-                    ("SubTwist.outputs:linearVelocity", "ScaleLin.inputs:value"),
-                    ("ScaleLin.outputs:result", "BreakLin.inputs:tuple"),
-                    ("SubTwist.outputs:angularVelocity", "BreakAng.inputs:tuple"),
-                    ("BreakLin.outputs:x", "DiffController.inputs:linearVelocity"),
-                    ("BreakAng.outputs:z", "DiffController.inputs:angularVelocity"),
-                    ("DiffController.outputs:velocityCommand", "ArtControllerBase.inputs:velocityCommand"),
-
-                    # Odom Logic
-                    ("ReadContext.outputs:context", "PubOdom.inputs:context"),
-                    ("SimTime.outputs:simulationTime", "PubOdom.inputs:timeStamp"),
-                    ("ComputeOdom.outputs:position", "PubOdom.inputs:position"),
-                    ("ComputeOdom.outputs:orientation", "PubOdom.inputs:orientation"),
-                    ("ComputeOdom.outputs:linearVelocity", "PubOdom.inputs:linearVelocity"),
-                    ("ComputeOdom.outputs:angularVelocity", "PubOdom.inputs:angularVelocity"),
-
-                    # Odometry TF Logic
-                    ("ReadContext.outputs:context", "PubOdomTf.inputs:context"),
-                    ("SimTime.outputs:simulationTime", "PubOdomTf.inputs:timeStamp"),
-                    ("ComputeOdom.outputs:position", "PubOdomTf.inputs:translation"),
-                    ("ComputeOdom.outputs:orientation", "PubOdomTf.inputs:rotation"),
-
-                ]
-            }
-        )
+    fragments = []
+    tick_rate = float(ros_config.get("tick_rate_hz", DEFAULT_TICK_RATE_HZ))
 
-        print(f"  + Mobile Base Graph Built Successfully. Cmd Vel Topic: {mb_config.get('topic_cmd_vel', 'cmd_vel')}, Odom Topic: {mb_config.get('topic_odom', 'odom')}")
+    # ========================================================================
+    # TF / JOINT STATES / MOBILE BASE
+    # ========================================================================
+    if _wants(features, "tf") and ros_config.get("publish_tf", True):
+        fragments.append(_tf_fragment(ros_config, target_path, tick_rate, index))
+
+    if _wants(features, "joint_states") and ros_config.get("publish_joint_states", True):
+        fragments.append(_joint_state_fragment(ros_config, target_path, tick_rate))
 
+    if _wants(features, "mobile_base") and ros_config.get("mobile_base", {}).get("enabled", False):
+        fragments.append(_mobile_base_fragment(ros_config, target_path, tick_rate))
 
     # ========================================================================
     # SENSORS
     # ========================================================================
-    link_map = {}
-    for prim in Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path)):
-        link_map[prim.GetName()] = prim.GetPath().pathString
+    link_map = index.links
 
     sensors_config = config_data.get("sensors", {})
     for name, settings in sensors_config.items():
+        if not _wants(features, f"sensor:{name}"): continue
         parent = settings.get("parent_link")
         if parent not in link_map: continue
         full_path = f"{link_map[parent]}/{name}"
         stype = settings.get("type")
 
-        # --- CAMERA GRAPH ---
         if stype == "camera":
-            graph_path = f"{robot_prim_path}/ROS2_Camera_{name}"
-            if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
-
-            og.Controller.edit(
-                {"graph_path": graph_path, "evaluator_name": "execution"},
-                {
-                    keys.CREATE_NODES: [
-                        ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                        ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                        ("RunOnce", "isaacsim.core.nodes.OgnIsaacRunOneSimulationFrame"),
-                        ("CreateRP", "isaacsim.core.nodes.IsaacCreateRenderProduct"),
-                        ("HelperRGB", "isaacsim.ros2.bridge.ROS2CameraHelper"),
-                        ("HelperDepth", "isaacsim.ros2.bridge.ROS2CameraHelper"),
-                        ("HelperPCL", "isaacsim.ros2.bridge.ROS2CameraHelper"),
-                    ],
-                    keys.SET_VALUES: [
-                        ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                        ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-
-                        # Render Product Config
-                        ("CreateRP.inputs:cameraPrim", [Sdf.Path(full_path)]),
-                        ("CreateRP.inputs:enabled", settings.get("enabled", True)),
-                        ("CreateRP.inputs:height", settings.get("image_height", 720)),
-                        ("CreateRP.inputs:width", settings.get("image_width", 1280)),
-
-                        # RGB
-                        ("HelperRGB.inputs:enableSemanticLabels", settings.get("rgb.enable_semantic_labels", False)),
-                        ("HelperRGB.inputs:enabled", settings.get("rgb._enabled", True)),
-                        ("HelperRGB.inputs:frameSkipCount", settings.get("rgb.frame_skip", 0)),
-                        ("HelperRGB.inputs:resetSimulationTimeOnStop", settings.get("rgb.reset_sim_time_on_stop", False)),
-                        ("HelperRGB.inputs:type", "rgb"),
-                        ("HelperRGB.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                        ("HelperRGB.inputs:topicName", settings.get("rgb.topic", f"{name}/rgb")),
-                        ("HelperRGB.inputs:frameId", name),
-
-                        # Depth
-                        ("HelperDepth.inputs:enableSemanticLabels", settings.get("depth.enable_semantic_labels", False)),
-                        ("HelperDepth.inputs:enabled", settings.get("depth._enabled", True)),
-                        ("HelperDepth.inputs:frameSkipCount", settings.get("depth.frame_skip", 0)),
-                        ("HelperDepth.inputs:resetSimulationTimeOnStop", settings.get("depth.reset_sim_time_on_stop", False)),
-                        ("HelperDepth.inputs:type", "depth"),
-                        ("HelperDepth.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                        ("HelperDepth.inputs:topicName", settings.get("depth.topic", f"{name}/depth")),
-                        ("HelperDepth.inputs:frameId", name),
-
-                        # Point Cloud
-                        ("HelperPCL.inputs:enableSemanticLabels", settings.get("pcl.enable_semantic_labels", False)),
-                        ("HelperPCL.inputs:enabled", settings.get("pcl._enabled", True)),
-                        ("HelperPCL.inputs:frameSkipCount", settings.get("pcl.frame_skip", 0)),
-                        ("HelperPCL.inputs:resetSimulationTimeOnStop", settings.get("pcl.reset_sim_time_on_stop", False)),
-                        ("HelperPCL.inputs:type", "depth_pcl"),
-                        ("HelperPCL.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                        ("HelperPCL.inputs:topicName", settings.get("pcl.topic", f"{name}/points")),
-                        ("HelperPCL.inputs:frameId", name),
-                    ],
-                    keys.CONNECT: [
-                        # Initialization (Render Product)
-                        ("OnTick.outputs:tick", "RunOnce.inputs:execIn"),
-                        ("RunOnce.outputs:step", "CreateRP.inputs:execIn"),
-
-                        # RGB
-                        ("OnTick.outputs:tick", "HelperRGB.inputs:execIn"),
-                        ("ReadContext.outputs:context", "HelperRGB.inputs:context"),
-                        ("CreateRP.outputs:renderProductPath", "HelperRGB.inputs:renderProductPath"),
-
-                        # Depth
-                        ("OnTick.outputs:tick", "HelperDepth.inputs:execIn"),
-                        ("ReadContext.outputs:context", "HelperDepth.inputs:context"),
-                        ("CreateRP.outputs:renderProductPath", "HelperDepth.inputs:renderProductPath"),
-
-                        # PCL
-                        ("OnTick.outputs:tick", "HelperPCL.inputs:execIn"),
-                        ("ReadContext.outputs:context", "HelperPCL.inputs:context"),
-                        ("CreateRP.outputs:renderProductPath", "HelperPCL.inputs:renderProductPath"),
-                    ]
-                }
-            )
-
-            print(f"  + Camera {name} Graph Built Successfully")
-            print(f"    - RGB Topic: {settings.get('rgb.topic', f'{name}/rgb')}")
-            print(f"    - Depth Topic: {settings.get('depth.topic', f'{name}/depth')}")
-            print(f"    - PCL Topic: {settings.get('pcl.topic', f'{name}/points')}")
-
-        # --- LIDAR GRAPH ---
+            fragment = _camera_fragment(ros_config, name, settings, full_path)
+            if fragment is None:
+                print(f"  - Camera {name} has no enabled stream, no graph built")
+                continue
+            fragments.append(fragment)
         elif stype == "lidar":
-            graph_path = f"{robot_prim_path}/ROS2_Lidar_{name}"
-            if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
-
-            og.Controller.edit(
-                {"graph_path": graph_path, "evaluator_name": "execution"},
-                {
-                    keys.CREATE_NODES: [
-                        ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                        ("SimTime", "isaacsim.core.nodes.IsaacReadSimulationTime"),
-                        ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                        ("ReadLidar", "isaacsim.sensors.physx.IsaacReadLidarBeams"),
-                        ("PubLidar", "isaacsim.ros2.bridge.ROS2PublishLaserScan")
-                    ],
-                    keys.SET_VALUES: [
-                        ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                        ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-                        ("ReadLidar.inputs:lidarPrim", [Sdf.Path(full_path)]),
-                        ("PubLidar.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                        ("PubLidar.inputs:topicName", settings.get("topic_lidar", f"{name}/scan")),
-                        ("PubLidar.inputs:frameId", name),
-                    ],
-                    keys.CONNECT: [
-                        ("OnTick.outputs:tick", "ReadLidar.inputs:execIn"),
-                        ("OnTick.outputs:tick", "PubLidar.inputs:execIn"),
-                        ("ReadContext.outputs:context", "PubLidar.inputs:context"),
-                        ("SimTime.outputs:simulationTime", "PubLidar.inputs:timeStamp"),
-                        
-                        ("ReadLidar.outputs:azimuthRange", "PubLidar.inputs:azimuthRange"),
-                        ("ReadLidar.outputs:depthRange", "PubLidar.inputs:depthRange"),
-                        ("ReadLidar.outputs:horizontalFov", "PubLidar.inputs:horizontalFov"),
-                        ("ReadLidar.outputs:horizontalResolution", "PubLidar.inputs:horizontalResolution"),
-                        ("ReadLidar.outputs:intensitiesData", "PubLidar.inputs:intensitiesData"),
-                        ("ReadLidar.outputs:linearDepthData", "PubLidar.inputs:linearDepthData"),
-                        ("ReadLidar.outputs:numCols", "PubLidar.inputs:numCols"),
-                        # ("ReadLidar.outputs:numRows", "PubLidar.inputs:numRows"),
-                        ("ReadLidar.outputs:rotationRate", "PubLidar.inputs:rotationRate"),
-                    ]
-                }
-            )
-
-            print(f"  + Lidar {name} Graph Built Successfully. Topic: {settings.get('topic_lidar', f'{name}/scan')}")
-
-        # --- IMU GRAPH ---
+            fragments.append(_lidar_fragment(ros_config, name, settings, full_path, tick_rate))
         elif stype == "imu":
-            graph_path = f"{robot_prim_path}/ROS2_IMU_{name}"
-            if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
-
-            og.Controller.edit(
-                {"graph_path": graph_path, "evaluator_name": "execution"},
-                {
-                    keys.CREATE_NODES: [
-                        ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                        ("SimTime", "isaacsim.core.nodes.IsaacReadSimulationTime"),
-                        ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                        ("ReadImu", "isaacsim.sensors.physics.IsaacReadIMU"),
-                        ("PubImu", "isaacsim.ros2.bridge.ROS2PublishImu")
-                    ],
-                    keys.SET_VALUES: [
-                        ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                        ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-                        ("ReadImu.inputs:imuPrim", [Sdf.Path(full_path)]),
-                        ("ReadImu.inputs:readGravity", settings.get("read_gravity", True)),
-                        ("ReadImu.inputs:useLatestData", settings.get("use_latest_data", False)),
-                        ("PubImu.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                        ("PubImu.inputs:topicName", settings.get("topic_imu", f"{name}/imu")),
-                        ("PubImu.inputs:frameId", name),
-                        ("PubImu.inputs:publishAngularVelocity", settings.get("publish_angular_velocity", True)),
-                        ("PubImu.inputs:publishLinearAcceleration", settings.get("publish_linear_acceleration", True)),
-                        ("PubImu.inputs:publishOrientation", settings.get("publish_orientation", True)),
-                    ],
-                    keys.CONNECT: [
-                        ("OnTick.outputs:tick", "ReadImu.inputs:execIn"),
-                        ("OnTick.outputs:tick", "PubImu.inputs:execIn"),
-                        ("ReadContext.outputs:context", "PubImu.inputs:context"),
-                        ("SimTime.outputs:simulationTime", "PubImu.inputs:timeStamp"),
-                        
-                        ("ReadImu.outputs:linAcc", "PubImu.inputs:linearAcceleration"),
-                        ("ReadImu.outputs:angVel", "PubImu.inputs:angularVelocity"),
-                        ("ReadImu.outputs:orientation", "PubImu.inputs:orientation"),
-                    ]
-                }
-            )
-
-            print(f"  + IMU {name} Graph Built Successfully. Topic: {settings.get('topic_imu', f'{name}/imu')}")
+            fragments.append(_imu_fragment(ros_config, name, settings, full_path, tick_rate))
 
     # ========================================================================
     # JOINT CONTROLLERS
     # ========================================================================
     controllers = ros_config.get("controllers", {})
     for ctrl_name, ctrl_cfg in controllers.items():
-        graph_path = f"{robot_prim_path}/ROS2_Ctrl_{ctrl_name}"
+        if not _wants(features, f"controller:{ctrl_name}"): continue
+        fragments.append(_controller_fragment(ros_config, ctrl_name, ctrl_cfg, target_path))
+
+    # ========================================================================
+    # EMIT GRAPHS
+    # ========================================================================
+    total_nodes = 0
+    robot_prim = stage.GetPrimAtPath(robot_prim_path)
+    graphs = _group_fragments(fragments, layout)
+    for graph_name, graph_fragments in graphs.items():
+        graph_path = f"{robot_prim_path}/{graph_name}"
         if stage.GetPrimAtPath(graph_path): stage.RemovePrim(graph_path)
 
-        cmd_out = "SubJoint.outputs:positionCommand"
-        cmd_in = "ArtController.inputs:positionCommand"
-        if ctrl_cfg.get("type") == "velocity":
-            cmd_out = "SubJoint.outputs:velocityCommand"
-            cmd_in = "ArtController.inputs:velocityCommand"
+        total_nodes += _emit_graph(graph_path, graph_fragments, ros_config, prefixed=layout != "per_feature")
+        index.add_graph(graph_name, graph_path)
 
-        og.Controller.edit(
-            {"graph_path": graph_path, "evaluator_name": "execution"},
-            {
-                keys.CREATE_NODES: [
-                    ("OnTick", "omni.graph.action.OnPlaybackTick"),
-                    ("ReadContext", "isaacsim.ros2.bridge.ROS2Context"),
-                    ("SubJoint", "isaacsim.ros2.bridge.ROS2SubscribeJointState"),
-                    ("ArtController", "isaacsim.core.nodes.IsaacArticulationController")
-                ],
-                keys.SET_VALUES: [
-                    ("ReadContext.inputs:domain_id", ros_config.get("domain_id", 0)),
-                    ("ReadContext.inputs:useDomainIDEnvVar", ros_config.get("use_domain_id_env", False)),
-                    ("SubJoint.inputs:nodeNamespace", ros_config.get("namespace", "")),
-                    ("SubJoint.inputs:topicName", ctrl_cfg.get("topic", f"{ctrl_name}/command")),
-                    ("ArtController.inputs:targetPrim", [Sdf.Path(target_path)]),
-                    ("ArtController.inputs:jointNames", ctrl_cfg.get("joints")),
-                ],
-                keys.CONNECT: [
-                    ("OnTick.outputs:tick", "SubJoint.inputs:execIn"),
-                    ("OnTick.outputs:tick", "ArtController.inputs:execIn"),
-                    ("ReadContext.outputs:context", "SubJoint.inputs:context"),
-                    (cmd_out, cmd_in),
-                ]
-            }
-        )
+        for fragment in graph_fragments:
+            # Record the effective publish rate with the robot
+            if fragment.rate_hz is not None:
+                robot_prim.SetCustomDataByKey(f"urdf2usd:publishRates:{fragment.feature}", fragment.rate_hz)
 
-        print(f"  + Controller {ctrl_name} Graph Built Successfully. Topic: {ctrl_cfg.get('topic', f'{ctrl_name}/command')}")
+            detail(f"  + {fragment.messages[0]}")
+            for message in fragment.messages[1:]:
+                detail(f"    - {message}")
+            if fragment.summary:
+                print(f"  {fragment.summary}")
 
-    print(f"--- All ROS 2 Action Graphs Built Successfully ---")
+    print(f"--- All ROS 2 Action Graphs Built Successfully ({len(graphs)} graph(s), {total_nodes} node(s)) ---")
@@ -1,7 +1,12 @@
-from pxr import Usd, UsdGeom, UsdPhysics, Gf, Sdf
+from pxr import UsdGeom, UsdPhysics, Gf, Sdf
 import omni.kit.commands
 from isaacsim.asset.importer.urdf import _urdf
 
+from utils.extensions import require_extensions, sensor_extensions
+from utils.instrumentation import detail
+from utils.sdf_authoring import AttributeBatch
+from utils.stage_index import StageIndex
+
 # ---------------------------------------------------------
 # URDF IMPORT WRAPPER
 # ---------------------------------------------------------
@@ -35,66 +40,69 @@ def import_urdf(urdf_path, usd_path):
 # ---------------------------------------------------------
 # DRIVE SETTINGS APPLIER
 # ---------------------------------------------------------
-def apply_drive_settings(stage, robot_prim_path, config_data):
+def apply_drive_settings(stage, robot_prim_path, config_data, joint_names=None, index=None):
+    # joint_names limits the pass to those joints (incremental re-apply)
     print("--- Configuring Joint Drives ---")
-    robot_prim = stage.GetPrimAtPath(robot_prim_path)
+    if index is None:
+        index = StageIndex(stage, robot_prim_path)
     joint_config = config_data.get("joints", {})
     defaults = config_data.get("default_drive", {})
 
     def_stiff = defaults.get("stiffness", 10000.0)
     def_damp = defaults.get("damping", 100.0)
 
-    for prim in Usd.PrimRange(robot_prim):
-        if prim.IsA(UsdPhysics.Joint):
-            joint_name = prim.GetName()
+    # Every drive value is written in a single change block
+    batch = AttributeBatch()
+
+    for joint_name, prim in index.joints.items():
+        if joint_names is not None and joint_name not in joint_names:
+            continue
+
+        # Determine values
+        stiffness = def_stiff
+        damping = def_damp
+        
+        if joint_name in joint_config:
+            stiffness = joint_config[joint_name].get("stiffness", def_stiff)
+            damping = joint_config[joint_name].get("damping", def_damp)
 
-            # Determine values
-            stiffness = def_stiff
-            damping = def_damp
-            
-            if joint_name in joint_config:
-                stiffness = joint_config[joint_name].get("stiffness", def_stiff)
-                damping = joint_config[joint_name].get("damping", def_damp)
+        # Apply to Angular or Linear API
+        for api_type in ["angular", "linear"]:
+            drive_api = UsdPhysics.DriveAPI.Get(prim, api_type)
+            if drive_api:
+                batch.set(prim.GetPath(), f"drive:{api_type}:physics:stiffness", Sdf.ValueTypeNames.Float, stiffness)
+                batch.set(prim.GetPath(), f"drive:{api_type}:physics:damping", Sdf.ValueTypeNames.Float, damping)
 
-            # Apply to Angular or Linear API
-            for api_type in ["angular", "linear"]:
-                drive_api = UsdPhysics.DriveAPI.Get(prim, api_type)
-                if drive_api:
-                    drive_api.GetStiffnessAttr().Set(stiffness)
-                    drive_api.GetDampingAttr().Set(damping)
+                detail(f"  + Joint: {joint_name} | Type: {api_type} | Stiffness: {stiffness}, Damping: {damping}")
 
-                    print(f"  + Joint: {joint_name} | Type: {api_type} | Stiffness: {stiffness}, Damping: {damping}")
+    batch.commit(stage.GetEditTarget().GetLayer())
 
 # ---------------------------------------------------------
 # SENSOR CREATION HELPERS
 # ---------------------------------------------------------
-def _create_camera(stage, path, config):
-    cam_prim = stage.DefinePrim(path, "Camera")
-    camera = UsdGeom.Camera(cam_prim)
+def _create_camera(stage, path, config, batch):
+    batch.define_prim(path, "Camera")
 
     # Set Physical Camera Properties
-    camera.GetHorizontalApertureAttr().Set(config.get("horizontal_aperture", 20.955))
-    camera.GetVerticalApertureAttr().Set(config.get("vertical_aperture", 15.2908))
-    camera.GetFocalLengthAttr().Set(config.get("focal_length", 50.0))
+    batch.set(path, "horizontalAperture", Sdf.ValueTypeNames.Float, config.get("horizontal_aperture", 20.955))
+    batch.set(path, "verticalAperture", Sdf.ValueTypeNames.Float, config.get("vertical_aperture", 15.2908))
+    batch.set(path, "focalLength", Sdf.ValueTypeNames.Float, config.get("focal_length", 50.0))
     clipping = config.get("clipping_range", [1.0, 1000000.0])
-    camera.GetClippingRangeAttr().Set(Gf.Vec2f(clipping[0], clipping[1]))
+    batch.set(path, "clippingRange", Sdf.ValueTypeNames.Float2, Gf.Vec2f(clipping[0], clipping[1]))
 
     # Handle Rotation (if specified)
     rot = config.get("rotation", None)
     if rot:
-        UsdGeom.XformCommonAPI(cam_prim).SetRotate(Gf.Vec3f(*rot))
+        batch.set(path, "xformOp:rotateXYZ", Sdf.ValueTypeNames.Float3, Gf.Vec3f(*rot))
+        batch.set(path, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, ["xformOp:rotateXYZ"], Sdf.VariabilityUniform)
 
     # Handle Visibility
     is_visible = config.get("visible", True) 
-    imageable = UsdGeom.Imageable(cam_prim)
-    if is_visible:
-        imageable.MakeVisible()
-    else:
-        imageable.MakeInvisible()
+    batch.set(path, "visibility", Sdf.ValueTypeNames.Token, UsdGeom.Tokens.inherited if is_visible else UsdGeom.Tokens.invisible)
 
-    print(f"  + Created Camera: {path} (Visible: {is_visible})")
+    detail(f"  + Created Camera: {path} (Visible: {is_visible})")
 
-def _create_lidar(stage, path, config):
+def _create_lidar(stage, path, config, batch):
     impl = config.get("implementation", "physx").lower()
     if impl == "rtx":
         if "/" in path:
@@ -114,51 +122,70 @@ def _create_lidar(stage, path, config):
         )
 
         if success:
-            print(f"  + Created RTX Lidar: {sensor_name} (Profile: {profile})")
+            detail(f"  + Created RTX Lidar: {sensor_name} (Profile: {profile})")
         else:
             print(f"  ! FAILED to create RTX Lidar: {sensor_name}")
 
     else:
-        lidar_prim = stage.DefinePrim(path, "Lidar")
+        batch.define_prim(path, "Lidar")
         
-        lidar_prim.CreateAttribute("minRange", Sdf.ValueTypeNames.Float).Set(config.get("min_range", 0.1))
-        lidar_prim.CreateAttribute("maxRange", Sdf.ValueTypeNames.Float).Set(config.get("max_range", 10.0))
-        lidar_prim.CreateAttribute("horizontalFov", Sdf.ValueTypeNames.Float).Set(config.get("horizontal_fov", 360.0))
-        lidar_prim.CreateAttribute("horizontalResolution", Sdf.ValueTypeNames.Float).Set(config.get("horizontal_resolution", 0.5))
-        lidar_prim.CreateAttribute("verticalFov", Sdf.ValueTypeNames.Float).Set(config.get("vertical_fov", 10.0))
-        lidar_prim.CreateAttribute("verticalResolution", Sdf.ValueTypeNames.Float).Set(config.get("vertical_resolution", 1.0))
-        lidar_prim.CreateAttribute("rotationRate", Sdf.ValueTypeNames.Float).Set(config.get("rotation_rate", 20.0))
-        lidar_prim.CreateAttribute("drawLines", Sdf.ValueTypeNames.Bool).Set(config.get("draw_lines", False))
-        lidar_prim.CreateAttribute("drawPoints", Sdf.ValueTypeNames.Bool).Set(config.get("draw_points", False))
-        lidar_prim.CreateAttribute("highLod", Sdf.ValueTypeNames.Bool).Set(config.get("high_lod", False))
-
-        print(f"  + Created PhysX Lidar: {path}")
-
-def _create_imu(stage, path, config):
-    imu_prim = stage.DefinePrim(path, "IsaacImuSensor")
+        batch.set(path, "minRange", Sdf.ValueTypeNames.Float, config.get("min_range", 0.1))
+        batch.set(path, "maxRange", Sdf.ValueTypeNames.Float, config.get("max_range", 10.0))
+        batch.set(path, "horizontalFov", Sdf.ValueTypeNames.Float, config.get("horizontal_fov", 360.0))
+        batch.set(path, "horizontalResolution", Sdf.ValueTypeNames.Float, config.get("horizontal_resolution", 0.5))
+        batch.set(path, "verticalFov", Sdf.ValueTypeNames.Float, config.get("vertical_fov", 10.0))
+        batch.set(path, "verticalResolution", Sdf.ValueTypeNames.Float, config.get("vertical_resolution", 1.0))
+        batch.set(path, "rotationRate", Sdf.ValueTypeNames.Float, config.get("rotation_rate", 20.0))
+        batch.set(path, "drawLines", Sdf.ValueTypeNames.Bool, config.get("draw_lines", False))
+        batch.set(path, "drawPoints", Sdf.ValueTypeNames.Bool, config.get("draw_points", False))
+        batch.set(path, "highLod", Sdf.ValueTypeNames.Bool, config.get("high_lod", False))
+
+        detail(f"  + Created PhysX Lidar: {path}")
+
+def _create_imu(stage, path, config, batch):
+    batch.define_prim(path, "IsaacImuSensor")
     rate = config.get("update_rate", 100.0)
-    imu_prim.CreateAttribute("sensorPeriod", Sdf.ValueTypeNames.Float).Set(1.0 / rate)
+    batch.set(path, "sensorPeriod", Sdf.ValueTypeNames.Float, 1.0 / rate)
+
+    detail(f"  + Created IMU: {path} (Update Rate: {rate} Hz)")
 
-    print(f"  + Created IMU: {path} (Update Rate: {rate} Hz)")
+# Prim types created by the sensor helpers above
+SENSOR_PRIM_TYPES = {"Camera", "Lidar", "OmniLidar", "IsaacImuSensor"}
 
-def apply_sensor_settings(stage, robot_prim_path, config_data):
+def apply_sensor_settings(stage, robot_prim_path, config_data, sensor_names=None, index=None):
+    # sensor_names limits the pass to those sensors (incremental re-apply)
     print("--- Configuring Sensors ---")
     sensors = config_data.get("sensors", {})
-    if not sensors: return
-
-    # Build Link Map
-    link_map = {}
-    robot_prim = stage.GetPrimAtPath(robot_prim_path)
-    for prim in Usd.PrimRange(robot_prim):
-        link_map[prim.GetName()] = prim.GetPath()
+    if not sensors and sensor_names is None: return
+
+    require_extensions(sensor_extensions(config_data))
+    if index is None:
+        index = StageIndex(stage, robot_prim_path)
+    link_map = index.links
+
+    if sensor_names is not None:
+        # Drop the previous version of each sensor before rebuilding it
+        for name in sensor_names:
+            if name in link_map and stage.GetPrimAtPath(link_map[name]).GetTypeName() in SENSOR_PRIM_TYPES:
+                sensor_path = link_map[name]
+                stage.RemovePrim(sensor_path)
+                index.remove(sensor_path)
+                print(f"  - Removed Sensor: {sensor_path}")
+        sensors = {name: settings for name, settings in sensors.items() if name in sensor_names}
+
+    # Sensor prims and attributes are written in a single change block
+    batch = AttributeBatch()
 
     for name, settings in sensors.items():
         parent = settings.get("parent_link")
         if parent in link_map:
             full_path = f"{link_map[parent]}/{name}"
             stype = settings.get("type")
-            if stype == "camera": _create_camera(stage, full_path, settings)
-            elif stype == "lidar": _create_lidar(stage, full_path, settings)
-            elif stype == "imu":   _create_imu(stage, full_path, settings)
+            if stype == "camera": _create_camera(stage, full_path, settings, batch)
+            elif stype == "lidar": _create_lidar(stage, full_path, settings, batch)
+            elif stype == "imu":   _create_imu(stage, full_path, settings, batch)
+            index.add_link(name, full_path)
         else:
             print(f"Warning: Parent link '{parent}' not found for sensor '{name}'")
+
+    batch.commit(stage.GetEditTarget().GetLayer())
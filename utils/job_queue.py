@@ -0,0 +1,71 @@
+import os
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------------------------------------------
+# WORKER PROCESS
+# ---------------------------------------------------------
+def _run_attempt(command, log_file, timeout):
+    # Each worker gets its own session so a timeout can kill the whole process tree
+    process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+    try:
+        return process.wait(timeout=timeout), False
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        return None, True
+
+def run_job(name, command, log_path, timeout=None, retries=0):
+    start = time.perf_counter()
+    result = {"name": name, "status": "failed", "attempts": 0, "returncode": None, "log": log_path}
+
+    with open(log_path, 'w') as log_file:
+        for attempt in range(1, retries + 2):
+            result["attempts"] = attempt
+            log_file.write(f"=== Attempt {attempt}: {' '.join(command)} ===\n")
+            log_file.flush()
+
+            returncode, timed_out = _run_attempt(command, log_file, timeout)
+            result["returncode"] = returncode
+            if timed_out:
+                log_file.write(f"=== Attempt {attempt} timed out after {timeout} s ===\n")
+                result["status"] = "timeout"
+            elif returncode == 0:
+                result["status"] = "success"
+                break
+            else:
+                log_file.write(f"=== Attempt {attempt} exited with code {returncode} ===\n")
+                result["status"] = "failed"
+            log_file.flush()
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+# ---------------------------------------------------------
+# JOB QUEUE
+# ---------------------------------------------------------
+def run_job_queue(jobs, log_dir, max_workers=1, timeout=None, retries=0, on_done=None):
+    # jobs: list of (name, command). Results are returned in job order.
+    os.makedirs(log_dir, exist_ok=True)
+
+    def _run(job):
+        name, command = job
+        result = run_job(name, command, os.path.join(log_dir, f"{name}.log"), timeout, retries)
+        if on_done is not None:
+            on_done(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(_run, jobs))
+
+    # Aggregated log in job order
+    with open(os.path.join(log_dir, "all_jobs.log"), 'w') as aggregate:
+        for result in results:
+            aggregate.write(f"##### {result['name']} [{result['status']}] #####\n")
+            with open(result["log"], 'r', errors="replace") as f:
+                aggregate.write(f.read())
+            aggregate.write("\n")
+
+    return results
@@ -0,0 +1,105 @@
+import contextlib
+import os
+
+from pxr import Usd, UsdGeom, Sdf
+
+from utils.instrumentation import detail
+
+OUTPUT_LAYOUTS = ("single", "layered")
+
+# Sublayers of the root layer, strongest first
+SUBLAYERS = ["ros2", "sensors", "drives", "base"]
+VISUALS_LAYER = "visuals"
+
+# ---------------------------------------------------------
+# LAYER FILES
+# ---------------------------------------------------------
+def layer_paths(usd_path):
+    # <dir>/<robot>.usd composes <dir>/<robot>_layers/{ros2,sensors,drives,base,visuals}.usd
+    stem, ext = os.path.splitext(usd_path)
+    layer_dir = stem + "_layers"
+    return {name: os.path.join(layer_dir, name + ext) for name in SUBLAYERS + [VISUALS_LAYER]}
+
+def _new_layer(path):
+    # Reuse the layer if it is already open, so stale content never survives a rebuild
+    layer = Sdf.Layer.Find(path) or (Sdf.Layer.FindOrOpen(path) if os.path.exists(path) else None)
+    if layer is None:
+        return Sdf.Layer.CreateNew(path)
+    layer.Clear()
+    return layer
+
+def create_root_layer(usd_path, paths):
+    # Called after the URDF import wrote the base layer
+    base = Sdf.Layer.FindOrOpen(paths["base"])
+    root = _new_layer(usd_path)
+    root.subLayerPaths = [os.path.relpath(paths[name], os.path.dirname(usd_path)) for name in SUBLAYERS]
+    root.defaultPrim = base.defaultPrim
+    for key in ("upAxis", "metersPerUnit", "kilogramsPerUnit", "timeCodesPerSecond"):
+        if base.pseudoRoot.HasInfo(key):
+            root.pseudoRoot.SetInfo(key, base.pseudoRoot.GetInfo(key))
+    root.Save()
+
+    for name in SUBLAYERS[:-1] + [VISUALS_LAYER]:
+        _new_layer(paths[name]).Save()
+
+def open_layers(paths):
+    return {name: Sdf.Layer.FindOrOpen(path) for name, path in paths.items()}
+
+def edit_layer(stage, layers, name):
+    # Authoring inside this block goes to one sublayer (no-op for single-file output)
+    if layers is None:
+        return contextlib.nullcontext()
+    return Usd.EditContext(stage, layers[name])
+
+def save_layers(layers):
+    # Only dirty layers are written, so re-applying gains rewrites drives.usd alone
+    for layer in (layers or {}).values():
+        if layer.dirty:
+            layer.Save()
+
+# ---------------------------------------------------------
+# VISUAL PAYLOADS
+# ---------------------------------------------------------
+def _is_visual_mesh(spec):
+    if spec.typeName != "Mesh":
+        return False
+    schemas = spec.GetInfo("apiSchemas") if spec.HasInfo("apiSchemas") else None
+    applied = list(schemas.GetAddedOrExplicitItems()) if schemas else []
+    return not any("Collision" in schema for schema in applied)
+
+def move_visuals_to_payload(stage, layers, robot_prim_path):
+    # Visual mesh specs move from the base layer into visuals.usd. Each one
+    # leaves behind a typeless prim with a payload to the same path, so the
+    # robot can be opened with payloads unloaded (physics and ROS only).
+    print("--- Moving Visual Meshes Behind Payloads ---")
+    base, visuals = layers["base"], layers[VISUALS_LAYER]
+    visuals_asset = os.path.relpath(visuals.realPath, os.path.dirname(base.realPath))
+
+    paths = []
+    def collect(path):
+        spec = base.GetPrimAtPath(path)
+        if spec and spec.specifier == Sdf.SpecifierDef and _is_visual_mesh(spec):
+            paths.append(path)
+    # Spec traversal, so instancing prototypes under class prims are included
+    base.Traverse(Sdf.Path(robot_prim_path), collect)
+    moved = set(path for path in paths if path.IsPrimPath())
+    # A mesh below another moved mesh travels with its parent
+    paths = sorted(path for path in moved if not any(prefix in moved for prefix in path.GetParentPath().GetPrefixes()))
+
+    moved_points = 0
+    with Sdf.ChangeBlock():
+        for path in paths:
+            Sdf.CreatePrimInLayer(visuals, path.GetParentPath())
+            Sdf.CopySpec(base, path, visuals, path)
+            points = visuals.GetAttributeAtPath(path.AppendProperty(UsdGeom.Tokens.points))
+            if points and points.default is not None:
+                moved_points += len(points.default)
+
+            parent_spec = base.GetPrimAtPath(path.GetParentPath())
+            del parent_spec.nameChildren[path.name]
+            stub = Sdf.PrimSpec(parent_spec, path.name, Sdf.SpecifierDef)
+            stub.payloadList.Prepend(Sdf.Payload(visuals_asset, path))
+            detail(f"  + Payload: {path}")
+
+    print(f"  Visuals: {len(paths)} mesh(es), {moved_points} points moved to {visuals_asset}")
+    return len(paths)
@@ -0,0 +1,181 @@
+import hashlib
+
+import numpy as np
+from pxr import Usd, UsdGeom, UsdShade, Sdf
+
+from utils.instrumentation import PROFILER, detail
+
+PROTOTYPES_SCOPE = "__prototypes"
+
+# Kept on each instance rather than in the shared prototype
+INSTANCE_ATTRIBUTE_PREFIXES = ("xformOp:", "xformOpOrder")
+INSTANCE_SCHEMAS = {"MaterialBindingAPI"}
+COPIED_METADATA = ("interpolation", "elementSize")
+
+# ---------------------------------------------------------
+# MESH SIGNATURES
+# ---------------------------------------------------------
+def _array_bytes(attr):
+    value = attr.Get() if attr else None
+    if value is None:
+        return b""
+    array = np.asarray(value)
+    if array.dtype == object:
+        # Token/string arrays
+        return repr(value).encode()
+    return np.ascontiguousarray(array).tobytes()
+
+def _mesh_signature(prim):
+    # Geometry and topology arrays hashed as raw buffers, plus everything
+    # else the prototype would carry (primvars, schemas, collision settings)
+    mesh = UsdGeom.Mesh(prim)
+    hasher = hashlib.sha1()
+    hasher.update(_array_bytes(mesh.GetPointsAttr()))
+    hasher.update(_array_bytes(mesh.GetFaceVertexIndicesAttr()))
+    hasher.update(_array_bytes(mesh.GetFaceVertexCountsAttr()))
+
+    for attr in sorted(_prototype_attributes(prim), key=lambda attr: attr.GetName()):
+        if attr.GetName() in ("points", "faceVertexIndices", "faceVertexCounts"):
+            continue
+        hasher.update(attr.GetName().encode())
+        value = attr.Get()
+        hasher.update(repr(value).encode() if isinstance(value, str) else _array_bytes(attr))
+
+    hasher.update(repr(sorted(set(prim.GetAppliedSchemas()) - INSTANCE_SCHEMAS)).encode())
+    hasher.update(repr(_material_targets(prim)).encode())
+    return hasher.hexdigest()
+
+def _prototype_attributes(prim):
+    return [attr for attr in prim.GetAttributes()
+            if attr.HasAuthoredValue() and not attr.GetName().startswith(INSTANCE_ATTRIBUTE_PREFIXES)]
+
+def _material_targets(prim):
+    rel = prim.GetRelationship(UsdShade.Tokens.materialBinding)
+    return rel.GetTargets() if rel else []
+
+def _geometry_bytes(prim):
+    mesh = UsdGeom.Mesh(prim)
+    points = mesh.GetPointsAttr().Get() or []
+    indices = mesh.GetFaceVertexIndicesAttr().Get() or []
+    counts = mesh.GetFaceVertexCountsAttr().Get() or []
+    return len(points) * 12 + len(indices) * 4 + len(counts) * 4
+
+def _is_replaceable(prim, layer):
+    # Only meshes defined entirely in the edit layer, without children
+    # (e.g. GeomSubsets), can be swapped for an instance in place
+    stack = prim.GetPrimStack()
+    return len(stack) == 1 and stack[0].layer == layer and not prim.GetChildren()
+
+# ---------------------------------------------------------
+# SPEC AUTHORING
+# ---------------------------------------------------------
+def _copy_attribute(prim_spec, attr):
+    attr_spec = Sdf.AttributeSpec(prim_spec, attr.GetName(), attr.GetTypeName(), attr.GetVariability())
+    attr_spec.default = attr.Get()
+    for key in COPIED_METADATA:
+        if attr.HasAuthoredMetadata(key):
+            attr_spec.SetInfo(key, attr.GetMetadata(key))
+
+def _set_api_schemas(prim_spec, schemas):
+    if schemas:
+        prim_spec.SetInfo("apiSchemas", Sdf.TokenListOp.Create(prependedItems=list(schemas)))
+
+def _capture(prim):
+    # Values read from the composed stage before any spec is edited
+    return {
+        "xform": [(attr.GetName(), attr.GetTypeName(), attr.Get(), attr.GetVariability())
+                  for attr in prim.GetAttributes()
+                  if attr.GetName().startswith(INSTANCE_ATTRIBUTE_PREFIXES) and attr.HasAuthoredValue()],
+        "material": _material_targets(prim),
+    }
+
+# ---------------------------------------------------------
+# DEDUPLICATION PASS
+# ---------------------------------------------------------
+def deduplicate_meshes(stage, robot_prim_path):
+    print("--- Deduplicating Meshes ---")
+    layer = stage.GetEditTarget().GetLayer()
+
+    # Collect meshes, skipping anything that is already instanced
+    meshes = []
+    iterator = iter(Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path)))
+    for prim in iterator:
+        if prim.IsInstance():
+            iterator.PruneChildren()
+        elif prim.IsA(UsdGeom.Mesh):
+            meshes.append(prim)
+
+    # Cheap bucketing by array sizes first, only same-sized meshes get hashed
+    buckets = {}
+    for prim in meshes:
+        mesh = UsdGeom.Mesh(prim)
+        size = (len(mesh.GetPointsAttr().Get() or []), len(mesh.GetFaceVertexIndicesAttr().Get() or []))
+        buckets.setdefault(size, []).append(prim)
+
+    groups = {}
+    for bucket in buckets.values():
+        if len(bucket) < 2: continue
+        for prim in bucket:
+            if _is_replaceable(prim, layer):
+                groups.setdefault(_mesh_signature(prim), []).append(prim)
+    groups = [group for group in groups.values() if len(group) > 1]
+
+    report = {"meshes": len(meshes), "prototypes": len(groups), "instances": 0, "bytes_saved": 0}
+    if not groups:
+        print(f"  No duplicate meshes among {len(meshes)} mesh prim(s)")
+        return report
+
+    # Read everything needed from the composed stage first
+    plans = []
+    for group in groups:
+        source = group[0]
+        plans.append({
+            "name": source.GetName(),
+            "attributes": _prototype_attributes(source),
+            "schemas": [schema for schema in source.GetAppliedSchemas() if schema not in INSTANCE_SCHEMAS],
+            "occurrences": [(prim.GetPath(), _capture(prim)) for prim in group],
+            "bytes": _geometry_bytes(source),
+        })
+
+    scope_path = Sdf.Path(robot_prim_path).AppendChild(PROTOTYPES_SCOPE)
+    with Sdf.ChangeBlock():
+        # Prototypes live under a class prim, so they are never rendered or simulated themselves
+        scope_spec = Sdf.CreatePrimInLayer(layer, scope_path)
+        scope_spec.specifier = Sdf.SpecifierClass
+        scope_spec.typeName = "Scope"
+
+        for i, plan in enumerate(plans):
+            proto_path = scope_path.AppendChild(f"proto_{i}_{plan['name']}")
+            proto_spec = Sdf.PrimSpec(scope_spec, proto_path.name, Sdf.SpecifierDef, "Xform")
+            mesh_spec = Sdf.PrimSpec(proto_spec, "mesh", Sdf.SpecifierDef, "Mesh")
+            for attr in plan["attributes"]:
+                _copy_attribute(mesh_spec, attr)
+            _set_api_schemas(mesh_spec, plan["schemas"])
+
+            for path, captured in plan["occurrences"]:
+                # Replace the mesh spec with an instanceable Xform at the same path
+                parent_spec = layer.GetPrimAtPath(path.GetParentPath())
+                del parent_spec.nameChildren[path.name]
+                instance_spec = Sdf.PrimSpec(parent_spec, path.name, Sdf.SpecifierDef, "Xform")
+                instance_spec.instanceable = True
+                instance_spec.referenceList.Prepend(Sdf.Reference(primPath=proto_path))
+
+                for name, type_name, value, variability in captured["xform"]:
+                    attr_spec = Sdf.AttributeSpec(instance_spec, name, type_name, variability)
+                    attr_spec.default = value
+                if captured["material"]:
+                    # Bindings are inherited from the instance root by the prototype mesh
+                    rel_spec = Sdf.RelationshipSpec(instance_spec, UsdShade.Tokens.materialBinding, custom=False)
+                    rel_spec.targetPathList.explicitItems = captured["material"]
+                    _set_api_schemas(instance_spec, ["MaterialBindingAPI"])
+
+            report["instances"] += len(plan["occurrences"])
+            report["bytes_saved"] += plan["bytes"] * (len(plan["occurrences"]) - 1)
+
+    for plan in plans:
+        detail(f"  + Prototype: {plan['occurrences'][0][0]} x{len(plan['occurrences'])}")
+
+    PROFILER.count("meshes_instanced", report["instances"])
+    print(f"  Mesh Instancing: {report['meshes']} meshes -> {report['prototypes']} prototype(s) shared by "
+          f"{report['instances']} instance(s), ~{report['bytes_saved'] / 1024.0:.1f} KiB of geometry saved")
+    return report
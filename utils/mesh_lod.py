@@ -0,0 +1,291 @@
+import numpy as np
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf, Vt
+
+from utils.instrumentation import PROFILER, detail
+
+LOD_VARIANT_SET = "lod"
+LOD_LEVELS = ("full", "medium", "low")
+DEFAULT_RATIOS = {"medium": 0.25, "low": 0.05}
+DEFAULT_MIN_TRIANGLES = 1000
+
+# Moved into the "full" variant: decimated levels get their own topology, and
+# normals and primvars resampled onto it (holes, corners and creases are dropped)
+GEOMETRY_ATTRIBUTES = {"points", "faceVertexCounts", "faceVertexIndices", "extent", "normals",
+                       "holeIndices", "cornerIndices", "cornerSharpnesses", "creaseIndices", "creaseLengths", "creaseSharpnesses"}
+RESAMPLED_INTERPOLATIONS = ("vertex", "varying", "faceVarying", "uniform")
+
+# ---------------------------------------------------------
+# MESH HELPERS
+# ---------------------------------------------------------
+def triangulate(face_vertex_counts, face_vertex_indices):
+    # Fan triangulation, vectorized per polygon size
+    counts = np.asarray(face_vertex_counts, dtype=np.int64)
+    indices = np.asarray(face_vertex_indices, dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    triangles = []
+    for size in np.unique(counts):
+        if size < 3: continue
+        first = starts[counts == size]
+        for k in range(1, size - 1):
+            triangles.append(np.stack([indices[first], indices[first + k], indices[first + k + 1]], axis=1))
+    return np.concatenate(triangles) if triangles else np.zeros((0, 3), dtype=np.int64)
+
+def triangle_faces(face_vertex_counts):
+    # Source face of every triangle, in the order triangulate emits them
+    counts = np.asarray(face_vertex_counts, dtype=np.int64)
+    faces = []
+    for size in np.unique(counts):
+        if size < 3: continue
+        faces.extend([np.nonzero(counts == size)[0]] * (size - 2))
+    return np.concatenate(faces) if faces else np.zeros(0, dtype=np.int64)
+
+# ---------------------------------------------------------
+# VERTEX CLUSTERING SIMPLIFIER
+# ---------------------------------------------------------
+def _average(values, groups, count):
+    # Mean of the values in each group, entries in group -1 are ignored
+    keep = groups >= 0
+    groups = groups[keep]
+    flat = values[keep].reshape(len(groups), -1).astype(np.float64)
+    weights = np.maximum(np.bincount(groups, minlength=count), 1).astype(np.float64)
+    sums = np.stack([np.bincount(groups, flat[:, axis], minlength=count) for axis in range(flat.shape[1])], axis=1)
+    return (sums / weights[:, None]).reshape((count,) + values.shape[1:])
+
+def _cluster(points, triangles, cell):
+    # Snap points to a grid, merge each cell into its mean point and drop
+    # the triangles that collapse. Also returns the new index of every
+    # source point (-1 when dropped) and the source of every triangle.
+    cells = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+    _, labels = np.unique(cells, axis=0, return_inverse=True)
+    labels = labels.reshape(-1)
+    count = labels.max() + 1
+    merged = _average(points, labels, count)
+
+    tris = labels[triangles]
+    source = np.nonzero((tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 0] != tris[:, 2]))[0]
+    # Same three clusters in any order is the same triangle
+    _, unique_rows = np.unique(np.sort(tris[source], axis=1), axis=0, return_index=True)
+    source = source[np.sort(unique_rows)]
+
+    used, tris = np.unique(tris[source], return_inverse=True)
+    point_map = np.full(count, -1, dtype=np.int64)
+    point_map[used] = np.arange(len(used))
+    return merged[used].astype(np.float32), tris.reshape(-1, 3), point_map[labels], source
+
+def simplify_mesh(points, triangles, target_triangles, iterations=12):
+    # Binary search over the grid resolution for the finest clustering that
+    # stays within the triangle budget. Returns (points, triangles, point map,
+    # source triangles), see _cluster.
+    points = np.asarray(points, dtype=np.float64)
+    size = float((points.max(axis=0) - points.min(axis=0)).max()) if len(points) else 0.0
+    if len(triangles) <= target_triangles or size == 0.0:
+        return points.astype(np.float32), triangles, np.arange(len(points)), np.arange(len(triangles))
+
+    low, high = 1.0, 4096.0
+    best = None
+    for _ in range(iterations):
+        resolution = (low * high) ** 0.5
+        result = _cluster(points, triangles, size / resolution)
+        if 0 < len(result[1]) <= target_triangles:
+            best = result
+        if len(result[1]) <= target_triangles:
+            low = resolution
+        else:
+            high = resolution
+    # Budget below what the grid can reach: finest clustering tried above it
+    return best if best is not None else _cluster(points, triangles, size / high)
+
+# ---------------------------------------------------------
+# LOD VARIANTS
+# ---------------------------------------------------------
+def _owning_link(prim, robot_prim_path):
+    parent = prim.GetParent()
+    while parent.GetPath() != robot_prim_path and parent.GetParent().GetPath() != robot_prim_path:
+        if parent.HasAPI(UsdPhysics.RigidBodyAPI):
+            return parent.GetName()
+        parent = parent.GetParent()
+    # Importer links are children of the robot prim (instancing prototypes
+    # end up under their shared scope)
+    return parent.GetName()
+
+def _is_visual(prim, robot_prim_path):
+    ancestor = prim
+    while ancestor and ancestor.GetPath() != robot_prim_path:
+        if ancestor.HasAPI(UsdPhysics.CollisionAPI):
+            return False
+        ancestor = ancestor.GetParent()
+    return UsdGeom.Imageable(prim).GetPurposeAttr().Get() not in (UsdGeom.Tokens.guide, UsdGeom.Tokens.proxy)
+
+def _is_replaceable(prim, layer):
+    stack = prim.GetPrimStack()
+    return len(stack) == 1 and stack[0].layer == layer and not prim.GetChildren()
+
+def _interpolation(attr_spec):
+    if attr_spec.HasInfo("interpolation"):
+        return attr_spec.GetInfo("interpolation")
+    # Fallbacks of UsdGeomMesh normals and UsdGeomPrimvar
+    return "vertex" if attr_spec.name == "normals" else "constant"
+
+def _moved_to_variant(mesh_spec, attr_spec):
+    if attr_spec.name in GEOMETRY_ATTRIBUTES:
+        return True
+    if not attr_spec.name.startswith("primvars:"):
+        return False
+    # Indices follow their primvar
+    if attr_spec.name.endswith(":indices"):
+        values_spec = mesh_spec.attributes.get(attr_spec.name[:-len(":indices")])
+        return values_spec is not None and _moved_to_variant(mesh_spec, values_spec)
+    # Constant primvars (displayColor, ...) stay valid at every level
+    return _interpolation(attr_spec) != "constant"
+
+def _resample(values, interpolation, level, face_vertex_counts, face_vertex_indices):
+    # Per-point data is averaged over each cluster, face-varying data over the
+    # corners of each cluster, per-face data follows the source triangle
+    points, triangles, point_map, source = level
+    if interpolation in ("vertex", "varying") and len(values) == len(point_map):
+        return _average(values, point_map, len(points))
+    if interpolation == "faceVarying" and len(values) == len(face_vertex_indices):
+        return _average(values, point_map[face_vertex_indices], len(points))[triangles.reshape(-1)]
+    if interpolation == "uniform" and len(values) == len(face_vertex_counts):
+        return values[triangle_faces(face_vertex_counts)[source]]
+    return None
+
+def _resampled_attributes(mesh_spec):
+    # Normals and non-constant primvars as (name, type, interpolation, flattened values)
+    resampled = []
+    for attr_spec in mesh_spec.attributes:
+        name = attr_spec.name
+        if name != "normals" and not (name.startswith("primvars:") and not name.endswith(":indices")): continue
+        interpolation = _interpolation(attr_spec)
+        if interpolation not in RESAMPLED_INTERPOLATIONS: continue
+        values = np.asarray(attr_spec.default) if attr_spec.default is not None else None
+        if values is None or values.dtype.kind != "f":
+            print(f"Warning: {mesh_spec.path}.{name} has no floating point default and is only kept in the 'full' LOD")
+            continue
+        indices = mesh_spec.attributes.get(name + ":indices")
+        if indices is not None and indices.default is not None:
+            values = values[np.asarray(indices.default)]
+        resampled.append((name, attr_spec.typeName, interpolation, values))
+    return resampled
+
+def _author_variants(layer, path, levels, face_vertex_counts, face_vertex_indices):
+    mesh_spec = layer.GetPrimAtPath(path)
+    variant_set = Sdf.VariantSetSpec(mesh_spec, LOD_VARIANT_SET)
+    mesh_spec.variantSetNameList.Prepend(LOD_VARIANT_SET)
+    resampled = _resampled_attributes(mesh_spec)
+
+    # Full resolution geometry moves into its own variant
+    full = Sdf.VariantSpec(variant_set, "full")
+    for attr_spec in [spec for spec in mesh_spec.properties if isinstance(spec, Sdf.AttributeSpec) and _moved_to_variant(mesh_spec, spec)]:
+        Sdf.CopySpec(layer, attr_spec.path, layer, full.primSpec.path.AppendProperty(attr_spec.name))
+        mesh_spec.RemoveProperty(attr_spec)
+
+    for name, level in levels.items():
+        points, triangles, _, _ = level
+        prim_spec = Sdf.VariantSpec(variant_set, name).primSpec
+        Sdf.AttributeSpec(prim_spec, "points", Sdf.ValueTypeNames.Point3fArray).default = Vt.Vec3fArray.FromNumpy(points)
+        Sdf.AttributeSpec(prim_spec, "faceVertexCounts", Sdf.ValueTypeNames.IntArray).default = Vt.IntArray([3] * len(triangles))
+        Sdf.AttributeSpec(prim_spec, "faceVertexIndices", Sdf.ValueTypeNames.IntArray).default = Vt.IntArray.FromNumpy(triangles.reshape(-1).astype(np.int32))
+        extent = [points.min(axis=0).tolist(), points.max(axis=0).tolist()]
+        Sdf.AttributeSpec(prim_spec, "extent", Sdf.ValueTypeNames.Float3Array).default = Vt.Vec3fArray(extent)
+
+        for attr_name, type_name, interpolation, values in resampled:
+            level_values = _resample(values, interpolation, level, face_vertex_counts, face_vertex_indices)
+            if level_values is None:
+                print(f"Warning: {path}.{attr_name} does not match the mesh topology and is only kept in the 'full' LOD")
+                continue
+            if attr_name == "normals":
+                lengths = np.linalg.norm(level_values, axis=1, keepdims=True)
+                level_values = level_values / np.where(lengths > 0.0, lengths, 1.0)
+            attr_spec = Sdf.AttributeSpec(prim_spec, attr_name, type_name)
+            attr_spec.default = type_name.type.pythonClass.FromNumpy(level_values.astype(values.dtype))
+            attr_spec.SetInfo("interpolation", interpolation)
+
+def _author_robot_selection(layer, robot_prim_path, mesh_paths, default_level):
+    # One variant set on the robot prim selects the level of every mesh,
+    # including instancing prototypes (subroot references keep ancestral variants)
+    robot_spec = layer.GetPrimAtPath(robot_prim_path)
+    variant_set = Sdf.VariantSetSpec(robot_spec, LOD_VARIANT_SET)
+    robot_spec.variantSetNameList.Prepend(LOD_VARIANT_SET)
+    for level in LOD_LEVELS:
+        variant_path = Sdf.VariantSpec(variant_set, level).primSpec.path
+        for path in mesh_paths:
+            over = Sdf.CreatePrimInLayer(layer, variant_path.AppendPath(path.MakeRelativePath(robot_prim_path)))
+            over.variantSelections[LOD_VARIANT_SET] = level
+    robot_spec.variantSelections[LOD_VARIANT_SET] = default_level
+
+def _link_budgets(lod_config, link_name):
+    budgets = {level: lod_config.get(level, DEFAULT_RATIOS[level]) for level in DEFAULT_RATIOS}
+    override = (lod_config.get("links") or {}).get(link_name) or {}
+    # Absolute per-link triangle counts instead of per-mesh ratios
+    return budgets, {level: override[level] for level in DEFAULT_RATIOS if level in override}
+
+def generate_visual_lods(stage, robot_prim_path, config_data):
+    print("--- Generating Visual Mesh LODs ---")
+    lod_config = config_data.get("visual_lod", {})
+    layer = stage.GetEditTarget().GetLayer()
+    robot_prim_path = Sdf.Path(robot_prim_path)
+    min_triangles = lod_config.get("min_triangles", DEFAULT_MIN_TRIANGLES)
+    default_level = lod_config.get("default", "full")
+    if default_level not in LOD_LEVELS:
+        print(f"Warning: Unknown visual_lod default '{default_level}', using 'full'")
+        default_level = "full"
+
+    # Visual meshes grouped by link, prototypes under class prims included
+    meshes = {}
+    iterator = iter(Usd.PrimRange(stage.GetPrimAtPath(robot_prim_path), Usd.PrimAllPrimsPredicate))
+    for prim in iterator:
+        if prim.IsInstance():
+            iterator.PruneChildren()
+        elif prim.IsA(UsdGeom.Mesh) and _is_visual(prim, robot_prim_path) and _is_replaceable(prim, layer):
+            mesh = UsdGeom.Mesh(prim)
+            points = mesh.GetPointsAttr().Get()
+            counts = mesh.GetFaceVertexCountsAttr().Get()
+            indices = mesh.GetFaceVertexIndicesAttr().Get()
+            if points is None or counts is None or indices is None: continue
+            triangles = triangulate(counts, indices)
+            # Degenerate meshes (points or lines only) have nothing to decimate
+            if len(triangles) == 0 or len(triangles) < min_triangles: continue
+            topology = (np.asarray(counts, dtype=np.int64), np.asarray(indices, dtype=np.int64))
+            meshes.setdefault(_owning_link(prim, robot_prim_path), []).append((prim.GetPath(), np.asarray(points), triangles, topology))
+
+    if not meshes:
+        print(f"  No visual mesh above {min_triangles} triangles")
+        return {}
+
+    report = {}
+    authored = []
+    with Sdf.ChangeBlock():
+        for link, link_meshes in meshes.items():
+            ratios, budgets = _link_budgets(lod_config, link)
+            link_triangles = sum(len(triangles) for _, _, triangles, _ in link_meshes)
+            if link_triangles == 0: continue
+            totals = {"full": link_triangles, "medium": 0, "low": 0}
+            for path, points, triangles, topology in link_meshes:
+                levels = {}
+                for level in DEFAULT_RATIOS:
+                    # Link budgets are shared in proportion to each mesh's triangles
+                    if level in budgets:
+                        target = budgets[level] * len(triangles) / link_triangles
+                    else:
+                        target = ratios[level] * len(triangles)
+                    levels[level] = simplify_mesh(points, triangles, max(int(target), 4))
+                    totals[level] += len(levels[level][1])
+                _author_variants(layer, path, levels, *topology)
+                authored.append(path)
+
+            report[link] = totals
+            detail(f"  + Link: {link} | {totals['full']} -> {totals['medium']} -> {totals['low']} triangles ({len(link_meshes)} mesh(es))")
+
+        _author_robot_selection(layer, robot_prim_path, authored, default_level)
+
+    PROFILER.count("lod_meshes", len(authored))
+    full = sum(totals["full"] for totals in report.values())
+    medium = sum(totals["medium"] for totals in report.values())
+    low = sum(totals["low"] for totals in report.values())
+    def share(count):
+        return f"{100.0 * count / full:.1f}%" if full else "n/a"
+    print(f"  Visual LOD: {len(authored)} mesh(es), {full} triangles -> medium {medium} ({share(medium)}), "
+          f"low {low} ({share(low)}), '{default_level}' selected")
+    return report
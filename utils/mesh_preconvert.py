@@ -0,0 +1,319 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+import numpy as np
+
+from utils.disk_cache import DiskCache
+from utils.instrumentation import PROFILER, detail
+
+# Bump when the parsers or the written USD change
+PRECONVERT_VERSION = "2"
+MESH_FORMATS = (".stl", ".obj", ".dae")
+DEFAULT_CACHE_SIZE_MB = 2048
+
+class UnsupportedMesh(Exception):
+    # The importer converts the mesh itself (materials, node transforms, ...)
+    pass
+
+# ---------------------------------------------------------
+# PARSERS (numpy only, so workers never load Kit or pxr)
+# ---------------------------------------------------------
+# Parsers return (points, counts, indices, normals, uvs). Normals and UVs are
+# face-varying (one per face vertex) so hard edges stay hard, uvs may be None.
+
+def _face_normals(points, counts, indices):
+    # Flat normal of each face (Newell's method), repeated for its vertices
+    corners = points[indices].astype(np.float64)
+    starts = np.cumsum(counts) - counts
+    following = np.arange(len(indices)) + 1
+    following[starts + counts - 1] = starts
+    normals = np.add.reduceat(np.cross(corners, corners[following]), starts, axis=0)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0.0)
+    return np.repeat(normals, counts, axis=0).astype(np.float32)
+
+def _weld(points, indices):
+    # Shares coincident points. Face-varying normals and UVs are untouched.
+    points, remap = np.unique(points, axis=0, return_inverse=True)
+    return points, remap.reshape(-1)[indices]
+
+def _triangle_soup(triangles):
+    # (n, 3, 3) triangles, one point per corner
+    points = triangles.reshape(-1, 3)
+    counts = np.full(len(triangles), 3)
+    indices = np.arange(len(points))
+    return points, counts, indices, _face_normals(points, counts, indices), None
+
+def _parse_stl(data):
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+        if len(data) == 84 + 50 * count:
+            record = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+            return _triangle_soup(np.frombuffer(data, dtype=record, count=count, offset=84)["vertices"])
+
+    text = data.decode("ascii", errors="ignore")
+    if not text.lstrip().startswith("solid"):
+        raise UnsupportedMesh("not a binary or ASCII STL")
+    values = re.findall(r"vertex\s+(\S+)\s+(\S+)\s+(\S+)", text)
+    return _triangle_soup(np.array(values, dtype=np.float32).reshape(-1, 3, 3))
+
+def _obj_index(token, length):
+    # Negative indices count back from the latest element
+    index = int(token)
+    return index - 1 if index > 0 else length + index
+
+def _parse_obj(data):
+    attributes = {"v": [], "vt": [], "vn": []}
+    counts = []
+    indices = []
+    uv_indices = []
+    normal_indices = []
+    for line in data.decode("utf-8", errors="ignore").splitlines():
+        parts = line.split()
+        if not parts: continue
+        if parts[0] in attributes:
+            attributes[parts[0]].append(parts[1:3] if parts[0] == "vt" else parts[1:4])
+        elif parts[0] == "f":
+            for part in parts[1:]:
+                fields = part.split("/") + ["", ""]
+                indices.append(_obj_index(fields[0], len(attributes["v"])))
+                uv_indices.append(_obj_index(fields[1], len(attributes["vt"])) if fields[1] else None)
+                normal_indices.append(_obj_index(fields[2], len(attributes["vn"])) if fields[2] else None)
+            counts.append(len(parts) - 1)
+        elif parts[0] in ("usemtl", "mtllib"):
+            raise UnsupportedMesh("materials are only kept by the importer")
+
+    points = np.array(attributes["v"], dtype=np.float32).reshape(-1, 3)
+    counts, indices = np.array(counts, dtype=np.int64), np.array(indices, dtype=np.int64)
+    if len(set(index is None for index in uv_indices)) > 1 or len(set(index is None for index in normal_indices)) > 1:
+        raise UnsupportedMesh("faces with and without normals or UVs")
+    if normal_indices and normal_indices[0] is not None:
+        normals = np.array(attributes["vn"], dtype=np.float32).reshape(-1, 3)[normal_indices]
+    else:
+        normals = _face_normals(points, counts, indices)
+    uvs = None
+    if uv_indices and uv_indices[0] is not None:
+        uvs = np.array(attributes["vt"], dtype=np.float32).reshape(-1, 2)[uv_indices]
+    return points, counts, indices, normals, uvs
+
+def _dae_mesh(mesh):
+    # One <mesh> of library_geometries
+    sources = {}
+    for source in mesh.findall("source"):
+        floats = source.findall("float_array")
+        accessor = source.findall(".//accessor")
+        if floats and accessor:
+            stride = int(accessor[0].get("stride", 1))
+            sources["#" + source.get("id")] = np.array(floats[0].text.split(), dtype=np.float32).reshape(-1, stride)
+    vertices = {}
+    for vertex in mesh.findall("vertices"):
+        semantics = {semantic.get("semantic"): sources[semantic.get("source")] for semantic in vertex.findall("input")}
+        vertices["#" + vertex.get("id")] = semantics
+
+    parts = []
+    for primitive in mesh:
+        kind = primitive.tag
+        if kind in ("trifans", "tristrips") or primitive.findall("ph"):
+            raise UnsupportedMesh("triangle strips, fans and polygon holes are only converted by the importer")
+        if kind not in ("triangles", "polylist", "polygons"): continue
+        inputs = primitive.findall("input")
+        stride = max(int(i.get("offset", 0)) for i in inputs) + 1
+        vertex_input = next(i for i in inputs if i.get("semantic") == "VERTEX")
+        vertex = vertices[vertex_input.get("source")]
+        p_elems = primitive.findall("p")
+        p = np.array(" ".join(elem.text or "" for elem in p_elems).split(), dtype=np.int64).reshape(-1, stride)
+        if kind == "triangles":
+            counts = np.full(len(p) // 3, 3)
+        elif kind == "polylist":
+            counts = np.array(primitive.findall("vcount")[0].text.split(), dtype=np.int64)
+        else:
+            counts = np.array([len((elem.text or "").split()) // stride for elem in p_elems])
+
+        positions = vertex["POSITION"][:, :3]
+        indices = p[:, int(vertex_input.get("offset", 0))]
+        # Normals and UVs either per primitive index or per <vertices> entry
+        normal_input = next((i for i in inputs if i.get("semantic") == "NORMAL"), None)
+        if normal_input is not None:
+            normals = sources[normal_input.get("source")][p[:, int(normal_input.get("offset", 0))], :3]
+        elif "NORMAL" in vertex:
+            normals = vertex["NORMAL"][indices, :3]
+        else:
+            normals = _face_normals(positions, counts, indices)
+        uv_inputs = sorted((i for i in inputs if i.get("semantic") == "TEXCOORD"), key=lambda i: int(i.get("set", 0)))
+        if uv_inputs:
+            uvs = sources[uv_inputs[0].get("source")][p[:, int(uv_inputs[0].get("offset", 0))], :2]
+        else:
+            uvs = vertex["TEXCOORD"][indices, :2] if "TEXCOORD" in vertex else None
+        parts.append((positions, counts, indices, normals, uvs))
+    return parts
+
+def _parse_dae(data):
+    root = ElementTree.fromstring(data)
+    # Drop the COLLADA namespace so plain paths work for 1.4 and 1.5 files
+    for elem in root.iter():
+        elem.tag = elem.tag.rsplit("}", 1)[-1]
+
+    if root.findall(".//library_materials/material"):
+        raise UnsupportedMesh("materials are only kept by the importer")
+    # Y_UP is the COLLADA default when the file has no <up_axis>
+    up_axis = root.findall("asset/up_axis")
+    axis = up_axis[0].text.strip() if up_axis else "Y_UP"
+    if axis != "Z_UP":
+        raise UnsupportedMesh(f"{axis} needs the importer's axis conversion")
+    for node in root.findall(".//library_visual_scenes//node"):
+        for transform in node:
+            if transform.tag in ("matrix", "translate", "rotate", "scale", "lookat", "skew"):
+                values = np.array(transform.text.split(), dtype=np.float64)
+                identity = {"matrix": np.eye(4).reshape(-1), "translate": np.zeros(3), "scale": np.ones(3)}
+                expected = identity.get(transform.tag)
+                if transform.tag == "rotate" and values[-1] == 0.0: continue
+                if expected is None or not np.allclose(values, expected):
+                    raise UnsupportedMesh("node transforms are only applied by the importer")
+
+    unit = root.findall("asset/unit")
+    meter = float(unit[0].get("meter", 1.0)) if unit else 1.0
+
+    # Only geometry instanced by the visual scene is drawn, once per instance
+    scenes = {"#" + scene.get("id"): scene for scene in root.findall("library_visual_scenes/visual_scene")}
+    instance = root.findall("scene/instance_visual_scene")
+    scene = scenes.get(instance[0].get("url")) if instance else next(iter(scenes.values()), None)
+    if scene is None:
+        raise UnsupportedMesh("no visual scene")
+    if scene.findall(".//instance_node"):
+        raise UnsupportedMesh("instance_node is only resolved by the importer")
+    geometries = {"#" + geometry.get("id"): geometry for geometry in root.findall("library_geometries/geometry")}
+    meshes = {}
+    parts = []
+    for instance_geometry in scene.iter("instance_geometry"):
+        url = instance_geometry.get("url")
+        if url not in meshes:
+            mesh = geometries[url].findall("mesh")
+            meshes[url] = _dae_mesh(mesh[0]) if mesh else []
+        parts += meshes[url]
+
+    if not parts:
+        raise UnsupportedMesh("no instanced triangle, polylist or polygon primitives")
+    if len(set(uvs is None for _, _, _, _, uvs in parts)) > 1:
+        raise UnsupportedMesh("primitives with and without UVs")
+    offsets = np.cumsum([0] + [len(positions) for positions, _, _, _, _ in parts[:-1]])
+    return (np.concatenate([positions for positions, _, _, _, _ in parts]) * meter,
+            np.concatenate([counts for _, counts, _, _, _ in parts]),
+            np.concatenate([indices + offset for (_, _, indices, _, _), offset in zip(parts, offsets)]),
+            np.concatenate([normals for _, _, _, normals, _ in parts]),
+            None if parts[0][4] is None else np.concatenate([uvs for _, _, _, _, uvs in parts]))
+
+PARSERS = {".stl": _parse_stl, ".obj": _parse_obj, ".dae": _parse_dae}
+
+# ---------------------------------------------------------
+# USD WRITER
+# ---------------------------------------------------------
+def _format_array(values, width):
+    if width == 1:
+        return "[" + ", ".join(str(int(v)) for v in values) + "]"
+    return "[" + ", ".join("(" + ", ".join(f"{v:.9g}" for v in row) + ")" for row in values) + "]"
+
+def write_usda(points, counts, indices, normals, uvs=None):
+    # Z-up, meters: the URDF scale and origin are still applied by the importer
+    points = np.asarray(points, dtype=np.float32)
+    primvars = [f'    normal3f[] normals = {_format_array(normals, 3)} (', '        interpolation = "faceVarying"', "    )"]
+    if uvs is not None:
+        primvars += [f'    texCoord2f[] primvars:st = {_format_array(uvs, 2)} (', '        interpolation = "faceVarying"', "    )"]
+    extent = [points.min(axis=0), points.max(axis=0)] if len(points) else [np.zeros(3), np.zeros(3)]
+    return "\n".join([
+        "#usda 1.0",
+        "(",
+        '    defaultPrim = "mesh"',
+        "    metersPerUnit = 1",
+        '    upAxis = "Z"',
+        ")",
+        "",
+        'def Mesh "mesh"',
+        "{",
+        f"    float3[] extent = {_format_array(extent, 3)}",
+        f"    int[] faceVertexCounts = {_format_array(counts, 1)}",
+        f"    int[] faceVertexIndices = {_format_array(indices, 1)}",
+        f"    point3f[] points = {_format_array(points, 3)}",
+        *primvars,
+        '    uniform token subdivisionScheme = "none"',
+        "}",
+        "",
+    ]).encode()
+
+def convert_mesh(path, weld=False):
+    with open(path, 'rb') as f:
+        data = f.read()
+    points, counts, indices, normals, uvs = PARSERS[os.path.splitext(path)[1].lower()](data)
+    if weld:
+        points, indices = _weld(points, indices)
+    return write_usda(points, counts, indices, normals, uvs)
+
+def _convert_worker(job):
+    # Runs in a worker process: returns (usda bytes or None, seconds, reason)
+    path, weld = job
+    start = time.perf_counter()
+    try:
+        return convert_mesh(path, weld), time.perf_counter() - start, None
+    except UnsupportedMesh as e:
+        return None, time.perf_counter() - start, str(e)
+    except (ValueError, KeyError, IndexError, StopIteration, ElementTree.ParseError) as e:
+        return None, time.perf_counter() - start, f"parse error ({type(e).__name__}: {e})"
+
+# ---------------------------------------------------------
+# PRE-CONVERSION PASS
+# ---------------------------------------------------------
+def _content_key(path, weld):
+    hasher = hashlib.sha256(PRECONVERT_VERSION.encode())
+    hasher.update(os.path.splitext(path)[1].lower().encode())
+    hasher.update(b"weld" if weld else b"")
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def preconvert_meshes(mesh_paths, settings):
+    # mesh_paths maps URDF mesh URIs to files (package resolver). Returns the
+    # same mapping with converted meshes pointing at USD files in the cache.
+    print("--- Pre-converting Meshes ---")
+    cache = DiskCache("meshes", max_bytes=settings.get("cache_size_mb", DEFAULT_CACHE_SIZE_MB) * 1024 * 1024, suffix=".usda")
+
+    files = sorted({path for path in mesh_paths.values() if path and path.lower().endswith(MESH_FORMATS)})
+    weld = bool(settings.get("weld", False))
+    keys = {path: _content_key(path, weld) for path in files}
+    converted = {}
+    misses = []
+    for path in files:
+        if os.path.exists(cache.path(keys[path])):
+            # Refresh the entry for LRU eviction without reading it
+            os.utime(cache.path(keys[path]))
+            cache.hits += 1
+            converted[path] = cache.path(keys[path])
+        else:
+            cache.misses += 1
+            misses.append(path)
+
+    skipped = {}
+    if misses:
+        workers = settings.get("workers", 0) or os.cpu_count() or 1
+        # Spawned workers, since a batch may already be running Isaac Sim in this process
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(misses)), mp_context=context) as pool:
+            for path, (data, seconds, reason) in zip(misses, pool.map(_convert_worker, [(path, weld) for path in misses])):
+                if data is None:
+                    skipped[path] = reason
+                    detail(f"  - {os.path.basename(path)}: left to the importer, {reason}")
+                    continue
+                cache.put(keys[path], data)
+                converted[path] = cache.path(keys[path])
+                detail(f"  + {os.path.basename(path)} ({seconds * 1000.0:.1f} ms)")
+        PROFILER.count("meshes_preconverted", len(misses) - len(skipped))
+    cache.evict()
+
+    hit_rate = 100.0 * cache.hits / len(files) if files else 0.0
+    print(f"  Meshes: {len(files)} file(s), {cache.hits} cached ({hit_rate:.0f}%), "
+          f"{len(misses) - len(skipped)} converted, {len(skipped)} left to the importer")
+    return {uri: converted.get(path, path) for uri, path in mesh_paths.items()}
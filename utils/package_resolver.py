@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from utils.disk_cache import DiskCache
+from utils.instrumentation import detail
+from utils.urdf_parser import find_mesh_uris, resolve_mesh_uri
+
+AMENT_MARKERS = os.path.join("share", "ament_index", "resource_index", "packages")
+IGNORE_MARKERS = ("COLCON_IGNORE", "CATKIN_IGNORE", "AMENT_IGNORE")
+# Workspace folders that never hold source packages
+SKIPPED_DIRS = {"build", "log"}
+INDEX_CACHE_SIZE_MB = 16
+
+# ---------------------------------------------------------
+# PACKAGE INDEX
+# ---------------------------------------------------------
+def _package_name(package_xml, default):
+    try:
+        name = ElementTree.parse(package_xml).getroot().findtext("name")
+    except (ElementTree.ParseError, OSError):
+        name = None
+    return (name or default).strip()
+
+def _scan_root(root, packages, stamps):
+    # Walk down to the first package.xml of each branch. The mtime of every
+    # walked directory and package.xml is stamped, so adding, removing or
+    # renaming a package invalidates the cached index.
+    for dirpath, dirnames, filenames in os.walk(root):
+        stamps[dirpath] = os.stat(dirpath).st_mtime_ns
+        if any(marker in filenames for marker in IGNORE_MARKERS):
+            dirnames[:] = []
+            continue
+        if "package.xml" in filenames:
+            package_xml = os.path.join(dirpath, "package.xml")
+            stamps[package_xml] = os.stat(package_xml).st_mtime_ns
+            packages.setdefault(_package_name(package_xml, os.path.basename(dirpath)), dirpath)
+            dirnames[:] = []
+            continue
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIPPED_DIRS)
+
+def _scan_ament_prefix(prefix, packages, stamps):
+    # Installed packages are listed as empty marker files, no walk needed
+    marker_dir = os.path.join(prefix, AMENT_MARKERS)
+    stamps[marker_dir] = os.stat(marker_dir).st_mtime_ns
+    for name in sorted(os.listdir(marker_dir)):
+        packages.setdefault(name, os.path.join(prefix, "share", name))
+
+def _environment_roots():
+    ament = [p for p in os.environ.get("AMENT_PREFIX_PATH", "").split(os.pathsep) if p]
+    ros = [p for p in os.environ.get("ROS_PACKAGE_PATH", "").split(os.pathsep) if p]
+    return ament, ros
+
+def _is_fresh(entry):
+    for path, stamp in entry["stamps"].items():
+        try:
+            if os.stat(path).st_mtime_ns != stamp:
+                return False
+        except OSError:
+            return False
+    return True
+
+def find_packages(search_roots=()):
+    # Configured roots win over the ament index, which wins over ROS_PACKAGE_PATH
+    ament_prefixes, ros_roots = _environment_roots()
+    search_roots = [os.path.abspath(os.path.expanduser(root)) for root in search_roots]
+    key_source = json.dumps({"roots": search_roots, "ament": ament_prefixes, "ros": ros_roots})
+    key = hashlib.sha1(key_source.encode()).hexdigest()
+
+    cache = DiskCache("package_index", max_bytes=INDEX_CACHE_SIZE_MB * 1024 * 1024, suffix=".json")
+    data = cache.get(key)
+    if data is not None:
+        entry = json.loads(data)
+        if _is_fresh(entry):
+            return entry["packages"], True
+
+    packages = {}
+    stamps = {}
+    for root in search_roots:
+        if os.path.isdir(root):
+            _scan_root(root, packages, stamps)
+        else:
+            print(f"Warning: Package search root not found: {root}")
+    for prefix in ament_prefixes:
+        if os.path.isdir(os.path.join(prefix, AMENT_MARKERS)):
+            _scan_ament_prefix(prefix, packages, stamps)
+    for root in ros_roots:
+        if os.path.isdir(root):
+            _scan_root(root, packages, stamps)
+
+    cache.put(key, json.dumps({"stamps": stamps, "packages": packages}).encode())
+    cache.evict()
+    return packages, False
+
+# ---------------------------------------------------------
+# MESH RESOLUTION
+# ---------------------------------------------------------
+def resolve_mesh_paths(urdf_path, search_roots=(), max_workers=16):
+    # Maps every mesh URI of the URDF to an existing absolute path (or None)
+    packages, cached = find_packages(search_roots)
+    urdf_dir = os.path.dirname(os.path.abspath(urdf_path))
+    uris = find_mesh_uris(urdf_path)
+    candidates = {uri: resolve_mesh_uri(uri, urdf_dir, packages) for uri in uris}
+
+    # Existence checks dominate on network and container filesystems
+    to_check = [path for path in candidates.values() if path]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_check)))) as pool:
+        exists = dict(zip(to_check, pool.map(os.path.isfile, to_check)))
+    mesh_paths = {uri: path if path and exists[path] else None for uri, path in candidates.items()}
+
+    missing = [uri for uri, path in mesh_paths.items() if path is None]
+    used = {uri.split("/")[2] for uri in uris if uri.startswith("package://") and uri.count("/") > 2}
+    print(f"Mesh Paths: {len(uris) - len(missing)}/{len(uris)} resolved, {len(used)} package(s) referenced "
+          f"(package index {'cached' if cached else 'rebuilt'}, {len(packages)} package(s))")
+    for uri in missing:
+        print(f"Warning: Mesh not found: {uri}")
+    return mesh_paths
+
+def write_resolved_urdf(urdf_path, mesh_paths):
+    # Temporary copy of the URDF with absolute mesh paths for the importer.
+    # Returns None when nothing needs rewriting.
+    replacements = {uri: path for uri, path in mesh_paths.items() if path and uri != path}
+    if not replacements:
+        return None
+
+    with open(urdf_path, 'r', encoding="utf-8") as f:
+        text = f.read()
+
+    urdf_dir = os.path.dirname(os.path.abspath(urdf_path))
+    def replace(match):
+        uri = match.group(2)
+        path = replacements.get(uri)
+        if path is None:
+            # Other relative files (textures) must still resolve from the temp copy
+            if "://" in uri or os.path.isabs(uri):
+                return match.group(0)
+            path = os.path.normpath(os.path.join(urdf_dir, uri))
+        detail(f"  + {uri} -> {path}")
+        return f"filename={match.group(1)}{escape(path)}{match.group(1)}"
+
+    text = re.sub(r"filename\s*=\s*([\"'])(.*?)\1", replace, text)
+
+    fd, resolved_path = tempfile.mkstemp(prefix=os.path.splitext(os.path.basename(urdf_path))[0] + "_", suffix=".urdf")
+    with os.fdopen(fd, 'w', encoding="utf-8") as f:
+        f.write(text)
+    return resolved_path
@@ -0,0 +1,201 @@
+import itertools
+
+import numpy as np
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf
+
+from utils.instrumentation import PROFILER, detail
+from utils.sdf_authoring import AttributeBatch
+from utils.stage_index import StageIndex
+from utils.validation import PHYSICS_SOLVERS
+
+DEFAULT_FILTER_MARGIN = 0.01
+
+# physics section key -> (applied schema, attribute, value type)
+SCENE_SETTINGS = {
+    "time_steps_per_second": ("PhysxSceneAPI", "physxScene:timeStepsPerSecond", Sdf.ValueTypeNames.UInt),
+    "solver": ("PhysxSceneAPI", "physxScene:solverType", Sdf.ValueTypeNames.Token),
+}
+ARTICULATION_SETTINGS = {
+    "position_iterations": ("PhysxArticulationAPI", "physxArticulation:solverPositionIterationCount", Sdf.ValueTypeNames.Int),
+    "velocity_iterations": ("PhysxArticulationAPI", "physxArticulation:solverVelocityIterationCount", Sdf.ValueTypeNames.Int),
+    "sleep_threshold": ("PhysxArticulationAPI", "physxArticulation:sleepThreshold", Sdf.ValueTypeNames.Float),
+    "stabilization_threshold": ("PhysxArticulationAPI", "physxArticulation:stabilizationThreshold", Sdf.ValueTypeNames.Float),
+}
+COLLISION_SETTINGS = {
+    "contact_offset": ("PhysxCollisionAPI", "physxCollision:contactOffset", Sdf.ValueTypeNames.Float),
+    "rest_offset": ("PhysxCollisionAPI", "physxCollision:restOffset", Sdf.ValueTypeNames.Float),
+}
+
+def _author(batch, prim, settings, values):
+    # Applies each schema once and queues the configured values
+    for key, (schema, name, value_type) in settings.items():
+        if key not in values: continue
+        if schema not in prim.GetAppliedSchemas():
+            prim.AddAppliedSchema(schema)
+        value = values[key]
+        if value_type == Sdf.ValueTypeNames.Token:
+            value = str(value).upper()
+        batch.set(prim.GetPath(), name, value_type, value)
+
+# ---------------------------------------------------------
+# SELF-COLLISION FILTERING
+# ---------------------------------------------------------
+def _link_spheres(stage, bodies):
+    # Bounding sphere of each body at the rest pose, from its world bounds
+    bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render,
+                                                            UsdGeom.Tokens.proxy, UsdGeom.Tokens.guide])
+    spheres = {}
+    for path in bodies:
+        box = bbox_cache.ComputeWorldBound(stage.GetPrimAtPath(path)).ComputeAlignedRange()
+        if box.IsEmpty(): continue
+        low, high = np.array(box.GetMin()), np.array(box.GetMax())
+        spheres[path] = ((low + high) / 2.0, float(np.linalg.norm(high - low)) / 2.0)
+    return spheres
+
+def _kinematic_tree(stage, index, xform_cache):
+    # Body -> [(neighbour, joint kind, world anchor, travel)] from the joints
+    tree = {}
+    for prim in index.joints.values():
+        joint = UsdPhysics.Joint(prim)
+        body0, body1 = joint.GetBody0Rel().GetTargets(), joint.GetBody1Rel().GetTargets()
+        if not body0 or not body1: continue
+        anchor = np.array(xform_cache.GetLocalToWorldTransform(stage.GetPrimAtPath(body0[0])).Transform(joint.GetLocalPos0Attr().Get() or (0.0, 0.0, 0.0)))
+
+        travel = 0.0
+        if prim.IsA(UsdPhysics.FixedJoint):
+            kind = "fixed"
+        elif prim.IsA(UsdPhysics.PrismaticJoint):
+            kind = "prismatic"
+            lower, upper = UsdPhysics.PrismaticJoint(prim).GetLowerLimitAttr().Get(), UsdPhysics.PrismaticJoint(prim).GetUpperLimitAttr().Get()
+            # Unlimited slides can reach anything
+            travel = max(abs(lower), abs(upper)) if lower is not None and upper is not None and np.isfinite([lower, upper]).all() else np.inf
+        else:
+            # Revolute, spherical and generic joints: any rotation about the anchor
+            kind = "rotating"
+        tree.setdefault(body0[0], []).append((body1[0], kind, anchor, travel))
+        tree.setdefault(body1[0], []).append((body0[0], kind, anchor, travel))
+    return tree
+
+def _path(tree, start, goal):
+    # Joints between two bodies of the (acyclic) kinematic tree
+    stack = [(start, [])]
+    seen = {start}
+    while stack:
+        body, joints = stack.pop()
+        if body == goal:
+            return joints
+        for neighbour, kind, anchor, travel in tree.get(body, []):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                stack.append((neighbour, joints + [(kind, anchor, travel)]))
+    return None
+
+def _never_touching(sphere_a, sphere_b, joints, margin):
+    # B's sphere is swept through every joint from B back to A. The reachable
+    # region stays a spherical shell [low, high] around a point fixed in the
+    # next body, so the test is conservative for any joint position.
+    center, low, high = sphere_b[0], 0.0, sphere_b[1] + margin
+    for kind, anchor, travel in reversed(joints):
+        if kind == "rotating":
+            distance = float(np.linalg.norm(center - anchor))
+            center, low, high = anchor, max(0.0, low - distance, distance - high), distance + high
+        elif kind == "prismatic":
+            if not np.isfinite(travel):
+                return False
+            low, high = max(0.0, low - travel), high + travel
+    distance = float(np.linalg.norm(sphere_a[0] - center))
+    return distance - sphere_a[1] > high or distance + sphere_a[1] < low
+
+def filter_self_collisions(stage, index, filter_config):
+    # Pairs that never need contact generation: bodies joined by a joint,
+    # plus bodies whose swept bounds can never overlap
+    xform_cache = UsdGeom.XformCache()
+    tree = _kinematic_tree(stage, index, xform_cache)
+    bodies = sorted(tree)
+    spheres = _link_spheres(stage, bodies)
+    margin = filter_config.get("margin", DEFAULT_FILTER_MARGIN)
+
+    filtered = {}
+    adjacent = never = 0
+    for body_a, body_b in itertools.combinations(bodies, 2):
+        joints = _path(tree, body_a, body_b)
+        if joints is None: continue
+        # Adjacent: a single joint, or only fixed joints in between
+        if filter_config.get("adjacent", True) and (len(joints) == 1 or all(kind == "fixed" for kind, _, _ in joints)):
+            adjacent += 1
+        elif filter_config.get("never_touching", True) and body_a in spheres and body_b in spheres \
+                and _never_touching(spheres[body_a], spheres[body_b], joints, margin):
+            never += 1
+        else:
+            continue
+        filtered.setdefault(body_a, []).append(body_b)
+
+    for body, others in filtered.items():
+        pairs = UsdPhysics.FilteredPairsAPI.Apply(stage.GetPrimAtPath(body))
+        pairs.CreateFilteredPairsRel().SetTargets([Sdf.Path(other) for other in others])
+        detail(f"  + {Sdf.Path(body).name}: {len(others)} filtered pair(s)")
+
+    total = len(bodies) * (len(bodies) - 1) // 2
+    PROFILER.count("filtered_pairs", adjacent + never)
+    return {"pairs": total, "adjacent": adjacent, "never_touching": never}
+
+# ---------------------------------------------------------
+# PHYSICS PROFILE
+# ---------------------------------------------------------
+def apply_physics_profile(stage, robot_prim_path, config_data):
+    print("--- Applying Physics Profile ---")
+    physics_config = config_data.get("physics", {}) or {}
+    solver = str(physics_config.get("solver", "TGS")).upper()
+    if "solver" in physics_config and solver not in PHYSICS_SOLVERS:
+        print(f"Warning: Unknown physics solver '{physics_config['solver']}', expected TGS or PGS")
+        physics_config = {key: value for key, value in physics_config.items() if key != "solver"}
+
+    index = StageIndex(stage, robot_prim_path)
+    batch = AttributeBatch()
+
+    # Scene: the importer's physics scene, next to or below the robot prim
+    robot_prim = stage.GetPrimAtPath(robot_prim_path)
+    scenes = [prim for prim in list(stage.GetPseudoRoot().GetChildren()) + list(robot_prim.GetChildren()) if prim.IsA(UsdPhysics.Scene)]
+    scene_keys = [key for key in SCENE_SETTINGS if key in physics_config]
+    if scene_keys and not scenes:
+        print("Warning: No physics scene in the USD, scene settings skipped")
+    for scene in scenes:
+        _author(batch, scene, SCENE_SETTINGS, physics_config)
+        detail(f"  + Scene: {scene.GetPath()} ({', '.join(f'{key}={physics_config[key]}' for key in scene_keys) or 'unchanged'})")
+
+    # Articulation: iterations, thresholds and self-collision
+    articulation_config = physics_config.get("articulation", {}) or {}
+    root = stage.GetPrimAtPath(index.articulation_root) if index.articulation_root else None
+    if root is None:
+        print("Warning: No articulation root found, articulation settings skipped")
+    else:
+        _author(batch, root, ARTICULATION_SETTINGS, articulation_config)
+        if "self_collision" in physics_config:
+            if "PhysxArticulationAPI" not in root.GetAppliedSchemas():
+                root.AddAppliedSchema("PhysxArticulationAPI")
+            batch.set(root.GetPath(), "physxArticulation:enabledSelfCollisions", Sdf.ValueTypeNames.Bool, bool(physics_config["self_collision"]))
+
+    # Contact offsets on every collider (instanced colliders keep their prototype's)
+    colliders = 0
+    if any(key in physics_config for key in COLLISION_SETTINGS):
+        iterator = iter(Usd.PrimRange(robot_prim))
+        for prim in iterator:
+            if prim.IsInstance():
+                iterator.PruneChildren()
+            elif prim.HasAPI(UsdPhysics.CollisionAPI):
+                _author(batch, prim, COLLISION_SETTINGS, physics_config)
+                colliders += 1
+
+    authored = batch.commit(stage.GetEditTarget().GetLayer())
+
+    filters = None
+    if physics_config.get("self_collision", False):
+        filters = filter_self_collisions(stage, index, physics_config.get("self_collision_filter", {}) or {})
+
+    iterations = "/".join(str(articulation_config.get(key, "-")) for key in ("position_iterations", "velocity_iterations"))
+    print(f"  Physics: {physics_config.get('time_steps_per_second', 'default')} steps/s, solver {solver if 'solver' in physics_config else 'default'}, "
+          f"iterations {iterations}, {colliders} collider(s) with contact offsets, {authored} attribute(s)")
+    if filters is not None:
+        print(f"  Self-collision: {filters['adjacent'] + filters['never_touching']}/{filters['pairs']} body pair(s) filtered "
+              f"({filters['adjacent']} adjacent, {filters['never_touching']} never touching)")
+    return filters
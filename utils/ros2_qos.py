@@ -0,0 +1,89 @@
+import json
+
+# Kit-free on purpose: profiles are also checked before SimulationApp is started
+
+# YAML values (rclpy names) -> tokens of the bridge's qosProfile JSON
+QOS_TOKENS = {
+    "history": {"system_default": "systemDefault", "keep_last": "keepLast", "keep_all": "keepAll"},
+    "reliability": {"system_default": "systemDefault", "reliable": "reliable", "best_effort": "bestEffort"},
+    "durability": {"system_default": "systemDefault", "volatile": "volatile", "transient_local": "transientLocal"},
+    "liveliness": {"system_default": "systemDefault", "automatic": "automatic", "manual_by_topic": "manualByTopic"},
+}
+QOS_DURATIONS = {"deadline": "deadline", "lifespan": "lifespan", "lease_duration": "leaseDuration"}
+
+# Same defaults as rclpy's qos_profile_* presets. Durations are seconds, 0 = unset.
+QOS_PRESETS = {
+    "default": {"history": "keep_last", "depth": 10, "reliability": "reliable", "durability": "volatile"},
+    "sensor_data": {"history": "keep_last", "depth": 5, "reliability": "best_effort", "durability": "volatile"},
+    "system_default": {"history": "system_default", "depth": 0, "reliability": "system_default", "durability": "system_default"},
+}
+
+# ros2.qos entries for the topics that have no config section of their own
+QOS_TOPICS = ("tf", "joint_states", "odom", "cmd_vel")
+
+def _profile_settings(profiles, name, seen=()):
+    # User profiles extend a preset or another profile through 'base'. A
+    # profile named like a preset overrides it and may use it as its base.
+    if name in profiles and name not in seen:
+        settings = dict(profiles[name] or {})
+        base = _profile_settings(profiles, settings.pop("base", "default"), seen + (name,))
+        return dict(base, **settings)
+    if name in QOS_PRESETS:
+        return dict(QOS_PRESETS[name])
+    if name in seen:
+        raise ValueError(f"profile '{name}' is its own base")
+    raise ValueError(f"unknown QoS profile '{name}'")
+
+def qos_settings(ros_config, reference):
+    # reference is a profile name or an inline mapping, returns the merged
+    # settings or None when the bridge default should be kept
+    if not reference:
+        return None
+    profiles = ros_config.get("qos_profiles") or {}
+    if isinstance(reference, dict):
+        settings = dict(reference)
+        return dict(_profile_settings(profiles, settings.pop("base", "default")), **settings)
+    return _profile_settings(profiles, str(reference))
+
+def qos_errors(settings):
+    errors = []
+    for key, value in settings.items():
+        if key in QOS_TOKENS:
+            if value not in QOS_TOKENS[key]:
+                errors.append(f"unknown {key} '{value}', expected one of {', '.join(QOS_TOKENS[key])}")
+        elif key == "depth" or key in QOS_DURATIONS:
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                errors.append(f"{key} must be a number >= 0, got '{value}'")
+        else:
+            errors.append(f"unknown QoS setting '{key}'")
+    if settings.get("history") == "keep_last" and settings.get("depth", 0) < 1:
+        errors.append("keep_last needs depth >= 1")
+    return errors
+
+def qos_profile_json(ros_config, reference):
+    # Value for the inputs:qosProfile attribute of the bridge nodes ("" keeps
+    # the node's default)
+    settings = qos_settings(ros_config, reference)
+    if settings is None:
+        return ""
+    profile = {key: QOS_TOKENS[key][settings.get(key, "system_default")] for key in QOS_TOKENS}
+    profile["depth"] = int(settings.get("depth", 0))
+    for key, name in QOS_DURATIONS.items():
+        profile[name] = float(settings.get(key, 0.0))
+    return json.dumps(profile)
+
+def qos_references(config_data):
+    # (where, reference) for every QoS assignment in the config
+    ros_config = config_data.get("ros2") or {}
+    references = [(f"ros2.qos.{topic}", reference) for topic, reference in (ros_config.get("qos") or {}).items()]
+    for name, settings in (config_data.get("sensors") or {}).items():
+        settings = settings or {}
+        if "qos" in settings:
+            references.append((f"sensors.{name}.qos", settings["qos"]))
+        for stream in ("rgb", "depth", "pcl"):
+            if "qos" in (settings.get(stream) or {}):
+                references.append((f"sensors.{name}.{stream}.qos", settings[stream]["qos"]))
+    for ctrl_name, ctrl_cfg in (ros_config.get("controllers") or {}).items():
+        if "qos" in (ctrl_cfg or {}):
+            references.append((f"ros2.controllers.{ctrl_name}.qos", ctrl_cfg["qos"]))
+    return references
@@ -0,0 +1,211 @@
+import math
+import os
+import resource
+import time
+
+from pxr import Usd, UsdPhysics, Sdf, Gf
+
+from utils.articulation_merge import KEPT_FRAME_KEY
+from utils.instrumentation import detail
+
+SCENE_ROOT = "/World"
+GRAPH_NODE_TYPE = "OmniGraphNode"
+ROS2_NODE_PREFIX = "isaacsim.ros2.bridge."
+# Bridge nodes without a ROS node of their own
+NO_NAMESPACE_NODES = {"isaacsim.ros2.bridge.ROS2Context", "isaacsim.ros2.bridge.ROS2QoSProfile"}
+# Frame id inputs of the generated graphs (sensors, odometry, odometry TF)
+FRAME_ATTRIBUTES = ("inputs:frameId", "inputs:chassisFrameId", "inputs:odomFrameId", "inputs:childFrameId", "inputs:parentFrameId")
+# Read by the TF publishers instead of the prim name
+NAME_OVERRIDE = "isaac:nameOverride"
+# Copied from the robot so the references are not rescaled
+STAGE_METADATA = ("upAxis", "metersPerUnit", "kilogramsPerUnit")
+
+# ---------------------------------------------------------
+# ROBOT ASSET
+# ---------------------------------------------------------
+def _attribute_type(prim, name, default):
+    attr = prim.GetAttribute(name)
+    return attr.GetTypeName() if attr and attr.GetTypeName() else default
+
+def scan_robot(usd_path):
+    # Everything an instance overrides, as paths relative to the robot prim.
+    # Payloads stay unloaded and instanced meshes are skipped.
+    stage = Usd.Stage.Open(usd_path, Usd.Stage.LoadNone)
+    robot = stage.GetDefaultPrim()
+    if not robot:
+        raise ValueError(f"{usd_path} has no default prim")
+
+    pseudo_root = stage.GetRootLayer().pseudoRoot
+    asset = {"name": robot.GetName(), "namespace_nodes": [], "context_nodes": [], "frame_ids": [], "frames": [],
+             "metadata": {key: pseudo_root.GetInfo(key) for key in STAGE_METADATA if pseudo_root.HasInfo(key)}}
+    iterator = iter(Usd.PrimRange(robot))
+    for prim in iterator:
+        path = prim.GetPath().MakeRelativePath(robot.GetPath())
+        if prim.IsInstance():
+            iterator.PruneChildren()
+        elif prim.GetTypeName() == GRAPH_NODE_TYPE:
+            node_type = prim.GetAttribute("node:type").Get() or ""
+            if node_type == "isaacsim.ros2.bridge.ROS2Context":
+                asset["context_nodes"].append((path, _attribute_type(prim, "inputs:domain_id", Sdf.ValueTypeNames.UChar)))
+            elif node_type.startswith(ROS2_NODE_PREFIX) and node_type not in NO_NAMESPACE_NODES:
+                asset["namespace_nodes"].append((path, _attribute_type(prim, "inputs:nodeNamespace", Sdf.ValueTypeNames.String)))
+            for name in FRAME_ATTRIBUTES:
+                value = prim.GetAttribute(name).Get() if prim.HasAttribute(name) else None
+                if value:
+                    asset["frame_ids"].append((path, name, _attribute_type(prim, name, Sdf.ValueTypeNames.String), value))
+        elif prim.HasAPI(UsdPhysics.RigidBodyAPI) or prim.GetCustomDataByKey(KEPT_FRAME_KEY):
+            # TF frames: links and the frames kept by merge_fixed_joints
+            asset["frames"].append((path, prim.GetName()))
+    return asset
+
+# ---------------------------------------------------------
+# INSTANCE OVERRIDES
+# ---------------------------------------------------------
+def instance_path(instance):
+    return Sdf.Path(SCENE_ROOT).AppendChild(instance["name"])
+
+def _set(layer, prim_path, name, type_name, value):
+    spec = Sdf.CreatePrimInLayer(layer, prim_path)
+    attr_spec = spec.attributes.get(name) or Sdf.AttributeSpec(spec, name, type_name, declaresCustom=True)
+    attr_spec.default = value
+
+def write_instance_layer(layer_path, instance, asset):
+    # Over-only layer holding what differs between instances: ROS namespace,
+    # domain id and TF frame prefix. The robot itself is never copied.
+    layer = Sdf.Layer.FindOrOpen(layer_path) if os.path.exists(layer_path) else None
+    if layer is None:
+        layer = Sdf.Layer.CreateNew(layer_path)
+    layer.Clear()
+
+    robot_path = instance_path(instance).AppendChild(asset["name"])
+    namespace = instance.get("namespace", instance["name"])
+    prefix = instance.get("frame_prefix", f"{instance['name']}/")
+    with Sdf.ChangeBlock():
+        for path, type_name in asset["namespace_nodes"]:
+            _set(layer, robot_path.AppendPath(path), "inputs:nodeNamespace", type_name, namespace)
+        if instance.get("domain_id") is not None:
+            for path, type_name in asset["context_nodes"]:
+                _set(layer, robot_path.AppendPath(path), "inputs:domain_id", type_name, int(instance["domain_id"]))
+                _set(layer, robot_path.AppendPath(path), "inputs:useDomainIDEnvVar", Sdf.ValueTypeNames.Bool, False)
+        if prefix:
+            for path, name, type_name, value in asset["frame_ids"]:
+                _set(layer, robot_path.AppendPath(path), name, type_name, prefix + value)
+            for path, frame in asset["frames"]:
+                _set(layer, robot_path.AppendPath(path), NAME_OVERRIDE, Sdf.ValueTypeNames.String, prefix + frame)
+    layer.Save()
+    return layer
+
+# ---------------------------------------------------------
+# SCENE
+# ---------------------------------------------------------
+def instance_layer_path(scene_path, instance):
+    stem, ext = os.path.splitext(scene_path)
+    return os.path.join(stem + "_instances", instance["name"] + ext)
+
+def _define_xform(layer, path, position=None, yaw=None):
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    spec.typeName = "Xform"
+    if position is None:
+        return spec
+    half = math.radians(yaw or 0.0) / 2.0
+    ops = [("xformOp:translate", Sdf.ValueTypeNames.Double3, Gf.Vec3d(*position)),
+           ("xformOp:orient", Sdf.ValueTypeNames.Quatd, Gf.Quatd(math.cos(half), 0.0, 0.0, math.sin(half)))]
+    for name, type_name, value in ops:
+        Sdf.AttributeSpec(spec, name, type_name).default = value
+    Sdf.AttributeSpec(spec, "xformOpOrder", Sdf.ValueTypeNames.TokenArray, Sdf.VariabilityUniform).default = [name for name, _, _ in ops]
+    return spec
+
+def compose_scene(robot_usd, instances, scene_path):
+    # Root layer: one Xform per instance holding the pose and a reference to
+    # the robot USD. Each instance's overrides are a sublayer of its own.
+    print(f"--- Composing Scene: {len(instances)} instance(s) of {os.path.basename(robot_usd)} ---")
+    names = [instance["name"] for instance in instances]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate instance name(s): {', '.join(duplicates)}")
+
+    asset = scan_robot(robot_usd)
+    scene_dir = os.path.dirname(os.path.abspath(scene_path))
+    os.makedirs(os.path.dirname(instance_layer_path(scene_path, instances[0])), exist_ok=True)
+
+    root = Sdf.Layer.FindOrOpen(scene_path) if os.path.exists(scene_path) else None
+    if root is None:
+        root = Sdf.Layer.CreateNew(scene_path)
+    root.Clear()
+    root.defaultPrim = SCENE_ROOT.lstrip("/")
+    for key, value in asset["metadata"].items():
+        root.pseudoRoot.SetInfo(key, value)
+
+    reference = Sdf.Reference(os.path.relpath(os.path.abspath(robot_usd), scene_dir))
+    sublayers = []
+    with Sdf.ChangeBlock():
+        _define_xform(root, Sdf.Path(SCENE_ROOT))
+        for instance in instances:
+            _define_xform(root, instance_path(instance), instance.get("position", (0.0, 0.0, 0.0)), instance.get("yaw", 0.0))
+            # Typeless, the robot's own type and transform come through the reference
+            robot_spec = Sdf.CreatePrimInLayer(root, instance_path(instance).AppendChild(asset["name"]))
+            robot_spec.specifier = Sdf.SpecifierDef
+            robot_spec.referenceList.Prepend(reference)
+
+    for instance in instances:
+        layer_path = instance_layer_path(scene_path, instance)
+        write_instance_layer(layer_path, instance, asset)
+        sublayers.append(os.path.relpath(layer_path, scene_dir))
+        detail(f"  + {instance['name']}: namespace '{instance.get('namespace', instance['name'])}', "
+               f"frame prefix '{instance.get('frame_prefix', instance['name'] + '/')}'"
+               + (f", domain {instance['domain_id']}" if instance.get("domain_id") is not None else ""))
+    root.subLayerPaths = sublayers
+    root.Save()
+
+    asset_bytes = sum(os.path.getsize(path) for path in _asset_files(robot_usd))
+    override_bytes = sum(os.path.getsize(os.path.join(scene_dir, path)) for path in sublayers)
+    print(f"  Scene: {os.path.getsize(scene_path) / 1024.0:.1f} KiB root, {override_bytes / 1024.0:.1f} KiB of overrides "
+          f"({override_bytes / 1024.0 / len(instances):.1f} KiB per instance) for a {asset_bytes / (1024.0 * 1024.0):.1f} MiB robot")
+    print(f"  Overrides per instance: {len(asset['namespace_nodes'])} namespace(s), {len(asset['frame_ids'])} frame id(s), "
+          f"{len(asset['frames'])} TF frame(s), {len(asset['context_nodes'])} context(s)")
+    return {"asset_bytes": asset_bytes, "override_bytes": override_bytes, "instances": len(instances)}
+
+def _asset_files(usd_path):
+    # The robot USD and every layer it composes (layered output, payloads)
+    files = []
+    pending = [os.path.abspath(usd_path)]
+    while pending:
+        path = pending.pop()
+        layer = Sdf.Layer.FindOrOpen(path)
+        if layer is None or layer.realPath in files: continue
+        files.append(layer.realPath)
+        pending += [layer.ComputeAbsolutePath(dependency) for dependency in layer.GetCompositionAssetDependencies()]
+    return files
+
+def grid_instances(count, spacing, prefix="robot", domain_id=None):
+    # Square grid of instances named <prefix>_<i>, namespaced and prefixed by name
+    columns = max(1, math.ceil(math.sqrt(count)))
+    instances = []
+    for i in range(count):
+        instance = {"name": f"{prefix}_{i}", "position": [(i % columns) * spacing, (i // columns) * spacing, 0.0], "yaw": 0.0}
+        if domain_id is not None:
+            instance["domain_id"] = domain_id
+        instances.append(instance)
+    return instances
+
+# ---------------------------------------------------------
+# LOAD MEASUREMENT
+# ---------------------------------------------------------
+def _rss_mib():
+    # Current resident set, so the interpreter and imports are not counted
+    with open("/proc/self/statm", 'r') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024.0 * 1024.0)
+
+def measure_stage(usd_path):
+    # Full open with payloads loaded, meant to run in a fresh process
+    baseline_mib = _rss_mib()
+    start = time.perf_counter()
+    stage = Usd.Stage.Open(usd_path)
+    open_seconds = time.perf_counter() - start
+    return {
+        "open_ms": open_seconds * 1000.0,
+        "prims": sum(1 for _ in stage.Traverse(Usd.TraverseInstanceProxies())),
+        "prototypes": len(stage.GetPrototypes()),
+        "rss_mib": _rss_mib() - baseline_mib,
+    }
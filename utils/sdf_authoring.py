@@ -0,0 +1,51 @@
+from pxr import Sdf
+
+from utils.instrumentation import PROFILER
+
+def _as_path(path):
+    # Prim paths from the Usd API are already Sdf.Path, skip the string round trip
+    return path if isinstance(path, Sdf.Path) else Sdf.Path(str(path))
+
+# ---------------------------------------------------------
+# BATCHED SDF AUTHORING
+# ---------------------------------------------------------
+class AttributeBatch:
+    # Collects prim definitions and attribute values, then writes them to a
+    # layer inside one Sdf.ChangeBlock so change notices and recomposition
+    # happen once instead of once per attribute.
+    def __init__(self):
+        self.prims = []     # (path, type name)
+        self.values = []    # (path, attribute name, value type, value, variability)
+
+    def __len__(self):
+        return len(self.values)
+
+    def define_prim(self, path, type_name):
+        self.prims.append((_as_path(path), type_name))
+
+    def set(self, path, name, value_type, value, variability=Sdf.VariabilityVarying):
+        self.values.append((_as_path(path), name, value_type, value, variability))
+
+    def commit(self, layer):
+        # Only the Sdf API is safe to use inside a change block
+        with Sdf.ChangeBlock():
+            for path, type_name in self.prims:
+                prim_spec = Sdf.CreatePrimInLayer(layer, path)
+                prim_spec.specifier = Sdf.SpecifierDef
+                prim_spec.typeName = type_name
+
+            # Attribute specs are looked up by property path, the prim spec is
+            # only created when the attribute does not exist yet
+            for path, name, value_type, value, variability in self.values:
+                attr_path = path.AppendProperty(name)
+                attr_spec = layer.GetAttributeAtPath(attr_path)
+                if not attr_spec:
+                    Sdf.JustCreatePrimAttributeInLayer(layer, attr_path, value_type, variability)
+                    attr_spec = layer.GetAttributeAtPath(attr_path)
+                attr_spec.default = value
+
+        count = len(self.values)
+        PROFILER.count("attributes_authored", count)
+        self.prims = []
+        self.values = []
+        return count
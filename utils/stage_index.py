@@ -0,0 +1,105 @@
+from pxr import Usd, UsdGeom, UsdPhysics, Sdf
+
+from utils.instrumentation import PROFILER
+
+# ---------------------------------------------------------
+# STAGE INDEX
+# ---------------------------------------------------------
+class StageIndex:
+    # Single walk over the robot shared by the drive, sensor and ROS 2 stages.
+    # Geometry subtrees are pruned since no stage needs to look inside them.
+    def __init__(self, stage, robot_prim_path):
+        self.stage = stage
+        self.robot_prim_path = robot_prim_path
+        self.joints = {}            # joint name -> Usd.Prim
+        self.joint_types = {}       # joint name -> USD type name (e.g. PhysicsRevoluteJoint)
+        self.links = {}             # link/frame/sensor name -> path string
+        self.graphs = {}            # graph name -> path string
+        self.articulation_root = None
+
+        # Instrumentation
+        self.traversals = 0
+        self.prims_visited = 0
+
+        self.build()
+
+    def build(self):
+        self.joints.clear()
+        self.joint_types.clear()
+        self.links.clear()
+        self.graphs.clear()
+        self.articulation_root = None
+        self.traversals += 1
+
+        visited = 0
+        robot_prim = self.stage.GetPrimAtPath(self.robot_prim_path)
+        iterator = iter(Usd.PrimRange(robot_prim))
+        for prim in iterator:
+            visited += 1
+            name = prim.GetName()
+            path = prim.GetPath().pathString
+
+            if self.articulation_root is None and prim.HasAPI(UsdPhysics.ArticulationRootAPI):
+                self.articulation_root = path
+
+            if prim.IsA(UsdPhysics.Joint):
+                self.joints[name] = prim
+                self.joint_types[name] = prim.GetTypeName()
+                iterator.PruneChildren()
+            elif prim.GetTypeName() == "OmniGraph":
+                self.graphs[name] = path
+                iterator.PruneChildren()
+            elif prim.IsA(UsdGeom.Gprim) or prim.IsInstance():
+                # Geometry, including instanced meshes
+                iterator.PruneChildren()
+            else:
+                self.links[name] = path
+
+        self.prims_visited += visited
+        PROFILER.count("prims_visited", visited)
+
+    def add_link(self, name, path):
+        self.links[name] = path
+
+    def add_graph(self, name, path):
+        self.graphs[name] = path
+
+    def remove(self, path):
+        for table in (self.links, self.graphs):
+            for name in [name for name, value in table.items() if value == path]:
+                del table[name]
+
+    def summary(self):
+        return f"{len(self.joints)} joints, {len(self.links)} frames, {self.prims_visited} prims visited in {self.traversals} traversal(s)"
+
+# ---------------------------------------------------------
+# POPULATION MASK
+# ---------------------------------------------------------
+GEOMETRY_TYPES = {"Mesh", "Cube", "Sphere", "Cylinder", "Capsule", "Cone", "Points", "BasisCurves"}
+
+def build_population_mask(root_layer, robot_prim_path, link_names=()):
+    # Spec-only walk of the root layer stack (no composition, no values read)
+    # collecting joints and the requested links. Opening a stage with this
+    # mask composes those prims and their ancestors, but no other geometry.
+    layers = [root_layer] + [Sdf.Layer.FindOrOpen(root_layer.ComputeAbsolutePath(path)) for path in root_layer.subLayerPaths]
+    link_names = set(link_names)
+
+    mask = Usd.StagePopulationMask()
+    for layer in layers:
+        if layer is None: continue
+        stack = [layer.GetPrimAtPath(robot_prim_path)]
+        while stack:
+            spec = stack.pop()
+            if spec is None: continue
+            if spec.typeName.startswith("Physics") and spec.typeName.endswith("Joint"):
+                mask.Add(spec.path)
+                continue
+            if spec.typeName in GEOMETRY_TYPES:
+                continue
+            if spec.name in link_names:
+                mask.Add(spec.path)
+            stack.extend(spec.nameChildren)
+
+    if mask.IsEmpty():
+        mask.Add(Sdf.Path(robot_prim_path))
+    return mask
@@ -0,0 +1,59 @@
+import os
+from xml.etree import ElementTree
+
+# ---------------------------------------------------------
+# MESH REFERENCES
+# ---------------------------------------------------------
+def find_mesh_uris(urdf_path):
+    # Stream the URDF so large descriptions are never held as a full tree
+    uris = []
+    for _, elem in ElementTree.iterparse(urdf_path, events=("end",)):
+        if elem.tag == "mesh" and elem.get("filename"):
+            uris.append(elem.get("filename"))
+        elem.clear()
+
+    # Keep the first occurrence of each mesh
+    return list(dict.fromkeys(uris))
+
+def resolve_mesh_uri(uri, urdf_dir, packages=None):
+    if uri.startswith("file://"):
+        return uri[len("file://"):]
+    if uri.startswith("package://") and packages:
+        # package://<name>/<relative path> against the package index
+        name, _, relative = uri[len("package://"):].partition("/")
+        return os.path.join(packages[name], relative) if name in packages else None
+    if "://" in uri:
+        # Other schemes (and package:// without an index) cannot be resolved
+        return None
+    if os.path.isabs(uri):
+        return uri
+    return os.path.normpath(os.path.join(urdf_dir, uri))
+
+# ---------------------------------------------------------
+# KINEMATIC STRUCTURE
+# ---------------------------------------------------------
+def parse_urdf(urdf_path):
+    # Links and joints declared directly under <robot>. Nested tags with the
+    # same names (<transmission><joint>, <gazebo reference>) are ignored.
+    links = []
+    joints = {}
+    depth = 0
+    joint = None
+    for event, elem in ElementTree.iterparse(urdf_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and elem.tag == "joint":
+                joint = {"type": elem.get("type"), "parent": None, "child": None}
+                joints[elem.get("name")] = joint
+            continue
+
+        if depth == 2 and elem.tag == "link":
+            links.append(elem.get("name"))
+        elif depth == 2 and elem.tag == "joint":
+            joint = None
+        elif depth == 3 and joint is not None and elem.tag in ("parent", "child"):
+            joint[elem.tag] = elem.get("link")
+        depth -= 1
+        elem.clear()
+
+    return {"links": links, "joints": joints}
@@ -0,0 +1,134 @@
+import difflib
+import os
+from xml.etree import ElementTree
+
+from utils.ros2_qos import QOS_PRESETS, QOS_TOPICS, qos_errors, qos_references, qos_settings
+from utils.urdf_parser import parse_urdf
+
+# Kit-free on purpose: runs before SimulationApp is started
+SENSOR_TYPES = ("camera", "lidar", "imu")
+LIDAR_IMPLEMENTATIONS = ("physx", "rtx")
+CONTROLLER_TYPES = ("position", "velocity")
+WHEEL_JOINT_TYPES = ("revolute", "continuous")
+PHYSICS_SOLVERS = ("TGS", "PGS")
+
+def _suggest(name, candidates):
+    match = difflib.get_close_matches(str(name), candidates, n=1)
+    return f" (did you mean '{match[0]}'?)" if match else ""
+
+# ---------------------------------------------------------
+# CONFIG / URDF CROSS-CHECK
+# ---------------------------------------------------------
+def validate_config(config_data, urdf):
+    # Returns (errors, warnings). Every reference is checked, so a single run
+    # lists all typos instead of stopping at the first one.
+    errors = []
+    warnings = []
+    links = urdf["links"]
+    joints = urdf["joints"]
+    joint_names = list(joints)
+
+    def check_link(name, where):
+        if name not in links:
+            errors.append(f"{where}: link '{name}' not in URDF{_suggest(name, links)}")
+            return False
+        return True
+
+    def check_joint(name, where, allowed_types=None):
+        if name not in joints:
+            errors.append(f"{where}: joint '{name}' not in URDF{_suggest(name, joint_names)}")
+            return False
+        if allowed_types and joints[name]["type"] not in allowed_types:
+            errors.append(f"{where}: joint '{name}' is '{joints[name]['type']}', expected {' or '.join(allowed_types)}")
+            return False
+        return True
+
+    # Drives
+    for name in (config_data.get("joints") or {}):
+        if check_joint(name, "joints") and joints[name]["type"] == "fixed":
+            warnings.append(f"joints: '{name}' is a fixed joint, its drive settings are ignored")
+
+    # Sensors
+    for name, settings in (config_data.get("sensors") or {}).items():
+        settings = settings or {}
+        where = f"sensors.{name}"
+        if "parent_link" not in settings:
+            errors.append(f"{where}: parent_link is missing")
+        else:
+            check_link(settings["parent_link"], f"{where}.parent_link")
+        stype = settings.get("type")
+        if stype not in SENSOR_TYPES:
+            errors.append(f"{where}: unknown type '{stype}', expected one of {', '.join(SENSOR_TYPES)}")
+        if stype == "lidar" and str(settings.get("implementation", "physx")).lower() not in LIDAR_IMPLEMENTATIONS:
+            errors.append(f"{where}: unknown implementation '{settings.get('implementation')}', expected physx or rtx")
+        if name in links:
+            warnings.append(f"{where}: sensor name is also a link name, the sensor prim may shadow it")
+
+    # Per-link collision and LOD overrides
+    for name in ((config_data.get("collision") or {}).get("links") or {}):
+        check_link(name, "collision.links")
+    for name in ((config_data.get("visual_lod") or {}).get("links") or {}):
+        check_link(name, "visual_lod.links")
+    for name in ((config_data.get("merge_fixed_joints") or {}).get("protected_links") or []):
+        check_link(name, "merge_fixed_joints.protected_links")
+
+    # Physics profile
+    physics_config = config_data.get("physics") or {}
+    if "solver" in physics_config and str(physics_config["solver"]).upper() not in PHYSICS_SOLVERS:
+        errors.append(f"physics.solver: unknown solver '{physics_config['solver']}', expected TGS or PGS")
+    if "contact_offset" in physics_config and physics_config.get("rest_offset", 0.0) >= physics_config["contact_offset"]:
+        errors.append("physics.rest_offset: must be smaller than contact_offset")
+    if physics_config.get("self_collision_filter") and not physics_config.get("self_collision", False):
+        warnings.append("physics.self_collision_filter: self_collision is disabled, no pair is filtered")
+
+    # ROS 2 references are only checked when the graphs are built
+    ros_config = config_data.get("ros2") or {}
+    if ros_config.get("enabled", False):
+        mb_config = ros_config.get("mobile_base") or {}
+        if mb_config.get("enabled", False):
+            wheel_joints = mb_config.get("wheel_joints") or []
+            if len(wheel_joints) != 2:
+                errors.append(f"ros2.mobile_base.wheel_joints: expected 2 joints, got {len(wheel_joints)}")
+            for name in wheel_joints:
+                check_joint(name, "ros2.mobile_base.wheel_joints", WHEEL_JOINT_TYPES)
+            check_link(mb_config.get("frame_base", "base_footprint"), "ros2.mobile_base.frame_base")
+
+        for ctrl_name, ctrl_cfg in (ros_config.get("controllers") or {}).items():
+            ctrl_cfg = ctrl_cfg or {}
+            where = f"ros2.controllers.{ctrl_name}"
+            if ctrl_cfg.get("type", "position") not in CONTROLLER_TYPES:
+                errors.append(f"{where}: unknown type '{ctrl_cfg.get('type')}', expected position or velocity")
+            if not ctrl_cfg.get("joints"):
+                errors.append(f"{where}: no joints listed")
+            for name in ctrl_cfg.get("joints") or []:
+                if check_joint(name, f"{where}.joints") and joints[name]["type"] == "fixed":
+                    errors.append(f"{where}.joints: joint '{name}' is fixed and cannot be commanded")
+
+        # QoS profiles, then every topic they are assigned to
+        profiles = ros_config.get("qos_profiles") or {}
+        for topic in (ros_config.get("qos") or {}):
+            if topic not in QOS_TOPICS:
+                errors.append(f"ros2.qos: unknown topic '{topic}', expected one of {', '.join(QOS_TOPICS)}")
+        for where, reference in [(f"ros2.qos_profiles.{name}", name) for name in profiles] + qos_references(config_data):
+            try:
+                settings = qos_settings(ros_config, reference)
+            except ValueError as e:
+                suggestion = "" if isinstance(reference, dict) or reference in profiles else _suggest(reference, list(profiles) + list(QOS_PRESETS))
+                errors.append(f"{where}: {e}{suggestion}")
+                continue
+            # Named profiles are checked once, at their definition
+            if where.startswith("ros2.qos_profiles.") or isinstance(reference, dict):
+                errors += [f"{where}: {error}" for error in qos_errors(settings)]
+
+    return errors, warnings
+
+def validate_robot(config_data):
+    # Paths first, then the URDF cross-check
+    urdf_path = (config_data.get("files_path") or {}).get("urdf", "")
+    if not os.path.exists(urdf_path):
+        return [f"files_path.urdf: URDF file not found: {urdf_path}"], []
+    try:
+        urdf = parse_urdf(urdf_path)
+    except (ElementTree.ParseError, OSError) as e:
+        return [f"files_path.urdf: URDF could not be parsed: {e}"], []
+    return validate_config(config_data, urdf)